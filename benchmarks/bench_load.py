@@ -0,0 +1,284 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+Load test with N simulated editors connected to in-process fake Verse
+server. Every editor is driven by classes of io_verse add-on: it shares
+scene, one object and its mesh. Editors periodically move their object and
+vertices of their mesh. Other editors measure end-to-end latency of tags
+and items of layers, when they receive the change. Example:
+
+    python3 benchmarks/bench_load.py --clients 16 --rate 30 --moved 100 --delay 0.02
+"""
+
+
+import argparse
+import time
+import weakref
+
+import stubs
+
+
+stubs.import_io_verse()
+
+import bmesh
+import bpy
+import mathutils
+import verse as vrs
+from io_verse import mesh
+from io_verse import object3d
+from io_verse import scene
+from io_verse import session as vrs_session
+from io_verse.vrsent import vrsent
+
+import bench_mesh
+import fake_server
+
+
+# Custom types of nodes subscribed by editors
+SHARED_NODE_TYPES = (scene.VERSE_SCENE_CT, scene.VERSE_SCENE_DATA_CT,
+                     object3d.VERSE_OBJECT_CT, mesh.VERSE_MESH_CT)
+
+# Time and session of the last sent value: (command, node ID, ID, ID) -> (time, session)
+SENT = {}
+# Measured latencies: name -> list of seconds
+LATENCIES = {'tag': [], 'layer': []}
+
+
+def latency_hook(direction, command, args, kwargs):
+    """
+    This command hook remembers time of sent tags and items of layers and
+    it records latency of values received from other editor
+    """
+    if command == 'tag_set_values':
+        name = 'tag'
+    elif command == 'layer_set_value':
+        name = 'layer'
+    else:
+        return
+    session = vrs_session.VerseSession.instance()
+    if direction == 'out':
+        # The first argument of sent command is priority
+        SENT[(command,) + tuple(args[1:4])] = (time.perf_counter(), session)
+    else:
+        sent = SENT.get((command,) + tuple(args[0:3]))
+        if sent is not None and sent[1] is not session:
+            LATENCIES[name].append(time.perf_counter() - sent[0])
+
+
+class Editor(object):
+    """
+    Simulated Blender connected to fake Verse server. Add-on keeps nodes
+    in class attributes and it uses one current scene and one session,
+    thus they are switched, before this editor sends or receives commands.
+    """
+
+    def __init__(self, index, hostname, service):
+        """
+        Constructor of Editor
+        """
+        self.index = index
+        self.scene = stubs.Scene('Editor %d' % index)
+        self.objects = weakref.WeakValueDictionary()
+        self.waiting_for_mesh = {}
+        self.meshes = weakref.WeakValueDictionary()
+        self.scenes = weakref.WeakValueDictionary()
+        self.session = None
+        self.activate()
+        self.session = vrs_session.VerseSession(hostname, service, vrs.DGRAM_SEC_NONE)
+        self.activate()
+        self.session.add_command_hook(latency_hook)
+        # IDs of nodes subscribed by this editor
+        self.subscribed = set()
+        self.object_node = None
+        self.mesh_node = None
+
+    def activate(self):
+        """
+        This method makes this editor current Blender
+        """
+        bpy.context.scene = self.scene
+        object3d.VerseObject.objects = self.objects
+        object3d.VerseObject.waiting_for_mesh = self.waiting_for_mesh
+        mesh.VerseMesh.meshes = self.meshes
+        scene.VerseScene.scenes = self.scenes
+        vrs_session.VerseSession._VerseSession__instance = self.session
+
+    def update(self):
+        """
+        This method receives commands and it subscribes to new nodes
+        """
+        self.activate()
+        self.session.callback_update()
+        self.session.run_jobs()
+        for node in list(self.session.nodes.values()):
+            if node.id is not None and node.id not in self.subscribed and \
+                    node.custom_type in SHARED_NODE_TYPES:
+                self.subscribed.add(node.id)
+                # Blender UI is not updated by subscription of load test
+                vrsent.VerseNode.subscribe(node)
+
+    def data_node(self):
+        """
+        This method returns node with data of shared scene or None
+        """
+        for node in self.session.nodes.values():
+            if node.custom_type == scene.VERSE_SCENE_DATA_CT and node.id is not None:
+                return node
+        return None
+
+    def share(self, vertices):
+        """
+        This method shares object with grid mesh and it locks them
+        """
+        self.activate()
+        data_node = self.data_node()
+        self.scene.verse_data_node_id = data_node.id
+        b3d_mesh = bench_mesh.grid_mesh(vertices)
+        bpy.data.meshes.append(b3d_mesh)
+        obj = bpy.data.objects.new('Editor %d' % self.index, b3d_mesh)
+        obj.location = mathutils.Vector((2.0 * self.index, 0.0, 0.0))
+        self.scene.objects.link(obj)
+        self.object_node = object3d.VerseObject(session=self.session, parent=data_node, obj=obj)
+        self.mesh_node = mesh.VerseMesh(session=self.session, parent=self.object_node,
+                                        mesh=b3d_mesh, autosubscribe=True)
+        self.object_node.mesh_node = self.mesh_node
+        self.object_node.lock()
+        self.mesh_node.lock()
+
+    def edit(self, tick, moved):
+        """
+        This method moves object and vertices of mesh and it sends changes
+        """
+        self.activate()
+        obj = self.object_node.obj
+        obj.location = mathutils.Vector((2.0 * self.index, 0.01 * tick, 0.0))
+        self.object_node.update()
+        edit_bmesh = bmesh.from_edit_mesh(self.mesh_node.mesh)
+        step = max(1, len(edit_bmesh.verts) // max(1, moved))
+        for vert in edit_bmesh.verts.elems[::step][:moved]:
+            vert.co = mathutils.Vector((vert.co[0], vert.co[1], 0.001 * tick))
+        self.mesh_node.send_updates()
+
+
+def pump(editors, rounds=1):
+    """
+    This function receives commands of all editors
+    """
+    for _round in range(rounds):
+        for editor in editors:
+            editor.update()
+
+
+def settle(editors, delay, steps=5):
+    """
+    This function waits for delivery of commands delayed by fake server
+    """
+    for _step in range(steps):
+        time.sleep(delay * 2)
+        pump(editors, 3)
+
+
+def percentile(values, fraction):
+    """
+    This function returns percentile of values
+    """
+    if len(values) == 0:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run(clients, duration, rate, vertices, moved, delay):
+    """
+    This function runs load test and it prints results
+    """
+    server = fake_server.FakeServer(delay=delay).start()
+    hostname, service = server.address
+    editors = [Editor(index, hostname, service) for index in range(clients)]
+    pump(editors)
+
+    # The first editor shares scene, other editors subscribe to it and
+    # every editor shares one object with mesh
+    editors[0].activate()
+    scene.VerseScene(session=editors[0].session, name=('LoadTest',))
+    for editor in editors:
+        editor.activate()
+        editor.session.send_node_subscribe(vrs.DEFAULT_PRIORITY, fake_server.SCENE_PARENT_ID, 0, 0)
+    settle(editors, delay)
+    for editor in editors:
+        editor.share(vertices)
+    settle(editors, delay)
+    for editor in editors:
+        editor.session.reset_counters()
+    del LATENCIES['tag'][:]
+    del LATENCIES['layer'][:]
+
+    period = 1.0 / rate
+    start = time.perf_counter()
+    next_tick = start
+    ticks = 0
+    while time.perf_counter() - start < duration:
+        now = time.perf_counter()
+        if now >= next_tick:
+            for editor in editors:
+                editor.edit(ticks, moved)
+            next_tick += period
+            ticks += 1
+        pump(editors)
+    # Receive commands still waiting in queues
+    settle(editors, delay, steps=1)
+    elapsed = time.perf_counter() - start
+
+    sessions = [editor.session for editor in editors]
+    sent = sum(sum(session.sent_commands.values()) for session in sessions)
+    received = sum(sum(session.received_commands.values()) for session in sessions)
+    sent_bytes = sum(session.sent_bytes for session in sessions)
+    print('clients: %d, ticks: %d, duration: %.2f s' % (clients, ticks, elapsed))
+    print('sent: %d commands (%.0f/s), %.1f kB/s, received: %d commands (%.0f/s), dropped: %d' % (
+        sent, sent / elapsed, sent_bytes / elapsed / 1024.0, received, received / elapsed,
+        server.dropped_commands))
+    for name, values in sorted(LATENCIES.items()):
+        print('%-6s latency: count %7d  p50 %8.2f ms  p95 %8.2f ms  max %8.2f ms' % (
+            name, len(values),
+            1000.0 * percentile(values, 0.5),
+            1000.0 * percentile(values, 0.95),
+            1000.0 * max(values) if len(values) > 0 else float('nan')))
+    server.stop()
+
+
+def main():
+    """
+    Parse arguments and run load test
+    """
+    parser = argparse.ArgumentParser(description='Load test with simulated editors')
+    parser.add_argument('--clients', type=int, default=8, help='count of simulated editors')
+    parser.add_argument('--duration', type=float, default=5.0, help='duration of test in seconds')
+    parser.add_argument('--rate', type=float, default=15.0, help='changes per second of every editor')
+    parser.add_argument('--vertices', type=int, default=400, help='count of vertices of every mesh')
+    parser.add_argument('--moved', type=int, default=10, help='moved vertices per change')
+    parser.add_argument('--delay', type=float, default=0.0, help='simulated one way delay in seconds')
+    args = parser.parse_args()
+    run(args.clients, args.duration, args.rate, args.vertices, args.moved, args.delay)
+
+
+if __name__ == '__main__':
+    main()
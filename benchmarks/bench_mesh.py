@@ -0,0 +1,207 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+Benchmarks of sharing mesh, sending updates of edited mesh and receiving
+of mesh items. Benchmarks run outside Blender with stand-ins of Blender
+modules and verse module. Example:
+
+    python3 benchmarks/bench_mesh.py --sizes 1000,100000 --output result.json
+"""
+
+
+import argparse
+import json
+import math
+import time
+
+import stubs
+
+
+io_verse = stubs.import_io_verse()
+
+import bmesh
+import mathutils
+import verse as vrs
+from io_verse import mesh
+from io_verse import session as vrs_session
+
+import fake_bmesh
+
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+
+
+def grid_mesh(vertex_count):
+    """
+    This function returns square grid of quads with approximately
+    vertex_count vertices
+    """
+    side = max(2, int(math.sqrt(vertex_count)))
+    coords = [(float(x), float(y), 0.0) for y in range(side) for x in range(side)]
+    edges = []
+    faces = []
+    for y in range(side):
+        for x in range(side):
+            index = y * side + x
+            if x + 1 < side:
+                edges.append((index, index + 1))
+            if y + 1 < side:
+                edges.append((index, index + side))
+            if x + 1 < side and y + 1 < side:
+                # The last vertex of quad can not be zero
+                faces.append((index + side, index, index + 1, index + side + 1))
+    return fake_bmesh.Mesh('Grid', coords, edges, faces)
+
+
+def connect():
+    """
+    This function returns new session connected to loopback server
+    """
+    session = vrs_session.VerseSession('localhost', '12345', vrs.DGRAM_SEC_NONE)
+    session.callback_update()
+    return session
+
+
+class Result(object):
+    """
+    Result of one benchmark
+    """
+
+    def __init__(self, name, size, ops, seconds, session):
+        self.name = name
+        self.size = size
+        self.ops = ops
+        self.seconds = seconds
+        self.commands = sum(session.sent_commands.values())
+        self.bytes = session.sent_bytes
+
+    def __str__(self):
+        return '%-24s %9d %7d %12.3f ms %12.1f B %10d cmds' % (
+            self.name, self.size, self.ops,
+            1000.0 * self.seconds / self.ops, float(self.bytes) / self.ops, self.commands)
+
+    def to_dict(self):
+        """
+        This method returns result as dictionary
+        """
+        return {
+            'name': self.name,
+            'size': self.size,
+            'ops': self.ops,
+            'seconds_per_op': self.seconds / self.ops,
+            'bytes_per_op': float(self.bytes) / self.ops,
+            'commands': self.commands
+        }
+
+
+def bench_share(session, b3d_mesh):
+    """
+    Benchmark of sharing whole mesh
+    """
+    session.reset_counters()
+    start = time.perf_counter()
+    mesh_node = mesh.VerseMesh(session=session, mesh=b3d_mesh, autosubscribe=False)
+    # Confirm creating of node and layers; queued items are sent then
+    session.callback_update()
+    seconds = time.perf_counter() - start
+    return mesh_node, Result('share', len(b3d_mesh.vertices), 1, seconds, session)
+
+
+def bench_send_updates(session, mesh_node, changed):
+    """
+    Benchmark of sending updates of edited mesh with count of moved vertices
+    """
+    edit_bmesh = bmesh.from_edit_mesh(mesh_node.mesh)
+    step = max(1, len(edit_bmesh.verts) // max(1, changed))
+    for vert in edit_bmesh.verts.elems[::step][:changed]:
+        vert.co = mathutils.Vector((vert.co[0], vert.co[1], vert.co[2] + 1.0))
+    session.reset_counters()
+    start = time.perf_counter()
+    mesh_node.send_updates()
+    seconds = time.perf_counter() - start
+    name = 'send_updates (%d moved)' % changed if changed > 0 else 'send_updates (idle)'
+    return Result(name, len(edit_bmesh.verts), 1, seconds, session)
+
+
+def bench_receive(session, mesh_node, count):
+    """
+    Benchmark of receiving new positions of vertices from other client
+    """
+    # Leave edit mode: edit bmesh is written to mesh
+    if mesh_node.mesh.edit_bmesh is not None:
+        mesh_node.mesh.edit_bmesh.to_mesh(mesh_node.mesh)
+        mesh_node.mesh.edit_bmesh = None
+    mesh_node.bmesh = None
+    size = len(mesh_node.vertices.items)
+    step = max(1, size // count)
+    item_ids = sorted(mesh_node.vertices.items.keys())[::step][:count]
+    session.reset_counters()
+    start = time.perf_counter()
+    for item_id in item_ids:
+        x, y, z = mesh_node.vertices.items[item_id]
+        mesh.VerseVertices.cb_receive_layer_set_value(
+            session, mesh_node.id, mesh_node.vertices.id, item_id, (x, y, z + 0.5))
+    seconds = time.perf_counter() - start
+    return Result('receive vertex', size, len(item_ids), seconds, session)
+
+
+def run(sizes, receive_limit):
+    """
+    This function runs all benchmarks for all sizes of mesh
+    """
+    results = []
+    for size in sizes:
+        session = connect()
+        mesh_node, result = bench_share(session, grid_mesh(size))
+        results.append(result)
+        results.append(bench_send_updates(session, mesh_node, 0))
+        results.append(bench_send_updates(session, mesh_node, max(1, size // 100)))
+        # Every received item copies whole bmesh to mesh, thus count of
+        # received items is limited for huge meshes
+        results.append(bench_receive(session, mesh_node, max(1, min(1000, receive_limit // size))))
+        for result in results[-4:]:
+            print(result)
+    return results
+
+
+def main():
+    """
+    Parse arguments and run benchmarks
+    """
+    parser = argparse.ArgumentParser(description='Benchmarks of mesh synchronization')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='comma separated counts of vertices')
+    parser.add_argument('--receive-limit', type=int, default=10 ** 7,
+                        help='count of received items multiplied by size of mesh')
+    parser.add_argument('--output', help='JSON file with results')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    print('%-24s %9s %7s %15s %14s %15s' % ('benchmark', 'vertices', 'ops', 'time/op', 'sent/op', 'commands'))
+    results = run(sizes, args.receive_limit)
+    if args.output is not None:
+        with open(args.output, 'w') as output:
+            json.dump([result.to_dict() for result in results], output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,440 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements lightweight stand-in of Blender mesh data block and
+bmesh module. Only the part of API used by io_verse is implemented. Copying
+between mesh and bmesh costs O(n) like in Blender, thus benchmarks show
+cost of calling bmesh.to_mesh() too often.
+"""
+
+
+import types
+
+
+class Vector(tuple):
+    """
+    Stand-in of mathutils.Vector
+    """
+
+    def __new__(cls, value=(0.0, 0.0, 0.0)):
+        return super(Vector, cls).__new__(cls, (float(item) for item in value))
+
+    def normalized(self):
+        """
+        This method returns normalized vector
+        """
+        length = sum(item * item for item in self) ** 0.5
+        return Vector(item / length for item in self) if length > 0.0 else Vector(self)
+
+    def to_quaternion(self):
+        """
+        This method returns identity quaternion
+        """
+        return Vector((1.0, 0.0, 0.0, 0.0))
+
+
+class Collection(list):
+    """
+    Stand-in of bpy_prop_collection
+    """
+
+    def foreach_get(self, attr, seq):
+        """
+        This method copies values of attribute of all items to flat sequence
+        """
+        index = 0
+        for item in self:
+            for value in getattr(item, attr):
+                seq[index] = value
+                index += 1
+
+
+class MeshVertex(object):
+    """
+    Stand-in of bpy.types.MeshVertex
+    """
+    __slots__ = ('index', 'co')
+
+    def __init__(self, index, co):
+        self.index = index
+        self.co = Vector(co)
+
+
+class MeshEdge(object):
+    """
+    Stand-in of bpy.types.MeshEdge
+    """
+    __slots__ = ('index', 'vertices')
+
+    def __init__(self, index, vertices):
+        self.index = index
+        self.vertices = tuple(vertices)
+
+
+class MeshTessFace(object):
+    """
+    Stand-in of bpy.types.MeshTessFace
+    """
+    __slots__ = ('index', 'vertices')
+
+    def __init__(self, index, vertices):
+        self.index = index
+        self.vertices = tuple(vertices)
+
+    @property
+    def vertices_raw(self):
+        """
+        Four vertices of face, the last one is zero for triangles
+        """
+        return self.vertices + (0,) * (4 - len(self.vertices))
+
+
+class Mesh(object):
+    """
+    Stand-in of bpy.types.Mesh
+    """
+
+    def __init__(self, name='Mesh', coords=(), edges=(), faces=()):
+        """
+        Constructor of Mesh
+        """
+        self.name = name
+        self.verse_node_id = -1
+        self.users = 1
+        self.vertices = Collection()
+        self.edges = Collection()
+        self.tessfaces = Collection()
+        # Integer layers of vertices, edges and faces: name -> list of values
+        self.int_layers = ({}, {}, {})
+        self.edit_bmesh = None
+        self.set_geometry(coords, edges, faces)
+
+    def set_geometry(self, coords, edges, faces):
+        """
+        This method replaces geometry of mesh
+        """
+        self.vertices = Collection(MeshVertex(index, co) for index, co in enumerate(coords))
+        self.edges = Collection(MeshEdge(index, verts) for index, verts in enumerate(edges))
+        self.tessfaces = Collection(MeshTessFace(index, verts) for index, verts in enumerate(faces))
+
+    def as_pointer(self):
+        """
+        This method returns unique number of mesh
+        """
+        return id(self)
+
+    def update(self, calc_tessface=False):
+        """
+        Faces of this mesh are always tessellated
+        """
+        pass
+
+
+class Object(object):
+    """
+    Stand-in of bpy.types.Object
+    """
+
+    def __init__(self, name='Object', data=None):
+        """
+        Constructor of Object
+        """
+        self.name = name
+        self.data = data
+        self.type = 'MESH'
+        self.verse_node_id = -1
+        self.location = Vector()
+        self.scale = Vector((1.0, 1.0, 1.0))
+        # Only rotation of local matrix is used and it is always identity
+        self.matrix_local = Vector()
+        self.select = False
+        self.hide = False
+        self.hide_select = False
+        self.is_updated = False
+
+
+class IDCollection(list):
+    """
+    Stand-in of bpy.data.meshes and bpy.data.objects
+    """
+
+    def __init__(self, factory):
+        """
+        Constructor of IDCollection
+        :factory: class of created data blocks
+        """
+        super(IDCollection, self).__init__()
+        self.factory = factory
+
+    def new(self, name, *args):
+        """
+        This method creates new data block
+        """
+        item = self.factory(name, *args)
+        self.append(item)
+        return item
+
+    def remove(self, item):
+        """
+        This method removes data block
+        """
+        if item in self:
+            super(IDCollection, self).remove(item)
+
+
+class BMLayerItem(object):
+    """
+    Stand-in of bmesh.types.BMLayerItem
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.use_force_default = False
+        self.default_value = 0
+
+
+class BMLayerCollection(object):
+    """
+    Stand-in of bmesh.types.BMLayerCollection
+    """
+
+    def __init__(self):
+        self.layers = {}
+
+    def new(self, name):
+        """
+        This method creates new layer
+        """
+        layer = BMLayerItem(name)
+        self.layers[name] = layer
+        return layer
+
+    def get(self, name, default=None):
+        """
+        This method returns layer with the name
+        """
+        return self.layers.get(name, default)
+
+    def keys(self):
+        """
+        This method returns names of layers
+        """
+        return self.layers.keys()
+
+
+class BMElem(object):
+    """
+    Base class of vertices, edges and faces of bmesh
+    """
+    __slots__ = ('index', 'ints', 'valid', '__weakref__')
+
+    def __init__(self):
+        self.index = -1
+        self.ints = {}
+        self.valid = True
+
+    def __getitem__(self, layer):
+        return self.ints.get(layer.name, layer.default_value)
+
+    def __setitem__(self, layer, value):
+        self.ints[layer.name] = value
+
+
+class BMVert(BMElem):
+    """
+    Stand-in of bmesh.types.BMVert
+    """
+    __slots__ = ('co', 'select', 'link_edges', 'link_faces')
+
+    def __init__(self, co):
+        super(BMVert, self).__init__()
+        self.co = Vector(co)
+        self.select = False
+        self.link_edges = []
+        self.link_faces = []
+
+
+class BMEdge(BMElem):
+    """
+    Stand-in of bmesh.types.BMEdge
+    """
+    __slots__ = ('verts', 'select')
+
+    def __init__(self, verts):
+        super(BMEdge, self).__init__()
+        self.verts = list(verts)
+        self.select = False
+        for vert in self.verts:
+            vert.link_edges.append(self)
+
+
+class BMFace(BMElem):
+    """
+    Stand-in of bmesh.types.BMFace
+    """
+    __slots__ = ('verts', 'select')
+
+    def __init__(self, verts):
+        super(BMFace, self).__init__()
+        self.verts = list(verts)
+        self.select = False
+        for vert in self.verts:
+            vert.link_faces.append(self)
+
+
+class BMElemSeq(object):
+    """
+    Stand-in of bmesh.types.BMVertSeq, BMEdgeSeq and BMFaceSeq
+    """
+
+    def __init__(self, elem_class):
+        self.elem_class = elem_class
+        self.elems = []
+        self.layers = types.SimpleNamespace(int=BMLayerCollection())
+
+    def __len__(self):
+        return len(self.elems)
+
+    def __iter__(self):
+        return iter(self.elems)
+
+    def __getitem__(self, index):
+        return self.elems[index]
+
+    def new(self, value):
+        """
+        This method creates new element
+        """
+        if self.elem_class is not BMVert and None in value:
+            raise TypeError('Element could not be created from None')
+        elem = self.elem_class(value)
+        elem.index = len(self.elems)
+        self.elems.append(elem)
+        return elem
+
+    def remove(self, elem):
+        """
+        This method removes element
+        """
+        if elem.valid is False:
+            raise ReferenceError('Element was already removed')
+        elem.valid = False
+        self.elems.remove(elem)
+
+    def index_update(self):
+        """
+        This method updates indexes of elements
+        """
+        for index, elem in enumerate(self.elems):
+            elem.index = index
+
+    def ensure_lookup_table(self):
+        """
+        Lookup table is always valid
+        """
+        pass
+
+
+class BMesh(object):
+    """
+    Stand-in of bmesh.types.BMesh
+    """
+
+    def __init__(self):
+        self.verts = BMElemSeq(BMVert)
+        self.edges = BMElemSeq(BMEdge)
+        self.faces = BMElemSeq(BMFace)
+
+    def from_mesh(self, mesh):
+        """
+        This method copies geometry and layers of mesh to this bmesh
+        """
+        self.__init__()
+        for vert in mesh.vertices:
+            self.verts.new(vert.co)
+        for edge in mesh.edges:
+            self.edges.new([self.verts.elems[index] for index in edge.vertices])
+        for face in mesh.tessfaces:
+            self.faces.new([self.verts.elems[index] for index in face.vertices])
+        for seq, layers in zip((self.verts, self.edges, self.faces), mesh.int_layers):
+            for name, values in layers.items():
+                seq.layers.int.new(name)
+                for elem, value in zip(seq.elems, values):
+                    elem.ints[name] = value
+
+    def to_mesh(self, mesh):
+        """
+        This method copies geometry and layers of this bmesh to mesh
+        """
+        mesh.set_geometry(
+            [vert.co for vert in self.verts.elems],
+            [[vert.index for vert in edge.verts] for edge in self.edges.elems],
+            [[vert.index for vert in face.verts] for face in self.faces.elems]
+        )
+        mesh.int_layers = tuple(
+            {name: [elem[layer] for elem in seq.elems] for name, layer in seq.layers.int.layers.items()}
+            for seq in (self.verts, self.edges, self.faces))
+
+    def free(self):
+        """
+        This method invalidates this bmesh
+        """
+        pass
+
+
+def new():
+    """
+    Stand-in of bmesh.new()
+    """
+    return BMesh()
+
+
+def from_edit_mesh(mesh):
+    """
+    Stand-in of bmesh.from_edit_mesh(). Edit bmesh lives as long as mesh.
+    """
+    if mesh.edit_bmesh is None:
+        mesh.edit_bmesh = BMesh()
+        mesh.edit_bmesh.from_mesh(mesh)
+    return mesh.edit_bmesh
+
+
+def delete(bm, geom=(), context=1):
+    """
+    Stand-in of bmesh.ops.delete(); vertices are deleted with edges and faces
+    """
+    for elem in geom:
+        if isinstance(elem, BMVert):
+            for face in list(elem.link_faces):
+                if face.valid is True:
+                    bm.faces.remove(face)
+            for edge in list(elem.link_edges):
+                if edge.valid is True:
+                    bm.edges.remove(edge)
+            bm.verts.remove(elem)
+        elif isinstance(elem, BMEdge):
+            bm.edges.remove(elem)
+        elif isinstance(elem, BMFace):
+            bm.faces.remove(elem)
+
+
+ops = types.SimpleNamespace(delete=delete)
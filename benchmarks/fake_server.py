@@ -0,0 +1,585 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements in-process stand-in of Verse server. Sessions of
+fake verse module connect to it, when it is started at the same hostname
+and service. The server implements nodes (create, destroy, link, subscribe,
+permissions, owner, lock), tag groups, tags and layers. Commands are
+delivered to subscribers with optional simulated delay.
+"""
+
+
+import time
+
+import fake_verse
+
+
+ROOT_NODE_ID = fake_verse.ROOT_NODE_ID
+AVATAR_PARENT_ID = fake_verse.AVATAR_PARENT_NODE_ID
+USER_PARENT_ID = fake_verse.USER_PARENT_NODE_ID
+SCENE_PARENT_ID = fake_verse.SCENE_PARENT_NODE_ID
+
+# The first ID of nodes created by clients
+FIRST_NODE_ID = 65536
+
+
+class FakeEntity(object):
+    """
+    Base class of server entities with subscribers
+    """
+
+    def __init__(self, entity_id, custom_type):
+        self.id = entity_id
+        self.custom_type = custom_type
+        self.subscribers = set()
+
+
+class FakeTag(object):
+    """
+    Tag stored at server
+    """
+
+    def __init__(self, tag_id, data_type, count, custom_type):
+        self.id = tag_id
+        self.data_type = data_type
+        self.count = count
+        self.custom_type = custom_type
+        self.value = None
+
+
+class FakeTagGroup(FakeEntity):
+    """
+    Tag group stored at server
+    """
+
+    def __init__(self, taggroup_id, custom_type):
+        super(FakeTagGroup, self).__init__(taggroup_id, custom_type)
+        self.tags = {}
+        self.last_tag_id = -1
+
+
+class FakeLayer(FakeEntity):
+    """
+    Layer stored at server
+    """
+
+    def __init__(self, layer_id, parent_layer_id, data_type, count, custom_type):
+        super(FakeLayer, self).__init__(layer_id, custom_type)
+        self.parent_layer_id = parent_layer_id
+        self.data_type = data_type
+        self.count = count
+        self.items = {}
+
+
+class FakeNode(FakeEntity):
+    """
+    Node stored at server
+    """
+
+    def __init__(self, node_id, parent_id, owner_id, custom_type):
+        super(FakeNode, self).__init__(node_id, custom_type)
+        self.parent_id = parent_id
+        self.owner_id = owner_id
+        self.children = set()
+        self.perms = {}
+        self.lock_avatar_id = None
+        self.taggroups = {}
+        self.layers = {}
+        self.last_taggroup_id = -1
+        self.last_layer_id = -1
+
+    def perm(self, user_id, default_perm):
+        """
+        This method returns permissions of user
+        """
+        if user_id == self.owner_id:
+            return fake_verse.PERM_NODE_READ | fake_verse.PERM_NODE_WRITE
+        return self.perms.get(user_id, default_perm)
+
+    def create_args(self):
+        """
+        This method returns arguments of command node_create
+        """
+        return self.id, self.parent_id, self.owner_id, self.custom_type
+
+
+class FakeServer(object):
+    """
+    In-process stand-in of Verse server
+    """
+
+    def __init__(self, hostname='localhost', service='12345', delay=0.0,
+                 default_perm=fake_verse.PERM_NODE_READ, echo=True):
+        """
+        Constructor of FakeServer
+        :delay: simulated one way delay of commands in seconds
+        :default_perm: permissions of users, which do not own node
+        :echo: when it is True, then commands are sent to sender too
+        """
+        self.address = (hostname, service)
+        self.delay = delay
+        self.default_perm = default_perm
+        self.echo = echo
+        # Avatar IDs and user IDs of sessions
+        self.sessions = {}
+        self.users = {}
+        self.last_node_id = FIRST_NODE_ID - 1
+        self.last_user_id = 1000
+        self.nodes = {}
+        # Entities known by session: session -> set of node IDs
+        self.known_nodes = {}
+        for node_id, parent_id in ((ROOT_NODE_ID, None), (AVATAR_PARENT_ID, ROOT_NODE_ID),
+                                   (USER_PARENT_ID, ROOT_NODE_ID), (SCENE_PARENT_ID, ROOT_NODE_ID)):
+            self.add_node(node_id, parent_id, 0, 0)
+        self.dropped_commands = 0
+
+    def start(self):
+        """
+        This method makes server available for new sessions
+        """
+        fake_verse.SERVERS[self.address] = self
+        return self
+
+    def stop(self):
+        """
+        This method disconnects all sessions and it makes server unavailable
+        """
+        for session in list(self.sessions.keys()):
+            self.send(session, 'connect_terminate', (0,))
+            self.disconnect(session)
+        fake_verse.SERVERS.pop(self.address, None)
+
+    def new_node_id(self):
+        """
+        This method returns ID of new node
+        """
+        self.last_node_id += 1
+        return self.last_node_id
+
+    def add_node(self, node_id, parent_id, owner_id, custom_type):
+        """
+        This method adds new node to the tree of nodes
+        """
+        node = FakeNode(node_id, parent_id, owner_id, custom_type)
+        self.nodes[node_id] = node
+        if parent_id is not None:
+            self.nodes[parent_id].children.add(node_id)
+        return node
+
+    def send(self, session, command, args):
+        """
+        This method sends command to session
+        """
+        session.deliver(command, args, time.perf_counter() + self.delay)
+
+    def broadcast(self, entity, command, args, sender=None):
+        """
+        This method sends command to all subscribers of entity
+        """
+        for session in list(entity.subscribers):
+            if session is not sender or self.echo is True:
+                self.send(session, command, args)
+
+    def send_node(self, session, node):
+        """
+        This method sends node_create to session, when session does not know the node
+        """
+        known = self.known_nodes[session]
+        if node.id not in known:
+            known.add(node.id)
+            self.send(session, 'node_create', node.create_args())
+
+    def connect(self, session):
+        """
+        This method is called, when new session is created. Every session
+        gets new user and avatar.
+        """
+        self.last_user_id += 1
+        user_id = self.last_user_id
+        self.add_node(user_id, USER_PARENT_ID, user_id, 0)
+        avatar = self.add_node(self.new_node_id(), AVATAR_PARENT_ID, user_id, 0)
+        self.users[session] = user_id
+        self.sessions[session] = avatar.id
+        self.known_nodes[session] = set()
+        self.send(session, 'connect_accept', (user_id, avatar.id))
+
+    def disconnect(self, session):
+        """
+        This method removes session and locks and avatar of session
+        """
+        avatar_id = self.sessions.pop(session, None)
+        if avatar_id is None:
+            return
+        self.users.pop(session)
+        for node in self.nodes.values():
+            node.subscribers.discard(session)
+            for entity in list(node.taggroups.values()) + list(node.layers.values()):
+                entity.subscribers.discard(session)
+            if node.lock_avatar_id == avatar_id:
+                node.lock_avatar_id = None
+                self.broadcast(node, 'node_unlock', (node.id, avatar_id))
+        self.known_nodes.pop(session, None)
+        self.destroy_node(self.nodes[avatar_id])
+
+    def destroy_node(self, node):
+        """
+        This method destroys node and all its child nodes
+        """
+        for child_id in list(node.children):
+            self.destroy_node(self.nodes[child_id])
+        if node.parent_id in self.nodes:
+            self.nodes[node.parent_id].children.discard(node.id)
+        del self.nodes[node.id]
+        for session, known in self.known_nodes.items():
+            if node.id in known:
+                known.discard(node.id)
+                self.send(session, 'node_destroy', (node.id,))
+
+    def can_write(self, session, node):
+        """
+        This method returns True, when user of session can change node
+        """
+        return node.perm(self.users[session], self.default_perm) & fake_verse.PERM_NODE_WRITE != 0
+
+    def can_read(self, session, node):
+        """
+        This method returns True, when user of session can read node
+        """
+        return node.perm(self.users[session], self.default_perm) & fake_verse.PERM_NODE_READ != 0
+
+    def receive(self, session, command, args):
+        """
+        This method handles command sent by session
+        """
+        handler = getattr(self, 'handle_' + command, None)
+        if handler is None or handler(session, *args) is False:
+            self.dropped_commands += 1
+
+    def lookup(self, node_id, taggroup_id=None, layer_id=None):
+        """
+        This method returns node, tag group or layer; None is returned, when
+        entity does not exist
+        """
+        node = self.nodes.get(node_id)
+        if node is None:
+            return None
+        if taggroup_id is not None:
+            return node.taggroups.get(taggroup_id)
+        if layer_id is not None:
+            return node.layers.get(layer_id)
+        return node
+
+    # Commands with nodes
+
+    def handle_connect_terminate(self, session, *args):
+        """
+        Command connect_terminate
+        """
+        self.disconnect(session)
+
+    def handle_user_authenticate(self, session, *args):
+        """
+        Command user_authenticate
+        """
+        pass
+
+    def handle_fps(self, session, *args):
+        """
+        Command fps
+        """
+        pass
+
+    def handle_node_create(self, session, prio, custom_type):
+        """
+        Command node_create
+        """
+        avatar_id = self.sessions[session]
+        node = self.add_node(self.new_node_id(), avatar_id, self.users[session], custom_type)
+        node.subscribers.add(session)
+        self.send_node(session, node)
+        for other in self.nodes[avatar_id].subscribers:
+            if other is not session:
+                self.send_node(other, node)
+
+    def handle_node_destroy(self, session, prio, node_id):
+        """
+        Command node_destroy
+        """
+        node = self.lookup(node_id)
+        if node is None or node.owner_id != self.users[session]:
+            return False
+        self.destroy_node(node)
+
+    def handle_node_subscribe(self, session, prio, node_id, version=0, crc32=0):
+        """
+        Command node_subscribe
+        """
+        node = self.lookup(node_id)
+        if node is None or self.can_read(session, node) is False:
+            return False
+        self.send_node(session, node)
+        node.subscribers.add(session)
+        self.send(session, 'node_perm', (node.id, self.users[session], node.perm(self.users[session], self.default_perm)))
+        if node.lock_avatar_id is not None:
+            self.send(session, 'node_lock', (node.id, node.lock_avatar_id))
+        for taggroup in node.taggroups.values():
+            self.send(session, 'taggroup_create', (node.id, taggroup.id, taggroup.custom_type))
+        for layer in sorted(node.layers.values(), key=lambda layer: layer.id):
+            self.send(session, 'layer_create', (node.id, layer.parent_layer_id, layer.id,
+                                                layer.data_type, layer.count, layer.custom_type))
+        for child_id in sorted(node.children):
+            self.send_node(session, self.nodes[child_id])
+
+    def handle_node_unsubscribe(self, session, prio, node_id, *args):
+        """
+        Command node_unsubscribe
+        """
+        node = self.lookup(node_id)
+        if node is None:
+            return False
+        node.subscribers.discard(session)
+
+    def handle_node_link(self, session, prio, parent_node_id, child_node_id):
+        """
+        Command node_link
+        """
+        parent = self.lookup(parent_node_id)
+        child = self.lookup(child_node_id)
+        if parent is None or child is None or self.can_write(session, child) is False:
+            return False
+        # Node can not be linked to its own subtree
+        ancestor = parent
+        while ancestor is not None:
+            if ancestor.id == child.id:
+                return False
+            ancestor = self.nodes.get(ancestor.parent_id)
+        old_parent = self.nodes[child.parent_id]
+        old_parent.children.discard(child.id)
+        parent.children.add(child.id)
+        child.parent_id = parent.id
+        for other in old_parent.subscribers | parent.subscribers:
+            if child.id in self.known_nodes[other]:
+                self.send(other, 'node_link', (parent.id, child.id))
+            else:
+                self.send_node(other, child)
+
+    def handle_node_perm(self, session, prio, node_id, user_id, perm):
+        """
+        Command node_perm
+        """
+        node = self.lookup(node_id)
+        if node is None or node.owner_id != self.users[session]:
+            return False
+        node.perms[user_id] = perm
+        self.broadcast(node, 'node_perm', (node_id, user_id, perm))
+
+    def handle_node_owner(self, session, prio, node_id, user_id):
+        """
+        Command node_owner
+        """
+        node = self.lookup(node_id)
+        if node is None or node.owner_id != self.users[session]:
+            return False
+        node.owner_id = user_id
+        self.broadcast(node, 'node_owner', (node_id, user_id))
+
+    def handle_node_lock(self, session, prio, node_id):
+        """
+        Command node_lock
+        """
+        node = self.lookup(node_id)
+        avatar_id = self.sessions[session]
+        if node is None or self.can_write(session, node) is False or \
+                node.lock_avatar_id not in (None, avatar_id):
+            return False
+        node.lock_avatar_id = avatar_id
+        self.broadcast(node, 'node_lock', (node_id, avatar_id))
+
+    def handle_node_unlock(self, session, prio, node_id):
+        """
+        Command node_unlock
+        """
+        node = self.lookup(node_id)
+        avatar_id = self.sessions[session]
+        if node is None or node.lock_avatar_id != avatar_id:
+            return False
+        node.lock_avatar_id = None
+        self.broadcast(node, 'node_unlock', (node_id, avatar_id))
+
+    def handle_node_prio(self, session, *args):
+        """
+        Command node_prio
+        """
+        pass
+
+    # Commands with tag groups and tags
+
+    def handle_taggroup_create(self, session, prio, node_id, custom_type):
+        """
+        Command taggroup_create
+        """
+        node = self.lookup(node_id)
+        if node is None or self.can_write(session, node) is False:
+            return False
+        node.last_taggroup_id += 1
+        taggroup = FakeTagGroup(node.last_taggroup_id, custom_type)
+        node.taggroups[taggroup.id] = taggroup
+        taggroup.subscribers.add(session)
+        self.broadcast(node, 'taggroup_create', (node_id, taggroup.id, custom_type))
+        if session not in node.subscribers:
+            self.send(session, 'taggroup_create', (node_id, taggroup.id, custom_type))
+
+    def handle_taggroup_destroy(self, session, prio, node_id, taggroup_id):
+        """
+        Command taggroup_destroy
+        """
+        node = self.lookup(node_id)
+        if node is None or taggroup_id not in node.taggroups or self.can_write(session, node) is False:
+            return False
+        del node.taggroups[taggroup_id]
+        self.broadcast(node, 'taggroup_destroy', (node_id, taggroup_id))
+
+    def handle_taggroup_subscribe(self, session, prio, node_id, taggroup_id, version=0, crc32=0):
+        """
+        Command taggroup_subscribe
+        """
+        taggroup = self.lookup(node_id, taggroup_id=taggroup_id)
+        if taggroup is None or self.can_read(session, self.nodes[node_id]) is False:
+            return False
+        taggroup.subscribers.add(session)
+        for tag in taggroup.tags.values():
+            self.send(session, 'tag_create', (node_id, taggroup_id, tag.id, tag.data_type, tag.count, tag.custom_type))
+            if tag.value is not None:
+                self.send(session, 'tag_set_values', (node_id, taggroup_id, tag.id, tag.value))
+
+    def handle_taggroup_unsubscribe(self, session, prio, node_id, taggroup_id, *args):
+        """
+        Command taggroup_unsubscribe
+        """
+        taggroup = self.lookup(node_id, taggroup_id=taggroup_id)
+        if taggroup is None:
+            return False
+        taggroup.subscribers.discard(session)
+
+    def handle_tag_create(self, session, prio, node_id, taggroup_id, data_type, count, custom_type):
+        """
+        Command tag_create
+        """
+        taggroup = self.lookup(node_id, taggroup_id=taggroup_id)
+        if taggroup is None or self.can_write(session, self.nodes[node_id]) is False:
+            return False
+        taggroup.last_tag_id += 1
+        tag = FakeTag(taggroup.last_tag_id, data_type, count, custom_type)
+        taggroup.tags[tag.id] = tag
+        taggroup.subscribers.add(session)
+        self.broadcast(taggroup, 'tag_create', (node_id, taggroup_id, tag.id, data_type, count, custom_type))
+
+    def handle_tag_destroy(self, session, prio, node_id, taggroup_id, tag_id):
+        """
+        Command tag_destroy
+        """
+        taggroup = self.lookup(node_id, taggroup_id=taggroup_id)
+        if taggroup is None or tag_id not in taggroup.tags or \
+                self.can_write(session, self.nodes[node_id]) is False:
+            return False
+        del taggroup.tags[tag_id]
+        self.broadcast(taggroup, 'tag_destroy', (node_id, taggroup_id, tag_id))
+
+    def handle_tag_set_values(self, session, prio, node_id, taggroup_id, tag_id, data_type, value):
+        """
+        Command tag_set_values
+        """
+        taggroup = self.lookup(node_id, taggroup_id=taggroup_id)
+        if taggroup is None or tag_id not in taggroup.tags or \
+                self.can_write(session, self.nodes[node_id]) is False:
+            return False
+        taggroup.tags[tag_id].value = tuple(value)
+        self.broadcast(taggroup, 'tag_set_values', (node_id, taggroup_id, tag_id, tuple(value)), session)
+
+    # Commands with layers
+
+    def handle_layer_create(self, session, prio, node_id, parent_layer_id, data_type, count, custom_type):
+        """
+        Command layer_create
+        """
+        node = self.lookup(node_id)
+        if node is None or self.can_write(session, node) is False:
+            return False
+        node.last_layer_id += 1
+        layer = FakeLayer(node.last_layer_id, parent_layer_id, data_type, count, custom_type)
+        node.layers[layer.id] = layer
+        layer.subscribers.add(session)
+        args = (node_id, parent_layer_id, layer.id, data_type, count, custom_type)
+        self.broadcast(node, 'layer_create', args)
+        if session not in node.subscribers:
+            self.send(session, 'layer_create', args)
+
+    def handle_layer_destroy(self, session, prio, node_id, layer_id):
+        """
+        Command layer_destroy
+        """
+        node = self.lookup(node_id)
+        if node is None or layer_id not in node.layers or self.can_write(session, node) is False:
+            return False
+        del node.layers[layer_id]
+        self.broadcast(node, 'layer_destroy', (node_id, layer_id))
+
+    def handle_layer_subscribe(self, session, prio, node_id, layer_id, version=0, crc32=0):
+        """
+        Command layer_subscribe
+        """
+        layer = self.lookup(node_id, layer_id=layer_id)
+        if layer is None or self.can_read(session, self.nodes[node_id]) is False:
+            return False
+        layer.subscribers.add(session)
+        for item_id, value in sorted(layer.items.items()):
+            self.send(session, 'layer_set_value', (node_id, layer_id, item_id, value))
+
+    def handle_layer_unsubscribe(self, session, prio, node_id, layer_id, *args):
+        """
+        Command layer_unsubscribe
+        """
+        layer = self.lookup(node_id, layer_id=layer_id)
+        if layer is None:
+            return False
+        layer.subscribers.discard(session)
+
+    def handle_layer_set_value(self, session, prio, node_id, layer_id, item_id, data_type, value):
+        """
+        Command layer_set_value
+        """
+        layer = self.lookup(node_id, layer_id=layer_id)
+        if layer is None or self.can_write(session, self.nodes[node_id]) is False:
+            return False
+        layer.items[item_id] = tuple(value)
+        self.broadcast(layer, 'layer_set_value', (node_id, layer_id, item_id, tuple(value)), session)
+
+    def handle_layer_unset_value(self, session, prio, node_id, layer_id, item_id):
+        """
+        Command layer_unset_value
+        """
+        layer = self.lookup(node_id, layer_id=layer_id)
+        if layer is None or item_id not in layer.items or \
+                self.can_write(session, self.nodes[node_id]) is False:
+            return False
+        del layer.items[item_id]
+        self.broadcast(layer, 'layer_unset_value', (node_id, layer_id, item_id), session)
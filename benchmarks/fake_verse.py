@@ -0,0 +1,235 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements lightweight stand-in of Python module verse. Sent
+commands are counted and size of commands is estimated. Commands are
+handled by server object. The default server only confirms creating of
+nodes, tag groups, tags and layers, which is enough for one client.
+"""
+
+
+import collections
+import os
+import sys
+import time
+
+# Module traffic of io_verse does not depend on Blender, thus it is imported
+# without importing the add-on
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'io_verse'))
+from traffic import COMMAND_HEADER_SIZE, value_size
+
+
+# Names of commands, which could be sent and received
+COMMANDS = (
+    'connect_request', 'connect_accept', 'connect_terminate', 'user_authenticate', 'fps',
+    'node_create', 'node_destroy', 'node_subscribe', 'node_unsubscribe', 'node_link',
+    'node_perm', 'node_owner', 'node_lock', 'node_unlock', 'node_prio',
+    'taggroup_create', 'taggroup_destroy', 'taggroup_subscribe', 'taggroup_unsubscribe',
+    'tag_create', 'tag_destroy', 'tag_set_values',
+    'layer_create', 'layer_destroy', 'layer_subscribe', 'layer_unsubscribe',
+    'layer_set_value', 'layer_unset_value'
+)
+
+
+def command_size(args):
+    """
+    This function returns estimated size of command with arguments
+    """
+    return COMMAND_HEADER_SIZE + value_size(args)
+
+
+class VerseError(Exception):
+    """
+    Stand-in of verse.VerseError
+    """
+    pass
+
+
+class LoopbackServer(object):
+    """
+    Minimal server used by one client. It confirms creating of entities.
+    """
+
+    def __init__(self):
+        self.last_id = 65535
+        self.user_id = 1001
+        self.avatar_id = None
+
+    def new_id(self):
+        """
+        This method returns new unique ID
+        """
+        self.last_id += 1
+        return self.last_id
+
+    def connect(self, session):
+        """
+        This method is called, when new session is created
+        """
+        self.avatar_id = self.new_id()
+        session.deliver('connect_accept', (self.user_id, self.avatar_id))
+
+    def receive(self, session, command, args):
+        """
+        This method handles command sent by session
+        """
+        if command == 'node_create':
+            prio, custom_type = args
+            session.deliver('node_create', (self.new_id(), self.avatar_id, self.user_id, custom_type))
+        elif command == 'taggroup_create':
+            prio, node_id, custom_type = args
+            session.deliver('taggroup_create', (node_id, self.new_id() & 0xffff, custom_type))
+        elif command == 'tag_create':
+            prio, node_id, taggroup_id, data_type, count, custom_type = args
+            session.deliver('tag_create', (node_id, taggroup_id, self.new_id() & 0xffff,
+                                           data_type, count, custom_type))
+        elif command == 'layer_create':
+            prio, node_id, parent_layer_id, data_type, count, custom_type = args
+            session.deliver('layer_create', (node_id, parent_layer_id, self.new_id() & 0xffff,
+                                             data_type, count, custom_type))
+
+
+# Servers that sessions could connect to: (hostname, service) -> server
+SERVERS = {}
+
+
+def make_sender(command):
+    """
+    This function returns method sending command
+    """
+    def send(self, *args):
+        self.sent_commands[command] += 1
+        self.sent_bytes += command_size(args)
+        self.server.receive(self, command, args)
+    send.__name__ = 'send_' + command
+    return send
+
+
+class Session(object):
+    """
+    Stand-in of verse.Session
+    """
+
+    def __init__(self, hostname, service, flag):
+        self.hostname = hostname
+        self.service = service
+        self.sent_commands = collections.Counter()
+        self.sent_bytes = 0
+        self.received_commands = collections.Counter()
+        self.incoming = collections.deque()
+        self.server = SERVERS.get((hostname, service))
+        if self.server is None:
+            self.server = LoopbackServer()
+        self.server.connect(self)
+
+    def deliver(self, command, args, due=0.0):
+        """
+        This method adds command to the queue of incoming commands. Command
+        will not be received before due time (time.perf_counter()).
+        """
+        self.incoming.append((due, command, args))
+
+    def callback_update(self):
+        """
+        This method calls callback methods of all incoming commands
+        """
+        while len(self.incoming) > 0:
+            if self.incoming[0][0] > 0.0 and self.incoming[0][0] > time.perf_counter():
+                break
+            _due, command, args = self.incoming.popleft()
+            self.received_commands[command] += 1
+            callback = getattr(self, '_receive_' + command, None)
+            if callback is None:
+                callback = getattr(self, 'cb_receive_' + command, None)
+            if callback is not None:
+                callback(*args)
+
+    def reset_counters(self):
+        """
+        This method resets counters of sent commands and bytes
+        """
+        self.sent_commands.clear()
+        self.sent_bytes = 0
+        self.received_commands.clear()
+
+
+for _command in COMMANDS:
+    setattr(Session, 'send_' + _command, make_sender(_command))
+
+
+def set_debug_level(level):
+    """
+    Stand-in of verse.set_debug_level()
+    """
+    pass
+
+
+def set_client_info(name, version):
+    """
+    Stand-in of verse.set_client_info()
+    """
+    pass
+
+
+class Constants(object):
+    """
+    Unknown constants of verse module get unique integer values
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, name):
+        """
+        This method returns value of constant
+        """
+        return self.values.setdefault(name, 1000 + len(self.values))
+
+
+CONSTANTS = Constants()
+
+# Constants with known values
+DEFAULT_PRIORITY = 128
+ROOT_NODE_ID = 0
+AVATAR_PARENT_NODE_ID = 1
+USER_PARENT_NODE_ID = 2
+SCENE_PARENT_NODE_ID = 3
+PERM_NODE_READ = 1
+PERM_NODE_WRITE = 2
+VALUE_TYPE_UINT8 = 1
+VALUE_TYPE_UINT16 = 2
+VALUE_TYPE_UINT32 = 3
+VALUE_TYPE_UINT64 = 4
+VALUE_TYPE_REAL16 = 5
+VALUE_TYPE_REAL32 = 6
+VALUE_TYPE_REAL64 = 7
+VALUE_TYPE_STRING8 = 8
+
+
+def __getattr__(name):
+    """
+    Other constants are created, when they are needed
+    """
+    if name.isupper():
+        return CONSTANTS.get(name)
+    raise AttributeError(name)
+
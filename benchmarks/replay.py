@@ -0,0 +1,66 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+
+"""
+Replay of command log recorded in Blender (menu Verse > Record Commands)
+outside Blender. Received commands are fed to callback methods at maximal
+speed and the receive path is profiled. Example:
+
+    python3 benchmarks/replay.py session.vrsr --profile 30
+"""
+
+
+import argparse
+import cProfile
+import pstats
+
+import stubs
+
+
+io_verse = stubs.import_io_verse()
+
+import verse as vrs
+from io_verse import recorder
+from io_verse import session
+
+
+def main():
+    """
+    Parse arguments and replay command log
+    """
+    parser = argparse.ArgumentParser(description='Replay of recorded Verse commands')
+    parser.add_argument('log', help='log of recorded commands')
+    parser.add_argument('--profile', type=int, default=0, help='count of printed profiled functions')
+    args = parser.parse_args()
+
+    vrs_session = session.VerseSession('localhost', '12345', vrs.DGRAM_SEC_NONE)
+    profile = cProfile.Profile()
+    profile.enable()
+    count, seconds = recorder.replay(vrs_session, args.log)
+    profile.disable()
+    print('replayed %d commands in %.3f s (%.0f commands/s)' % (count, seconds, count / max(seconds, 1e-9)))
+    if args.profile > 0:
+        pstats.Stats(profile).sort_stats('cumulative').print_stats(args.profile)
+
+
+if __name__ == '__main__':
+    main()
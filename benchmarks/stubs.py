@@ -0,0 +1,237 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module installs lightweight stand-ins of modules bpy, bmesh, bgl, blf,
+mathutils, bpy_extras and verse, thus io_verse could be imported outside
+Blender. The stand-ins are used only by benchmarks and they are never
+installed, when real modules are available.
+"""
+
+
+import os
+import sys
+import types
+
+import fake_bmesh
+import fake_verse
+
+
+# Directory containing io_verse add-on
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def stub_init(self, *args, **kwargs):
+    """
+    Constructor of stand-in classes accepting any arguments
+    """
+    pass
+
+
+class AutoModule(types.ModuleType):
+    """
+    Module creating missing attributes on demand. Upper case names are
+    constants, capitalized names are classes and other names are functions
+    doing nothing.
+    """
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name.isupper():
+            value = 0
+        elif name[0].isupper():
+            value = type(name, (object,), {'__module__': self.__name__, '__init__': stub_init})
+        else:
+            def value(*args, **kwargs):
+                return None
+            value.__name__ = name
+        setattr(self, name, value)
+        return value
+
+
+class PropsModule(types.ModuleType):
+    """
+    Stand-in of bpy.props. Definition of property is replaced by default
+    value of the property, thus instances of Blender classes (e.g. add-on
+    preferences) have default values of their properties.
+    """
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        def value(*args, **kwargs):
+            return kwargs.get('default')
+        value.__name__ = name
+        setattr(self, name, value)
+        return value
+
+
+class PropCollection(list):
+    """
+    Stand-in of collection property of Blender data block
+    """
+
+    def add(self):
+        """
+        This method appends new item to the collection
+        """
+        item = types.SimpleNamespace()
+        self.append(item)
+        return item
+
+
+class SceneObjects(list):
+    """
+    Stand-in of objects linked to Blender scene
+    """
+
+    active = None
+
+    def link(self, obj):
+        """
+        This method links object to the scene
+        """
+        self.append(obj)
+
+    def unlink(self, obj):
+        """
+        This method unlinks object from the scene
+        """
+        if obj in self:
+            self.remove(obj)
+
+
+class Scene(object):
+    """
+    Stand-in of bpy.types.Scene with properties of io_verse
+    """
+
+    def __init__(self, name='Scene'):
+        """
+        Constructor of Scene
+        """
+        self.name = name
+        self.objects = SceneObjects()
+        self.subscribed = False
+        self.verse_node_id = -1
+        self.verse_data_node_id = -1
+        self.verse_server_hostname = ''
+        self.verse_server_service = ''
+        self.verse_scenes = PropCollection()
+        self.verse_objects = PropCollection()
+
+
+def location_3d_to_region_2d(region, rv3d, coord, default=None):
+    """
+    Stand-in of bpy_extras.view3d_utils.location_3d_to_region_2d()
+    """
+    return default
+
+
+def new_module(name, module_class=types.ModuleType, **attrs):
+    """
+    This function creates module and registers it in sys.modules
+    """
+    module = module_class(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install():
+    """
+    This function installs stand-ins of Blender modules and verse module
+    and it adds directory with io_verse to sys.path
+    """
+    if 'bpy' in sys.modules and not isinstance(sys.modules['bpy'], AutoModule):
+        raise RuntimeError('Stand-ins can not be installed inside Blender')
+
+    context = types.SimpleNamespace(
+        scene=Scene(),
+        window_manager=types.SimpleNamespace(verse_connected=False),
+        edit_object=None,
+        active_object=None,
+        selected_objects=[],
+        area=None
+    )
+    bpy = new_module(
+        'bpy',
+        AutoModule,
+        context=context,
+        data=types.SimpleNamespace(
+            meshes=fake_bmesh.IDCollection(fake_bmesh.Mesh),
+            objects=fake_bmesh.IDCollection(fake_bmesh.Object),
+            scenes={},
+            screens=[]
+        ),
+        types=new_module('bpy.types', AutoModule),
+        props=new_module('bpy.props', PropsModule),
+        utils=new_module('bpy.utils', AutoModule),
+        ops=new_module('bpy.ops', AutoModule),
+        app=new_module(
+            'bpy.app',
+            AutoModule,
+            version_string='stub',
+            handlers=types.SimpleNamespace(scene_update_post=[])
+        )
+    )
+    bpy.types.Mesh = fake_bmesh.Mesh
+
+    new_module(
+        'bmesh',
+        AutoModule,
+        new=fake_bmesh.new,
+        from_edit_mesh=fake_bmesh.from_edit_mesh,
+        ops=fake_bmesh.ops
+    )
+    new_module('mathutils', AutoModule, Vector=fake_bmesh.Vector)
+    new_module('bgl', AutoModule)
+    new_module('blf', AutoModule)
+    new_module('bpy_extras', AutoModule)
+    new_module(
+        'bpy_extras.view3d_utils',
+        AutoModule,
+        location_3d_to_region_2d=location_3d_to_region_2d
+    )
+    sys.modules['bpy_extras'].view3d_utils = sys.modules['bpy_extras.view3d_utils']
+    sys.modules['verse'] = fake_verse
+
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+
+
+def import_io_verse():
+    """
+    This function imports io_verse with stand-ins of Blender modules. Verse
+    entities (git submodule io_verse/vrsent) have to be checked out.
+    """
+    install()
+    vrsent_dir = os.path.join(REPO_DIR, 'io_verse', 'vrsent')
+    if not os.path.isdir(vrsent_dir) or len(os.listdir(vrsent_dir)) == 0:
+        raise RuntimeError('Verse entities are missing, run: git submodule update --init --recursive')
+    import io_verse
+    # Add-on preferences with default values
+    import bpy
+    bpy.context.user_preferences = types.SimpleNamespace(addons={
+        'io_verse': types.SimpleNamespace(preferences=io_verse.preferences.VerseAddonPreferences())})
+    return io_verse
@@ -0,0 +1,123 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Module with unit tests for fake_server module
+"""
+
+import fake_server
+import fake_verse
+
+
+def connect(server, count):
+    """
+    This function returns sessions connected to server and their avatar IDs
+    """
+    sessions = [fake_verse.Session(*server.address, flag=0) for _ in range(count)]
+    for session in sessions:
+        session.callback_update()
+    return sessions, [server.sessions[session] for session in sessions]
+
+
+def received(session, command):
+    """
+    This function returns arguments of commands waiting in queue of session
+    """
+    return [args for _due, name, args in session.incoming if name == command]
+
+
+def test_create_and_subscribe():
+    """
+    Test of sending nodes, tag groups, tags and layers to subscribers
+    """
+    server = fake_server.FakeServer().start()
+    (owner, other), (avatar_id, _other_avatar_id) = connect(server, 2)
+    owner.send_node_create(0, 200)
+    node_id = received(owner, 'node_create')[0][0]
+    assert received(owner, 'node_create')[0] == (node_id, avatar_id, server.users[owner], 200)
+    owner.send_node_link(0, fake_server.SCENE_PARENT_ID, node_id)
+    owner.send_layer_create(0, node_id, -1, fake_verse.VALUE_TYPE_REAL64, 3, 0)
+    layer_id = received(owner, 'layer_create')[0][2]
+    owner.send_layer_set_value(0, node_id, layer_id, 7, fake_verse.VALUE_TYPE_REAL64, (1.0, 2.0, 3.0))
+
+    other.send_node_subscribe(0, fake_server.SCENE_PARENT_ID)
+    assert (node_id, fake_server.SCENE_PARENT_ID, server.users[owner], 200) in received(other, 'node_create')
+    other.send_node_subscribe(0, node_id)
+    other.send_layer_subscribe(0, node_id, layer_id)
+    assert received(other, 'layer_set_value') == [(node_id, layer_id, 7, (1.0, 2.0, 3.0))]
+    server.stop()
+
+
+def test_echo_and_permissions():
+    """
+    Test of sending changes back to sender and dropping of forbidden commands
+    """
+    server = fake_server.FakeServer(echo=False).start()
+    (owner, other), _avatar_ids = connect(server, 2)
+    owner.send_node_create(0, 200)
+    node_id = received(owner, 'node_create')[0][0]
+    owner.send_taggroup_create(0, node_id, 0)
+    taggroup_id = received(owner, 'taggroup_create')[0][1]
+    owner.send_tag_create(0, node_id, taggroup_id, fake_verse.VALUE_TYPE_UINT32, 1, 0)
+    tag_id = received(owner, 'tag_create')[0][2]
+    other.send_node_subscribe(0, node_id)
+    other.send_taggroup_subscribe(0, node_id, taggroup_id)
+    owner.incoming.clear()
+    other.incoming.clear()
+
+    owner.send_tag_set_values(0, node_id, taggroup_id, tag_id, fake_verse.VALUE_TYPE_UINT32, (5,))
+    assert received(owner, 'tag_set_values') == []
+    assert received(other, 'tag_set_values') == [(node_id, taggroup_id, tag_id, (5,))]
+    # User of other session can only read the node
+    other.send_tag_set_values(0, node_id, taggroup_id, tag_id, fake_verse.VALUE_TYPE_UINT32, (6,))
+    assert server.dropped_commands == 1
+    assert server.nodes[node_id].taggroups[taggroup_id].tags[tag_id].value == (5,)
+    server.stop()
+
+
+def test_lock():
+    """
+    Test of locking node by one avatar and unlocking at disconnection
+    """
+    server = fake_server.FakeServer(default_perm=fake_verse.PERM_NODE_READ | fake_verse.PERM_NODE_WRITE).start()
+    (first, second), (first_avatar_id, _second_avatar_id) = connect(server, 2)
+    first.send_node_create(0, 200)
+    node_id = received(first, 'node_create')[0][0]
+    second.send_node_subscribe(0, node_id)
+    first.send_node_lock(0, node_id)
+    second.send_node_lock(0, node_id)
+    assert server.nodes[node_id].lock_avatar_id == first_avatar_id
+    assert server.dropped_commands == 1
+    second.incoming.clear()
+    first.send_connect_terminate()
+    assert received(second, 'node_unlock') == [(node_id, first_avatar_id)]
+    server.stop()
+
+
+def test_delay():
+    """
+    Test of delivering commands after simulated delay
+    """
+    server = fake_server.FakeServer(delay=60.0).start()
+    session = fake_verse.Session(*server.address, flag=0)
+    session.callback_update()
+    assert session.received_commands['connect_accept'] == 0
+    assert len(session.incoming) == 1
+    server.stop()
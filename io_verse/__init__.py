@@ -33,50 +33,30 @@ bl_info = {
     "category": "System"}
 
 
-import bpy
-import verse as vrs
-from . import session
-from . import connection
-from . import scene
-from . import ui_scene
-from . import avatar_view
-from . import ui_avatar_view
-from . import object3d
-from . import ui_object3d
-from . import mesh
 from . import ui
-from . import user
+from . import connection
+from . import preferences
+from . import engine
 
 
 def register():
     """
-    Call register methods in submodules 
+    Call register methods in submodules. Submodules of sync engine are
+    registered, when Blender connects to Verse server first time.
     """
+    preferences.register()
     ui.register()
-    session.register()
     connection.register()
-    ui_scene.register()
-    ui_avatar_view.register()
-    ui_object3d.register()
-    mesh.register()
 
 
 def unregister():
     """
     Call unregister methods in submodules
     """
-    ui.unregister()
-    session.unregister()
+    engine.unload()
     connection.unregister()
-    ui_scene.unregister()
-    ui_avatar_view.unregister()
-    ui_object3d.unregister()
-    mesh.unregister()
-
-
-# Print all debug messages
-vrs.set_debug_level(vrs.PRINT_DEBUG_MSG)
-vrs.set_client_info("Blender", bpy.app.version_string)
+    ui.unregister()
+    preferences.unregister()
 
 
 if __name__ == "__main__":
@@ -24,6 +24,7 @@ current view to active 3DView. Other Blender users sharing data at
 Verse server can also see, where you are and what you do.
 """
 
+import weakref
 import bpy
 import bgl
 import blf
@@ -32,6 +33,7 @@ import math
 import verse as vrs
 from .vrsent import vrsent
 from . import ui
+from . import profiling
 from bpy_extras.view3d_utils import location_3d_to_region_2d
 
 
@@ -273,8 +275,8 @@ class AvatarView(vrsent.VerseAvatar):
     # View of own avatar
     __my_view = None
 
-    # Dictionary of other avatar views of other users
-    __other_views = {}
+    # Dictionary of other avatar views of other users; nodes are owned by session
+    __other_views = weakref.WeakValueDictionary()
 
     # This is specific custom_type of Avatar
     custom_type = vrs.AVATAR_NODE_CT
@@ -293,6 +295,14 @@ class AvatarView(vrsent.VerseAvatar):
         """
         return cls.__other_views
 
+    @classmethod
+    def clear_views(cls):
+        """
+        This method forgets all avatar views, when Blender is disconnected
+        """
+        cls.__my_view = None
+        cls.__other_views.clear()
+
     def __init__(self, *args, **kwargs):
         """
         Constructor of AvatarView node
@@ -413,11 +423,12 @@ class AvatarView(vrsent.VerseAvatar):
                     wm.cur_verse_avatar_index -= 1
                 break
             index += 1
-        cls.__other_views.pop(node_id)
+        cls.__other_views.pop(node_id, None)
         # Force redraw of 3D view
         ui.update_all_views(('VIEW_3D',))
         return super(AvatarView, cls).cb_receive_node_destroy(session, node_id)
 
+    @profiling.measure()
     def update(self, context):
         """
         This method tries to update members according context
@@ -454,6 +465,7 @@ class AvatarView(vrsent.VerseAvatar):
         if context.area.height != self.height.value[0]:
             self.height.value = (context.area.height,)
 
+    @profiling.measure()
     def draw(self, context):
         """
         Draw avatar view in given context
@@ -0,0 +1,222 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements sharing of many Blender objects at Verse server.
+Objects are shared in steps called from timer operator. Only limited number
+of nodes can wait for confirmation from Verse server and geometry of all
+meshes is sent using one shared budget of items per step. Meshes are encoded
+in pool of worker processes, when it is possible.
+"""
+
+
+import collections
+import concurrent.futures
+import multiprocessing
+import os
+import runpy
+import sys
+import bpy
+from . import object3d
+from . import mesh
+from . import logger
+from .mesh_tools import mesh_encode
+
+
+# Maximal number of objects waiting for IDs of their nodes
+MAX_IN_FLIGHT = 32
+# Maximal number of vertices, edges and faces sent in one step
+ITEMS_PER_STEP = 20000
+
+# Pool of worker processes encoding meshes
+EXECUTOR = None
+
+
+def get_executor():
+    """
+    This function returns pool of worker processes. Worker processes are
+    spawned, not forked, because forked process would inherit state of
+    running Blender (OpenGL context, threads and socket of Verse session).
+    It returns None, when there can not be any worker process.
+    """
+    global EXECUTOR
+    if EXECUTOR is None:
+        context = multiprocessing.get_context('spawn')
+        # Executable of Blender 2.7x is not Python interpreter
+        context.set_executable(getattr(bpy.app, 'binary_path_python', sys.executable))
+        worker_init = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mesh_tools', 'worker_init.py')
+        try:
+            EXECUTOR = concurrent.futures.ProcessPoolExecutor(
+                mp_context=context, initializer=runpy.run_path, initargs=(worker_init,))
+        except NotImplementedError as exception:
+            logger.LOGGER.error('Pool of worker processes could not be created: %s', exception)
+    return EXECUTOR
+
+
+def shutdown_executor():
+    """
+    This function stops worker processes
+    """
+    global EXECUTOR
+    if EXECUTOR is not None:
+        EXECUTOR.shutdown(wait=False)
+        EXECUTOR = None
+
+
+class BulkShareJob(object):
+    """
+    Job sharing list of Blender objects at Verse server
+    """
+
+    def __init__(self, session, scene_data_node, objects, max_in_flight=MAX_IN_FLIGHT, items_per_step=ITEMS_PER_STEP):
+        """
+        Constructor of BulkShareJob
+        """
+        self.session = session
+        self.scene_data_node = scene_data_node
+        self.max_in_flight = max_in_flight
+        self.items_per_step = items_per_step
+        # Blender objects waiting for creating of nodes
+        self.waiting = collections.deque(objects)
+        # Pointers of all Blender objects shared by this job
+        self.objects = set(obj.as_pointer() for obj in objects)
+        # Meshes encoded in worker processes: pointer of mesh -> (future, list of objects)
+        self.encoding = {}
+        # Object nodes waiting for confirmation from Verse server
+        self.in_flight = []
+        # Mesh nodes with items waiting for sending
+        self.streaming = collections.deque()
+        self.count = len(self.waiting)
+        self.done = 0
+
+    def __str__(self):
+        """
+        This method returns string describing progress of the job
+        """
+        return 'Shared %d of %d objects' % (self.done, self.count)
+
+    def is_confirmed(self, object_node):
+        """
+        This method returns True, when object node and its mesh node
+        were created at Verse server
+        """
+        if object_node.id is None:
+            return False
+        mesh_node = object_node.mesh_node
+        return mesh_node is None or mesh_node.id is not None
+
+    @staticmethod
+    def is_not_shared(obj):
+        """
+        This method returns True, when object still exists and it was not shared
+        by other way in the meantime
+        """
+        try:
+            return obj.verse_node_id == -1
+        except ReferenceError:
+            return False
+
+    def start_encoding(self, obj):
+        """
+        This method starts encoding of mesh of the object in worker process.
+        It returns False, when there is no pool of worker processes.
+        """
+        mesh_pointer = obj.data.as_pointer()
+        if mesh_pointer in self.encoding:
+            self.encoding[mesh_pointer][1].append(obj)
+            return True
+        executor = get_executor()
+        if executor is None:
+            return False
+        future = executor.submit(mesh_encode.encode_mesh, *mesh.extract_mesh_arrays(obj.data))
+        self.encoding[mesh_pointer] = (future, [obj])
+        return True
+
+    def create_nodes(self, obj, encoded=None):
+        """
+        This method creates object node and mesh node of Blender object.
+        Linked duplicates use one mesh node.
+        """
+        object_node = object3d.VerseObject(
+            session=self.session,
+            parent=self.scene_data_node,
+            obj=obj
+        )
+        mesh_node = mesh.VerseMesh.find(obj.data)
+        if mesh_node is not None:
+            object_node.share_mesh_node(mesh_node)
+        else:
+            object_node.mesh_node = mesh.VerseMesh(
+                session=self.session,
+                parent=object_node,
+                mesh=obj.data,
+                autosubscribe=True,
+                stream=True,
+                encoded=encoded
+            )
+            self.streaming.append(object_node.mesh_node)
+        return object_node
+
+    def step(self):
+        """
+        This method does one step of the job. It returns True, when
+        the job is not finished yet.
+        """
+        # Remove confirmed nodes
+        in_flight = [node for node in self.in_flight if self.is_confirmed(node) is False]
+        self.done += len(self.in_flight) - len(in_flight)
+        self.in_flight = in_flight
+
+        # Create nodes of objects with encoded meshes
+        for mesh_pointer, (future, objects) in list(self.encoding.items()):
+            if future.done() is False:
+                continue
+            del self.encoding[mesh_pointer]
+            try:
+                encoded = future.result()
+            except Exception as exception:
+                # Mesh will be encoded in this process
+                logger.LOGGER.error('Mesh could not be encoded: %s', exception)
+                encoded = None
+            for obj in objects:
+                if self.is_not_shared(obj) is True:
+                    self.in_flight.append(self.create_nodes(obj, encoded))
+                else:
+                    self.count -= 1
+
+        # Start sharing of new objects, when there is free slot
+        while len(self.waiting) > 0 and \
+                len(self.in_flight) + len(self.encoding) < self.max_in_flight:
+            obj = self.waiting.popleft()
+            if self.is_not_shared(obj) is False:
+                self.count -= 1
+            elif mesh.VerseMesh.find(obj.data) is not None or \
+                    self.start_encoding(obj) is False:
+                self.in_flight.append(self.create_nodes(obj))
+
+        # Send geometry of meshes using shared budget
+        budget = self.items_per_step
+        while len(self.streaming) > 0 and budget > 0:
+            mesh_node = self.streaming[0]
+            budget -= mesh_node.send_pending_items(budget)
+            if mesh_node.pending_count == 0:
+                self.streaming.popleft()
+
+        return len(self.waiting) > 0 or len(self.encoding) > 0 or \
+            len(self.in_flight) > 0 or len(self.streaming) > 0
@@ -20,15 +20,14 @@
 """
 This module is used for connecting to Verse server. It adds some
 menu items and there are class operator definition for connect
-dialogs.
+dialogs. Sync engine is loaded, when Blender connects to Verse
+server first time.
 """
 
 
 import bpy
-import verse as vrs
-from .vrsent import vrsent
-from . import session
-from . import draw3d
+from . import engine
+from . import recorder
 
 
 class VerseAuthDialogOperator(bpy.types.Operator):
@@ -45,7 +44,8 @@ class VerseAuthDialogOperator(bpy.types.Operator):
         pass
 
     def execute(self, context):
-        vrs_session = session.VerseSession.instance()
+        import verse as vrs
+        vrs_session = engine.session_instance()
         if vrs_session is not None:
             vrs_session.my_username = self.dialog_username
             vrs_session.my_password = self.dialog_password
@@ -70,12 +70,8 @@ class VerseConnectDialogOperator(bpy.types.Operator):
     vrs_server_port = bpy.props.StringProperty(name="Port")
 
     def execute(self, context):
-        # Connect to Verse server
-        session.VerseSession(self.vrs_server_name, self.vrs_server_port, vrs.DGRAM_SEC_NONE)
-        # Start timer and callback function
-        bpy.ops.wm.modal_timer_operator()
-        # Add draw callback
-        draw3d.HANDLER = bpy.types.SpaceView3D.draw_handler_add(draw3d.draw3d_cb, (context,), 'WINDOW', 'POST_PIXEL')
+        # Load sync engine and connect to Verse server
+        engine.connect(self.vrs_server_name, self.vrs_server_port)
         return {'FINISHED'} 
 
     def invoke(self, context, event): 
@@ -93,8 +89,8 @@ class VerseClientDisconnect(bpy.types.Operator):
     
     @classmethod
     def poll(cls, context):
-        if session.VerseSession.instance() is not None:
-            state = session.VerseSession.instance().state
+        if engine.session_instance() is not None:
+            state = engine.session_instance().state
         else:
             return False
         if state == 'CONNECTING' or state == 'CONNECTED':
@@ -103,11 +99,8 @@ class VerseClientDisconnect(bpy.types.Operator):
             return False
     
     def execute(self, context):
-        vrs_session = session.VerseSession.instance()
-        # Send disconnect request to verse server
-        vrs_session.send_connect_terminate()
-        # Remove callback for 3d view
-        bpy.types.SpaceView3D.draw_handler_remove(draw3d.HANDLER, 'WINDOW')
+        # Send disconnect request to verse server and remove callback for 3d view
+        engine.disconnect()
         return {'FINISHED'}
 
 
@@ -121,8 +114,8 @@ class VerseClientConnect(bpy.types.Operator):
 
     @classmethod    
     def poll(cls, context):
-        if session.VerseSession.instance() is not None:
-            state = session.VerseSession.instance().state
+        if engine.session_instance() is not None:
+            state = engine.session_instance().state
         else:
             return True
         if state == 'DISCONNECTED':
@@ -139,6 +132,63 @@ class VerseClientConnect(bpy.types.Operator):
         return {'FINISHED'}
         
 
+class VerseRecordToggle(bpy.types.Operator):
+    """
+    This operator starts or stops recording of commands to binary log
+    """
+    bl_idname = "scene.verse_record_toggle"
+    bl_label = "Record Commands"
+    bl_description = "Start or stop recording of commands sent to and received from Verse server"
+
+    @classmethod
+    def poll(cls, context):
+        return engine.session_instance() is not None
+
+    def execute(self, context):
+        vrs_session = engine.session_instance()
+        if recorder.RECORDER is None:
+            log = recorder.start_recording(vrs_session, recorder.default_log_path())
+            self.report({'INFO'}, "Recording commands to " + log.path)
+        else:
+            self.report({'INFO'}, "Recorded %d commands" % recorder.RECORDER.count)
+            recorder.stop_recording(vrs_session)
+        return {'FINISHED'}
+
+
+class VerseReplay(bpy.types.Operator):
+    """
+    This operator replays received commands from binary log
+    """
+    bl_idname = "scene.verse_replay"
+    bl_label = "Replay Commands ..."
+    bl_description = "Feed commands received in recorded session to callback methods"
+
+    filepath = bpy.props.StringProperty(subtype='FILE_PATH')
+    max_speed = bpy.props.BoolProperty(
+        name="Maximal Speed",
+        default=False,
+        description="Replay commands as fast as possible instead of original speed"
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return engine.session_instance() is not None
+
+    def execute(self, context):
+        vrs_session = engine.session_instance()
+        try:
+            job = recorder.ReplayJob(vrs_session, self.filepath, self.max_speed)
+        except (OSError, ValueError) as err:
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+        vrs_session.jobs.append(job)
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
 class VerseMenu(bpy.types.Menu):
     """
     Main Verse menu (it contains Connect... and Disconnect...)
@@ -151,6 +201,12 @@ class VerseMenu(bpy.types.Menu):
 
         layout.operator("scene.verse_client_connect")
         layout.operator("scene.verse_client_disconnect")
+        layout.separator()
+        if recorder.RECORDER is None:
+            layout.operator("scene.verse_record_toggle")
+        else:
+            layout.operator("scene.verse_record_toggle", text="Stop Recording")
+        layout.operator("scene.verse_replay")
 
 
 def draw_item(self, context):
@@ -178,6 +234,8 @@ classes = (
     VerseConnectDialogOperator,
     VerseClientConnect,
     VerseClientDisconnect,
+    VerseRecordToggle,
+    VerseReplay,
     VerseMenu
 )
 
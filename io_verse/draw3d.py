@@ -26,11 +26,13 @@ import bpy
 from . import avatar_view
 from . import session
 from . import object3d
+from . import profiling
 
 # TODO: this should be in some class
 HANDLER = None
 
 
+@profiling.measure()
 def draw3d_cb(context):
     """
     This draw callback for io_verse Add-on is called, when view to 3D is
@@ -47,6 +49,7 @@ def draw3d_cb(context):
     # Draw all shared objects first
     for obj in object3d.VerseObject.objects.values():
         obj.draw(context)
+    profiling.count_items('draw3d_cb', len(object3d.VerseObject.objects))
 
     # If avatar view of this client doesn't exist yet, then try to 
     # get it
@@ -0,0 +1,138 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module loads sync engine of Add-on. Only menu entries, preferences and
+properties are registered, when Add-on is enabled. Verse module, drawing,
+mesh and scene modules are imported and registered, when Blender connects
+to Verse server first time.
+"""
+
+
+import importlib
+import logging
+import bpy
+from . import logger
+
+
+# Submodules of sync engine in order of registering
+MODULES = (
+    'session',
+    'ui_scene',
+    'ui_avatar_view',
+    'ui_object3d',
+    'mesh',
+    'ui_profiling'
+)
+
+# Is sync engine loaded
+LOADED = False
+
+
+def module(name):
+    """
+    This function returns submodule of Add-on with given name
+    """
+    return importlib.import_module('.' + name, __package__)
+
+
+def load():
+    """
+    This function imports and registers submodules of sync engine
+    """
+    global LOADED
+    if LOADED is True:
+        return
+    import verse as vrs
+    vrs.set_client_info("Blender", bpy.app.version_string)
+    for name in MODULES:
+        module(name).register()
+    LOADED = True
+    apply_log_level()
+
+
+def unload():
+    """
+    This function unregisters submodules of sync engine
+    """
+    global LOADED
+    if LOADED is False:
+        return
+    for name in reversed(MODULES):
+        module(name).unregister()
+    LOADED = False
+
+
+def session_instance():
+    """
+    This function returns current Verse session or None, when Blender is
+    not connected or sync engine is not loaded yet
+    """
+    if LOADED is False:
+        return None
+    return module('session').VerseSession.instance()
+
+
+def connect(hostname, service):
+    """
+    This function loads sync engine and connects to Verse server
+    """
+    load()
+    import verse as vrs
+    draw3d = module('draw3d')
+    # Connect to Verse server
+    module('session').VerseSession(hostname, service, vrs.DGRAM_SEC_NONE)
+    # Start timer and callback function
+    bpy.ops.wm.modal_timer_operator()
+    # Add draw callback
+    draw3d.HANDLER = bpy.types.SpaceView3D.draw_handler_add(
+        draw3d.draw3d_cb, (bpy.context,), 'WINDOW', 'POST_PIXEL')
+
+
+def disconnect():
+    """
+    This function sends request for disconnecting to Verse server
+    """
+    vrs_session = session_instance()
+    if vrs_session is None:
+        return
+    draw3d = module('draw3d')
+    # Send disconnect request to verse server
+    vrs_session.send_connect_terminate()
+    # Remove callback for 3d view
+    bpy.types.SpaceView3D.draw_handler_remove(draw3d.HANDLER, 'WINDOW')
+
+
+def apply_log_level():
+    """
+    This function sets level of debug messages of verse module and printing
+    of commands by Verse session according level of logger
+    """
+    if LOADED is False:
+        return
+    import verse as vrs
+    if logger.LOGGER.isEnabledFor(logging.DEBUG):
+        vrs.set_debug_level(vrs.PRINT_DEBUG_MSG)
+    elif logger.LOGGER.isEnabledFor(logging.WARNING):
+        vrs.set_debug_level(vrs.PRINT_WARNING)
+    else:
+        vrs.set_debug_level(vrs.PRINT_ERROR)
+    vrs_session = session_instance()
+    if vrs_session is not None:
+        vrs_session.debug_print = logger.is_debug()
@@ -0,0 +1,227 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements leases of locks of object nodes. Locks of newly
+selected objects are requested in one update of scene and requests are not
+repeated, until Verse server answers. Verse protocol has no command locking
+more nodes, thus one lock command is sent for each node. Deselected objects
+are unlocked after short grace period, thus selecting of the same object
+again does not send any command. When it is enabled in preferences, lock of
+object hovered by mouse cursor is requested in advance, but only when nobody
+else holds the object or its mesh.
+"""
+
+
+import time
+import weakref
+import mathutils
+from bpy_extras.view3d_utils import location_3d_to_region_2d
+
+
+# Seconds, after which lock of deselected object is released
+DEFAULT_LOCK_GRACE = 2.0
+
+# Lock is requested again, when Verse server does not answer in this
+# count of seconds
+LOCK_TIMEOUT = 1.0
+
+# Seconds, for which cursor has to stay above object, before lock of the
+# object is requested
+HOVER_DELAY = 0.3
+
+# Maximal distance of cursor from origin of hovered object in pixels
+HOVER_RADIUS = 20.0
+
+# Minimal period of searching for hovered object in seconds
+HOVER_PERIOD = 0.1
+
+
+def is_free(node):
+    """
+    This function returns True, when object node and its mesh node are not
+    locked by anybody and mesh is not edited in regions
+    """
+    if node.locked is True:
+        return False
+    mesh_node = node.mesh_node
+    return mesh_node is None or (mesh_node.locked is False and mesh_node.region_editing is False)
+
+
+def hovered_node(screen, mouse_x, mouse_y, nodes):
+    """
+    This function returns object node, which origin is the closest to the mouse
+    cursor in 3D View, or None, when no origin is close enough
+    """
+    for area in screen.areas:
+        if area.type != 'VIEW_3D':
+            continue
+        for region in area.regions:
+            if region.type != 'WINDOW' or \
+                    not region.x <= mouse_x < region.x + region.width or \
+                    not region.y <= mouse_y < region.y + region.height:
+                continue
+            region_3d = area.spaces.active.region_3d
+            cursor = mathutils.Vector((mouse_x - region.x, mouse_y - region.y))
+            closest, closest_distance = None, HOVER_RADIUS
+            for node in nodes:
+                if node.obj is None or node.obj.hide is True:
+                    continue
+                point = location_3d_to_region_2d(region, region_3d, node.obj.matrix_world.translation)
+                if point is None:
+                    continue
+                distance = (point - cursor).length
+                if distance < closest_distance:
+                    closest, closest_distance = node, distance
+            return closest
+    return None
+
+
+class LockManager(object):
+    """
+    Leases of locks of object nodes and their mesh nodes. It is long running
+    job of session, which releases expired leases and requests locks of
+    hovered objects.
+    """
+
+    # Lock manager of current session
+    instance = None
+
+    @classmethod
+    def get(cls, session):
+        """
+        This class method returns lock manager of session
+        """
+        manager = cls.instance
+        if manager is None or manager.session is not session:
+            manager = cls.instance = cls(session)
+        return manager
+
+    def __init__(self, session):
+        """
+        Constructor of LockManager
+        """
+        self.session = session
+        # Time of sending of lock requests not answered by Verse server yet
+        self.pending = weakref.WeakKeyDictionary()
+        # Expiration time of locks of nodes, which are not selected
+        self.leases = weakref.WeakKeyDictionary()
+        # Object node under mouse cursor and time, when cursor came to it
+        self.hovered = None
+        self.hover_time = 0.0
+        self.hover_check_time = 0.0
+        self.grace = DEFAULT_LOCK_GRACE
+
+    def schedule(self):
+        """
+        This method adds lock manager to long running jobs of session
+        """
+        if self not in self.session.jobs:
+            self.session.jobs.append(self)
+
+    def acquire(self, nodes, lease=False):
+        """
+        This method requests locks of object nodes (and their mesh nodes).
+        Lock is not requested again for node waiting for answer of Verse
+        server. When lease is True, then lock of node will be released after
+        grace period, unless node is selected. The method returns count of
+        nodes, which locks were requested.
+        """
+        now = time.time()
+        requested = []
+        for node in nodes:
+            if lease is False:
+                self.leases.pop(node, None)
+            if node.locked is True or now - self.pending.get(node, -LOCK_TIMEOUT) < LOCK_TIMEOUT:
+                continue
+            self.pending[node] = now
+            if lease is True:
+                self.leases[node] = now + self.grace
+            requested.append(node)
+        # Verse protocol can lock only one node by one command
+        for node in requested:
+            node.lock()
+            if node.mesh_node is not None:
+                node.mesh_node.lock()
+        if len(requested) > 0 or lease is True:
+            self.schedule()
+        return len(requested)
+
+    def keep(self, node):
+        """
+        This method cancels lease of selected node locked by this client
+        """
+        self.leases.pop(node, None)
+
+    def release(self, node):
+        """
+        This method starts lease of lock of deselected node. The node is
+        unlocked, when it is not selected again in grace period.
+        """
+        if node not in self.leases:
+            self.leases[node] = time.time() + self.grace
+            self.schedule()
+
+    def hover(self, screen, mouse_x, mouse_y, nodes):
+        """
+        This method remembers object node under mouse cursor. Lock of the node
+        is requested, when cursor stays above it for HOVER_DELAY seconds and
+        nobody else holds the node.
+        """
+        now = time.time()
+        if now - self.hover_check_time < HOVER_PERIOD:
+            return
+        self.hover_check_time = now
+        node = hovered_node(screen, mouse_x, mouse_y, nodes)
+        if node is not self.hovered:
+            self.hovered, self.hover_time = node, now
+            if node is not None:
+                self.schedule()
+
+    def step(self):
+        """
+        This method requests lock of hovered object and unlocks objects with
+        expired leases. It returns True, while there is some lease, pending
+        request or hovered object.
+        """
+        now = time.time()
+        # Answered requests
+        for node in list(self.pending.keys()):
+            if node.locked is True or now - self.pending[node] >= LOCK_TIMEOUT:
+                del self.pending[node]
+        # Prefetch lock of hovered object
+        hovered = self.hovered
+        if hovered is not None and now - self.hover_time >= HOVER_DELAY:
+            self.hovered = None
+            if hovered.obj is not None and hovered.can_be_selected is True and is_free(hovered) is True:
+                self.acquire((hovered,), lease=True)
+        # Release expired leases
+        for node, expiration in list(self.leases.items()):
+            if node.obj is None or node.obj.select is True or \
+                    (node.locked is True and node.locked_by_me is False):
+                del self.leases[node]
+            elif now >= expiration:
+                del self.leases[node]
+                if node.locked_by_me is True:
+                    node.unlock()
+                    if node.mesh_node is not None:
+                        node.mesh_node.unlock()
+        if len(self.pending) > 0 or len(self.leases) > 0 or self.hovered is not None:
+            return True
+        return False
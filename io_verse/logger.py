@@ -0,0 +1,120 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements logging of io_verse Add-on. Messages are formatted
+lazily: arguments are formatted only, when message is emitted. Emitted
+records are kept unformatted in ring buffer together with optional
+structured fields, e.g.:
+
+    logger.LOGGER.debug('Node %d created', node_id, extra={'fields': {'node_id': node_id}})
+
+Level of logger controls debug messages of verse module and printing of
+commands by Verse session too, when sync engine is loaded.
+"""
+
+
+import collections
+import logging
+
+
+# Count of records kept in ring buffer
+RING_SIZE = 1000
+
+LEVELS = (
+    ('DEBUG', "Debug", "Print all messages including every command"),
+    ('INFO', "Info", "Print information, warnings and errors"),
+    ('WARNING', "Warning", "Print only warnings and errors"),
+    ('ERROR', "Error", "Print only errors")
+)
+
+DEFAULT_LEVEL = 'WARNING'
+
+LOGGER = logging.getLogger('io_verse')
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Handler keeping last emitted records without formatting them
+    """
+
+    def __init__(self, capacity=RING_SIZE):
+        """
+        Constructor of RingBufferHandler
+        """
+        super(RingBufferHandler, self).__init__()
+        self.buffer = collections.deque(maxlen=capacity)
+
+    def emit(self, record):
+        """
+        This method stores record to ring buffer
+        """
+        self.buffer.append(record)
+
+    def records(self):
+        """
+        This method returns list of dictionaries with kept records
+        """
+        return [{
+            'time': record.created,
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'fields': getattr(record, 'fields', {})
+        } for record in self.buffer]
+
+    def clear(self):
+        """
+        This method removes all kept records
+        """
+        self.buffer.clear()
+
+
+RING_BUFFER = RingBufferHandler()
+
+
+def setup():
+    """
+    This function adds handlers to logger of Add-on
+    """
+    if len(LOGGER.handlers) == 0:
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter('io_verse %(levelname)s: %(message)s'))
+        LOGGER.addHandler(console)
+        LOGGER.addHandler(RING_BUFFER)
+        # Messages are not printed twice by root logger
+        LOGGER.propagate = False
+        set_level(DEFAULT_LEVEL)
+
+
+def set_level(level_name):
+    """
+    This function sets level of logger, level of debug messages of verse
+    module and printing of commands by Verse session
+    """
+    LOGGER.setLevel(getattr(logging, level_name))
+    # Module engine imports this module
+    from . import engine
+    engine.apply_log_level()
+
+
+def is_debug():
+    """
+    This function returns True, when debug messages are emitted
+    """
+    return LOGGER.isEnabledFor(logging.DEBUG)
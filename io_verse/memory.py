@@ -0,0 +1,104 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements teardown of nodes, when Blender is disconnected from
+Verse server, and estimation of memory used by nodes. Nodes are owned by
+session; registries of nodes in classes contain only weak references.
+"""
+
+
+import gc
+import sys
+from . import object3d
+from . import scene
+from . import avatar_view
+from . import mesh
+from .mesh_tools import columnar
+
+
+def teardown(session):
+    """
+    This function releases bmeshes, caches and references on Blender data
+    of all nodes and it clears dictionary of nodes and all registries
+    """
+    for node in list(session.nodes.values()):
+        release = getattr(node, 'release', None)
+        if release is not None:
+            release()
+    session.nodes.clear()
+    object3d.VerseObject.objects.clear()
+    object3d.VerseObject.waiting_for_mesh.clear()
+    scene.VerseScene.scenes.clear()
+    avatar_view.AvatarView.clear_views()
+    mesh.VerseMesh.meshes.clear()
+    # Nodes, tag groups, tags and layers reference each other
+    gc.collect()
+
+
+def value_footprint(value):
+    """
+    This function returns estimated count of bytes used by value
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+def dict_footprint(items):
+    """
+    This function returns estimated count of bytes used by dictionary with
+    keys and values
+    """
+    return sys.getsizeof(items) + sum(
+        sys.getsizeof(key) + value_footprint(value) for key, value in items.items())
+
+
+def node_footprint(node):
+    """
+    This function returns estimated count of bytes used by node, its tags,
+    items of layers, caches of Blender elements and hash trees
+    """
+    size = sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+    for taggroup in node.taggroups.values():
+        for tag in taggroup.tags.values():
+            size += value_footprint(tag.value)
+    for layer in node.layers.values():
+        if isinstance(layer.items, columnar.ColumnarStore):
+            size += layer.items.nbytes
+        else:
+            size += dict_footprint(layer.items)
+        id_cache = getattr(layer, 'id_cache', None)
+        if id_cache is not None:
+            size += dict_footprint(id_cache)
+    for tree in getattr(node, 'hash_trees', ()):
+        size += dict_footprint(tree.leaves) + sys.getsizeof(tree.item_hashes)
+    return size
+
+
+def memory_report(session):
+    """
+    This function returns list of tuples (node ID, name of class, estimated
+    count of bytes) sorted by count of bytes
+    """
+    rows = [(node_id, node.__class__.__name__, node_footprint(node))
+            for node_id, node in session.nodes.items()]
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows
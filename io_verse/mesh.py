@@ -22,6 +22,11 @@ This module implements sharing Blender meshes at Verse server
 """
 
 
+import array
+import itertools
+import random
+import time
+import weakref
 import bpy
 import blf
 import bgl
@@ -30,16 +35,165 @@ import bmesh
 from bpy_extras.view3d_utils import location_3d_to_region_2d
 import verse as vrs
 from .vrsent import vrsent
+from .mesh_tools import mesh_cache
+from .mesh_tools import merkle
+from .mesh_tools import mesh_encode
+from .mesh_tools import columnar
+from .mesh_tools import topology
+from .mesh_tools import id_alloc
+from .mesh_tools import affine
+from .mesh_tools import regions
 from . import object3d
+from . import profiling
+from . import logger
 
 
 VERSE_MESH_CT = 126
 LAYER_VERTEXES_CT = 0
 LAYER_EDGES_CT = 1
 LAYER_QUADS_CT = 2
+LAYER_HASHES_CT = 3
+LAYER_RESYNC_CT = 4
+LAYER_OPERATION_CT = 5
+LAYER_VERTEX_SETS_CT = 6
+LAYER_REGIONS_CT = 7
+LAYER_REGION_SLOTS_CT = 8
+# Information about mesh
+TG_INFO_CT = 0
+TAG_VERSION_CT = 0
+TAG_HASH_CT = 1
+TAG_EPOCH_CT = 2
+
+# Minimal period (seconds) of sending hashes of mesh layers
+HASH_PERIOD = 1.0
+
+# Minimal count of moved vertices sent as affine operation
+AFFINE_MIN_VERTICES = 64
+# Maximal error of vertex position (relative to size of coordinates) caused
+# by affine operation
+AFFINE_TOLERANCE = 1e-5
+# Positions of vertices of affine operation are sent, when the operation
+# was not used for this count of seconds
+OPERATION_IDLE = 1.0
+# Clients editing regions of one mesh allocate IDs of new items with this
+# stride and offset given by slot of client; it is also maximal count of
+# clients editing regions of one mesh
+REGION_ID_STRIDE = 16
+
+
+def extract_mesh_arrays(mesh):
+    """
+    This function returns flat arrays of vertex coordinates, edge vertices
+    and tessface vertices of Blender mesh. Arrays could be encoded in other
+    process, because they do not use Blender API.
+    """
+    mesh.update(calc_tessface=True)
+    coords = array.array('f', [0.0]) * (3 * len(mesh.vertices))
+    mesh.vertices.foreach_get('co', coords)
+    edge_vertices = array.array('i', [0]) * (2 * len(mesh.edges))
+    mesh.edges.foreach_get('vertices', edge_vertices)
+    face_vertices = array.array('i', [0]) * (4 * len(mesh.tessfaces))
+    mesh.tessfaces.foreach_get('vertices_raw', face_vertices)
+    return coords, edge_vertices, face_vertices
+
+
+def get_mesh_cache():
+    """
+    This function returns local cache of meshes
+    """
+    cache_dir = bpy.utils.user_resource('DATAFILES', path='verse_cache', create=True)
+    return mesh_cache.MeshCache(cache_dir)
+
+
+def save_mesh_cache(session):
+    """
+    This function stores all meshes with known version to the local cache. It
+    is called, when Blender is disconnected from Verse server.
+    """
+    cache = get_mesh_cache()
+    for node in session.nodes.values():
+        if isinstance(node, VerseMesh):
+            try:
+                node.save_to_cache(cache)
+            except OSError as err:
+                logger.LOGGER.error('Mesh node %d could not be cached: %s', node.id, err)
+
+
+class VerseLayerColumns(columnar.ColumnarStore):
+    """
+    Items of Verse layer stored in typed arrays instead of dictionary of
+    tuples. Items set or removed by this client are sent to Verse server.
+    """
+
+    def __init__(self, layer, data_type, count, typecode):
+        """
+        Constructor of VerseLayerColumns
+        """
+        super(VerseLayerColumns, self).__init__(count, typecode)
+        self.layer = layer
+        self.data_type = data_type
+
+    def is_received(self, item_id):
+        """
+        This method returns True, when the item is just being set or unset by
+        command received from Verse server
+        """
+        node = self.layer.node
+        received_item = getattr(node.session, 'received_item', None)
+        return received_item == (node.id, self.layer.id, item_id)
+
+    def store(self, item_id, value):
+        """
+        This method stores value of item without sending it to Verse server
+        """
+        super(VerseLayerColumns, self).__setitem__(item_id, value)
+
+    def __setitem__(self, item_id, value):
+        super(VerseLayerColumns, self).__setitem__(item_id, value)
+        node = self.layer.node
+        if self.layer.id is not None and self.is_received(item_id) is False:
+            node.session.send_layer_set_value(
+                node.prio, node.id, self.layer.id, item_id, self.data_type, value)
+
+    def __delitem__(self, item_id):
+        super(VerseLayerColumns, self).__delitem__(item_id)
+        node = self.layer.node
+        if self.layer.id is not None and self.is_received(item_id) is False:
+            node.session.send_layer_unset_value(node.prio, node.id, self.layer.id, item_id)
+
+
+class VerseLayerColumnsMixin(object):
+    """
+    Mixin of layers with items stored in VerseLayerColumns. Items set or
+    unset by received commands are not sent back to Verse server.
+    """
+
+    @classmethod
+    def cb_receive_layer_set_value(cls, session, node_id, layer_id, item_id, value):
+        """
+        This method is called, when new value of verse layer was set
+        """
+        session.received_item = (node_id, layer_id, item_id)
+        try:
+            return super(VerseLayerColumnsMixin, cls).cb_receive_layer_set_value(
+                session, node_id, layer_id, item_id, value)
+        finally:
+            session.received_item = None
+
+    @classmethod
+    def cb_receive_layer_unset_value(cls, session, node_id, layer_id, item_id):
+        """
+        This method is called, when value of verse layer was unset
+        """
+        session.received_item = (node_id, layer_id, item_id)
+        try:
+            return super(VerseLayerColumnsMixin, cls).cb_receive_layer_unset_value(
+                session, node_id, layer_id, item_id)
+        finally:
+            session.received_item = None
 
 
-class VerseVertices(vrsent.VerseLayer):
+class VerseVertices(VerseLayerColumnsMixin, vrsent.VerseLayer):
     """
     Custom VerseLayer subclass representing position of vertexes
     """
@@ -53,6 +207,7 @@ class VerseVertices(vrsent.VerseLayer):
         Constructor of VerseVertices
         """
         super(VerseVertices, self).__init__(node, parent_layer, layer_id, data_type, count, custom_type)
+        self.items = VerseLayerColumns(self, data_type, count, 'd')
         self.id_cache = {}
 
     def b3d_vertex(self, item_id):
@@ -102,26 +257,33 @@ class VerseVertices(vrsent.VerseLayer):
                 self.node.bmesh = bmesh.new()
                 self.node.bmesh.from_mesh(self.node.mesh)
                 self.node.clear_ID_cache()
+                # Some changes could be lost with old bmesh
+                self.node.suspect = True
         return self.node.bmesh
 
     @classmethod
+    @profiling.measure(items=1)
     def cb_receive_layer_set_value(cls, session, node_id, layer_id, item_id, value):
         """
         This method is called, when new value of verse layer was set
         """
         vert_layer = super(VerseVertices, cls).cb_receive_layer_set_value(session, node_id, layer_id, item_id, value)
 
-        # Update mesh only in situation, when it was changed by someone else
+        # Update hash of item received from Verse server
         if vert_layer.node.locked_by_me is False:
+            vert_layer.node.hash_trees[0].set_item(item_id, value)
+
+        # Update mesh only in situation, when it was changed by someone else
+        # and the value is not already loaded from local cache
+        if vert_layer.node.updates_b3d_mesh is True and \
+                vert_layer.node.cache_hit('vertices', item_id, value) is False:
 
             _bmesh = vert_layer.get_bmesh()
 
             b3d_vert = vert_layer.b3d_vertex(item_id)
 
-            # Try to update last vertex ID
-            if vert_layer.node.last_vert_ID is None or \
-                    vert_layer.node.last_vert_ID < item_id:
-                vert_layer.node.last_vert_ID = item_id
+            # ID of received vertex is used
+            vert_layer.node.id_allocators[0].reserve(item_id)
 
             if b3d_vert is not None:
                 # Update position
@@ -134,8 +296,7 @@ class VerseVertices(vrsent.VerseLayer):
                 b3d_vert[id_layer] = item_id
 
             # Update Blender mesh
-            _bmesh.to_mesh(vert_layer.node.mesh)
-            vert_layer.node.mesh.update()
+            vert_layer.node.update_b3d_mesh(_bmesh)
 
         return vert_layer
 
@@ -146,8 +307,13 @@ class VerseVertices(vrsent.VerseLayer):
         """
         vert_layer = super(VerseVertices, cls).cb_receive_layer_unset_value(session, node_id, layer_id, item_id)
 
-        # Update mesh only in situation, when it was changed by someone else
+        # Update hash of item removed at Verse server and free its ID
         if vert_layer.node.locked_by_me is False:
+            vert_layer.node.hash_trees[0].unset_item(item_id)
+            vert_layer.node.id_allocators[0].release(item_id)
+
+        # Update mesh only in situation, when it was changed by someone else
+        if vert_layer.node.updates_b3d_mesh is True:
 
             _bmesh = vert_layer.get_bmesh()
 
@@ -159,13 +325,12 @@ class VerseVertices(vrsent.VerseLayer):
                 vert_layer.id_cache.pop(item_id)
 
             # Update Blender mesh
-            _bmesh.to_mesh(vert_layer.node.mesh)
-            vert_layer.node.mesh.update()
+            vert_layer.node.update_b3d_mesh(_bmesh)
 
         return vert_layer
 
 
-class VerseEdges(vrsent.VerseLayer):
+class VerseEdges(VerseLayerColumnsMixin, vrsent.VerseLayer):
     """
     Custom VerseLayer subclass representing edges (indexes to vertexes)
     """
@@ -179,6 +344,7 @@ class VerseEdges(vrsent.VerseLayer):
         Constructor of VerseEdges
         """
         super(VerseEdges, self).__init__(node, parent_layer, layer_id, data_type, count, custom_type)
+        self.items = VerseLayerColumns(self, data_type, count, 'I')
         self.id_cache = {}
 
     def b3d_edge(self, item_id):
@@ -212,14 +378,21 @@ class VerseEdges(vrsent.VerseLayer):
             return b3d_edge
 
     @classmethod
+    @profiling.measure(items=1)
     def cb_receive_layer_set_value(cls, session, node_id, layer_id, item_id, value):
         """
         This method is called, when new value of verse layer was set
         """
         edge_layer = super(VerseEdges, cls).cb_receive_layer_set_value(session, node_id, layer_id, item_id, value)
 
-        # Update mesh only in situation, when it was changed by someone else
+        # Update hash of item received from Verse server
         if edge_layer.node.locked_by_me is False:
+            edge_layer.node.hash_trees[1].set_item(item_id, value)
+
+        # Update mesh only in situation, when it was changed by someone else
+        # and the value is not already loaded from local cache
+        if edge_layer.node.updates_b3d_mesh is True and \
+                edge_layer.node.cache_hit('edges', item_id, value) is False:
 
             vert_layer = edge_layer.node.vertices
             face_layer = edge_layer.node.quads
@@ -232,6 +405,8 @@ class VerseEdges(vrsent.VerseLayer):
                 try:
                     edge_layer.node.bmesh.edges
                 except ReferenceError:
+                    # Some changes could be lost with old bmesh
+                    edge_layer.node.suspect = True
                     edge_layer.node.bmesh = bmesh.new()
                     edge_layer.node.bmesh.from_mesh(edge_layer.node.mesh)
                     vert_layer.id_cache = {}
@@ -242,10 +417,8 @@ class VerseEdges(vrsent.VerseLayer):
 
             b3d_edge = edge_layer.b3d_edge(item_id)
 
-            # Try to update last vertex ID
-            if edge_layer.node.last_edge_ID is None or \
-                    edge_layer.node.last_edge_ID < item_id:
-                edge_layer.node.last_edge_ID = item_id
+            # ID of received edge is used
+            edge_layer.node.id_allocators[1].reserve(item_id)
 
             # Does edge with same id exist?
             if b3d_edge is not None:
@@ -263,8 +436,7 @@ class VerseEdges(vrsent.VerseLayer):
             b3d_edge[id_layer] = item_id
 
             # Update Blender mesh
-            _bmesh.to_mesh(edge_layer.node.mesh)
-            edge_layer.node.mesh.update()
+            edge_layer.node.update_b3d_mesh(_bmesh)
 
         return edge_layer
 
@@ -275,8 +447,12 @@ class VerseEdges(vrsent.VerseLayer):
         """
         edge_layer = super(VerseEdges, cls).cb_receive_layer_unset_value(session, node_id, layer_id, item_id)
 
-        # Update mesh only in situation, when it was changed by someone else
+        # Update hash of item removed at Verse server
         if edge_layer.node.locked_by_me is False:
+            edge_layer.node.hash_trees[1].unset_item(item_id)
+
+        # Update mesh only in situation, when it was changed by someone else
+        if edge_layer.node.updates_b3d_mesh is True:
 
             vert_layer = edge_layer.node.vertices
             face_layer = edge_layer.node.quads
@@ -289,6 +465,8 @@ class VerseEdges(vrsent.VerseLayer):
                 try:
                     edge_layer.node.bmesh.edges
                 except ReferenceError:
+                    # Some changes could be lost with old bmesh
+                    edge_layer.node.suspect = True
                     edge_layer.node.bmesh = bmesh.new()
                     edge_layer.node.bmesh.from_mesh(edge_layer.node.mesh)
                     vert_layer.id_cache = {}
@@ -299,10 +477,8 @@ class VerseEdges(vrsent.VerseLayer):
 
             b3d_edge = edge_layer.b3d_edge(item_id)
 
-            # Try to update last vertex ID
-            if edge_layer.node.last_vert_ID is None or \
-                    edge_layer.node.last_edge_ID < item_id:
-                edge_layer.node.last_edge_ID = item_id
+            # ID of removed edge could be used again
+            edge_layer.node.id_allocators[1].release(item_id)
 
             if b3d_edge is not None:
                 # Delete edge
@@ -313,14 +489,13 @@ class VerseEdges(vrsent.VerseLayer):
                     edge_layer.id_cache.pop(item_id)
                 else:
                     # Update Blender mesh
-                    _bmesh.to_mesh(edge_layer.node.mesh)
-                    edge_layer.node.mesh.update()
+                    edge_layer.node.update_b3d_mesh(_bmesh)
                     edge_layer.id_cache.pop(item_id)
 
         return edge_layer
 
 
-class VerseFaces(vrsent.VerseLayer):
+class VerseFaces(VerseLayerColumnsMixin, vrsent.VerseLayer):
     """
     Custom VerseLayer subclass representing tessellated faces (indexes to vertexes).
     Tessellated mesh contains only triangles and quads.
@@ -335,6 +510,7 @@ class VerseFaces(vrsent.VerseLayer):
         Constructor of VerseFaces
         """
         super(VerseFaces, self).__init__(node, parent_layer, layer_id, data_type, count, custom_type)
+        self.items = VerseLayerColumns(self, data_type, count, 'I')
         self.id_cache = {}
 
     def find_b3d_face(self, item_id):
@@ -368,14 +544,21 @@ class VerseFaces(vrsent.VerseLayer):
             return b3d_face
 
     @classmethod
+    @profiling.measure(items=1)
     def cb_receive_layer_set_value(cls, session, node_id, layer_id, item_id, value):
         """
         This method is called, when new value of verse layer was set
         """
         face_layer = super(VerseFaces, cls).cb_receive_layer_set_value(session, node_id, layer_id, item_id, value)
 
-        # Update mesh only in situation, when it was changed by someone else
+        # Update hash of item received from Verse server
         if face_layer.node.locked_by_me is False:
+            face_layer.node.hash_trees[2].set_item(item_id, value)
+
+        # Update mesh only in situation, when it was changed by someone else
+        # and the value is not already loaded from local cache
+        if face_layer.node.updates_b3d_mesh is True and \
+                face_layer.node.cache_hit('faces', item_id, value) is False:
 
             vert_layer = face_layer.node.vertices
             edge_layer = face_layer.node.edges
@@ -388,6 +571,8 @@ class VerseFaces(vrsent.VerseLayer):
                 try:
                     face_layer.node.bmesh.faces
                 except ReferenceError:
+                    # Some changes could be lost with old bmesh
+                    face_layer.node.suspect = True
                     face_layer.node.bmesh = bmesh.new()
                     face_layer.node.bmesh.from_mesh(face_layer.node.mesh)
                     vert_layer.id_cache = {}
@@ -412,18 +597,15 @@ class VerseFaces(vrsent.VerseLayer):
             else:
                 b3d_face = _bmesh.faces.new([vert_layer.b3d_vertex(vert_id) for vert_id in value])
 
-            # Try to update last face ID
-            if face_layer.node.last_face_ID is None or \
-                    face_layer.node.last_face_ID < item_id:
-                face_layer.node.last_face_ID = item_id
+            # ID of received face is used
+            face_layer.node.id_allocators[2].reserve(item_id)
 
             face_layer.id_cache[item_id] = b3d_face
             id_layer = _bmesh.faces.layers.int.get('FaceIDs')
             b3d_face[id_layer] = item_id
 
             # Update Blender mesh
-            _bmesh.to_mesh(face_layer.node.mesh)
-            face_layer.node.mesh.update()
+            face_layer.node.update_b3d_mesh(_bmesh)
 
         return face_layer
 
@@ -434,8 +616,13 @@ class VerseFaces(vrsent.VerseLayer):
         """
         face_layer = super(VerseFaces, cls).cb_receive_layer_unset_value(session, node_id, layer_id, item_id)
 
-        # Update mesh only in situation, when it was changed by someone else
+        # Update hash of item removed at Verse server and free its ID
         if face_layer.node.locked_by_me is False:
+            face_layer.node.hash_trees[2].unset_item(item_id)
+            face_layer.node.id_allocators[2].release(item_id)
+
+        # Update mesh only in situation, when it was changed by someone else
+        if face_layer.node.updates_b3d_mesh is True:
 
             vert_layer = face_layer.node.vertices
             edge_layer = face_layer.node.edges
@@ -448,6 +635,8 @@ class VerseFaces(vrsent.VerseLayer):
                 try:
                     face_layer.node.bmesh.faces
                 except ReferenceError:
+                    # Some changes could be lost with old bmesh
+                    face_layer.node.suspect = True
                     face_layer.node.bmesh = bmesh.new()
                     face_layer.node.bmesh.from_mesh(face_layer.node.mesh)
                     vert_layer.id_cache = {}
@@ -467,29 +656,358 @@ class VerseFaces(vrsent.VerseLayer):
                     face_layer.id_cache.pop(item_id)
                 else:
                     # Update Blender mesh
-                    _bmesh.to_mesh(face_layer.node.mesh)
-                    face_layer.node.mesh.update()
+                    face_layer.node.update_b3d_mesh(_bmesh)
                     # Update id_cache
                     face_layer.id_cache.pop(item_id)
 
         return face_layer
 
 
+class VerseMeshVersion(vrsent.VerseTag):
+    """
+    Custom VerseTag subclass representing version of mesh content. The value
+    is tuple (nonce, counter). Nonce is random number generated by client that
+    shared the mesh and counter is incremented with every change of mesh.
+    """
+
+    node_custom_type = VERSE_MESH_CT
+    tg_custom_type = TG_INFO_CT
+    custom_type = TAG_VERSION_CT
+
+    def __init__(self, tg, tag_id=None, data_type=vrs.VALUE_TYPE_UINT32,
+                 count=2, custom_type=TAG_VERSION_CT, value=None):
+        """
+        Constructor of VerseMeshVersion
+        """
+        super(VerseMeshVersion, self).__init__(tg, tag_id, data_type, count, custom_type, value)
+
+    @classmethod
+    def cb_receive_tag_set_values(cls, session, node_id, tg_id, tag_id, value):
+        """
+        This method is called, when version of mesh was changed. It tries to
+        load content of mesh from local cache, when cached version is equal
+        to received version.
+        """
+        tag = super(VerseMeshVersion, cls).cb_receive_tag_set_values(session, node_id, tg_id, tag_id, value)
+        mesh_node = tag.tg.node
+        if mesh_node.locked_by_me is False:
+            mesh_node.warm_start(tuple(value))
+        return tag
+
+
+class VerseMeshHash(vrsent.VerseTag):
+    """
+    Custom VerseTag subclass representing root hashes of vertices, edges
+    and faces. It is used for detection of inconsistency of mesh.
+    """
+
+    node_custom_type = VERSE_MESH_CT
+    tg_custom_type = TG_INFO_CT
+    custom_type = TAG_HASH_CT
+
+    def __init__(self, tg, tag_id=None, data_type=vrs.VALUE_TYPE_UINT32,
+                 count=3, custom_type=TAG_HASH_CT, value=None):
+        """
+        Constructor of VerseMeshHash
+        """
+        super(VerseMeshHash, self).__init__(tg, tag_id, data_type, count, custom_type, value)
+
+    @classmethod
+    def cb_receive_tag_set_values(cls, session, node_id, tg_id, tag_id, value):
+        """
+        This method is called, when client sharing mesh published new hashes.
+        All items changed before sending hashes were already received.
+        """
+        tag = super(VerseMeshHash, cls).cb_receive_tag_set_values(session, node_id, tg_id, tag_id, value)
+        mesh_node = tag.tg.node
+        if mesh_node.locked_by_me is False:
+            mesh_node.check_consistency()
+        return tag
+
+
+class VerseMeshEpoch(vrsent.VerseTag):
+    """
+    Custom VerseTag subclass representing epoch of IDs of vertices, edges and
+    faces. The value is tuple (epoch, state). Client editing the mesh sets
+    state to 1 before it renumbers items and it sets state to 0 with new epoch,
+    when all renumbered items were sent.
+    """
+
+    node_custom_type = VERSE_MESH_CT
+    tg_custom_type = TG_INFO_CT
+    custom_type = TAG_EPOCH_CT
+
+    def __init__(self, tg, tag_id=None, data_type=vrs.VALUE_TYPE_UINT32,
+                 count=2, custom_type=TAG_EPOCH_CT, value=None):
+        """
+        Constructor of VerseMeshEpoch
+        """
+        super(VerseMeshEpoch, self).__init__(tg, tag_id, data_type, count, custom_type, value)
+
+    @classmethod
+    def cb_receive_tag_set_values(cls, session, node_id, tg_id, tag_id, value):
+        """
+        This method is called, when client editing the mesh started or finished
+        compaction of IDs. Renumbered items are not applied to Blender mesh
+        one by one, but Blender mesh is repaired, when compaction is finished.
+        """
+        tag = super(VerseMeshEpoch, cls).cb_receive_tag_set_values(session, node_id, tg_id, tag_id, value)
+        mesh_node = tag.tg.node
+        if mesh_node.locked_by_me is False:
+            if value[1] == 1:
+                mesh_node.compacting = True
+            elif mesh_node.compacting is True:
+                mesh_node.compacting = False
+                mesh_node.vertex_operation = None
+                mesh_node.clear_ID_cache()
+                mesh_node.reset_id_allocators()
+                if mesh_node.mesh is not None:
+                    mesh_node.suspect = True
+                    mesh_node.repair_b3d_mesh()
+        return tag
+
+
+class VerseMeshHashes(vrsent.VerseLayer):
+    """
+    Custom VerseLayer subclass representing hashes of buckets of vertices,
+    edges and faces. Item ID is index of bucket.
+    """
+
+    node_custom_type = VERSE_MESH_CT
+    custom_type = LAYER_HASHES_CT
+
+    def __init__(self, node, parent_layer=None, layer_id=None, data_type=vrs.VALUE_TYPE_UINT32,
+                 count=3, custom_type=LAYER_HASHES_CT):
+        """
+        Constructor of VerseMeshHashes
+        """
+        super(VerseMeshHashes, self).__init__(node, parent_layer, layer_id, data_type, count, custom_type)
+
+
+class VerseMeshResync(vrsent.VerseLayer):
+    """
+    Custom VerseLayer subclass with requests for sending buckets of items
+    again. Item ID is index of bucket and value is (layer index, counter).
+    """
+
+    node_custom_type = VERSE_MESH_CT
+    custom_type = LAYER_RESYNC_CT
+
+    def __init__(self, node, parent_layer=None, layer_id=None, data_type=vrs.VALUE_TYPE_UINT32,
+                 count=2, custom_type=LAYER_RESYNC_CT):
+        """
+        Constructor of VerseMeshResync
+        """
+        super(VerseMeshResync, self).__init__(node, parent_layer, layer_id, data_type, count, custom_type)
+        self.counter = 0
+
+    @classmethod
+    @profiling.measure(items=1)
+    def cb_receive_layer_set_value(cls, session, node_id, layer_id, item_id, value):
+        """
+        This method is called, when some client requested resending of bucket.
+        Client editing the mesh answers the request. When nobody edits the
+        mesh, then every client with the same hash of bucket as published
+        hash answers the request.
+        """
+        resync_layer = super(VerseMeshResync, cls).cb_receive_layer_set_value(
+            session, node_id, layer_id, item_id, value)
+        if resync_layer.node.can_resend_bucket(value[0], item_id) is True:
+            resync_layer.node.resend_bucket(value[0], item_id)
+        return resync_layer
+
+
+class VerseMeshOperation(vrsent.VerseLayer):
+    """
+    Custom VerseLayer subclass representing affine transformation of set of
+    vertices. Items 0, 1 and 2 are rows of 3x4 matrix and item 3 is (set ID,
+    sequence, 0, 0). Setting of item 3 applies the transformation to original
+    positions of vertices of the set.
+    """
+
+    node_custom_type = VERSE_MESH_CT
+    custom_type = LAYER_OPERATION_CT
+
+    def __init__(self, node, parent_layer=None, layer_id=None, data_type=vrs.VALUE_TYPE_REAL64,
+                 count=4, custom_type=LAYER_OPERATION_CT):
+        """
+        Constructor of VerseMeshOperation
+        """
+        super(VerseMeshOperation, self).__init__(node, parent_layer, layer_id, data_type, count, custom_type)
+
+    @classmethod
+    @profiling.measure(items=1)
+    def cb_receive_layer_set_value(cls, session, node_id, layer_id, item_id, value):
+        """
+        This method is called, when client editing the mesh sent rows of
+        matrix or applied the transformation
+        """
+        operation_layer = super(VerseMeshOperation, cls).cb_receive_layer_set_value(
+            session, node_id, layer_id, item_id, value)
+        if item_id == 3 and operation_layer.node.locked_by_me is False:
+            operation_layer.node.apply_vertex_operation(int(value[0]))
+        return operation_layer
+
+
+class VerseVertexSets(VerseLayerColumnsMixin, vrsent.VerseLayer):
+    """
+    Custom VerseLayer subclass representing membership of vertices in sets
+    transformed by affine operations. Item ID is ID of vertex and value is
+    ID of set.
+    """
+
+    node_custom_type = VERSE_MESH_CT
+    custom_type = LAYER_VERTEX_SETS_CT
+
+    def __init__(self, node, parent_layer=None, layer_id=None, data_type=vrs.VALUE_TYPE_UINT32,
+                 count=1, custom_type=LAYER_VERTEX_SETS_CT):
+        """
+        Constructor of VerseVertexSets
+        """
+        super(VerseVertexSets, self).__init__(node, parent_layer, layer_id, data_type, count, custom_type)
+        self.items = VerseLayerColumns(self, data_type, count, 'I')
+
+
+class VerseMeshRegions(vrsent.VerseLayer):
+    """
+    Custom VerseLayer subclass with owners of regions of mesh. Item ID is ID
+    of spatial cell (see module regions) and value is ID of avatar, which
+    locked the region. Mesh is edited in regions, while this layer is not
+    empty.
+    """
+
+    node_custom_type = VERSE_MESH_CT
+    custom_type = LAYER_REGIONS_CT
+
+    def __init__(self, node, parent_layer=None, layer_id=None, data_type=vrs.VALUE_TYPE_UINT32,
+                 count=1, custom_type=LAYER_REGIONS_CT):
+        """
+        Constructor of VerseMeshRegions
+        """
+        super(VerseMeshRegions, self).__init__(node, parent_layer, layer_id, data_type, count, custom_type)
+
+    @classmethod
+    def cb_receive_layer_set_value(cls, session, node_id, layer_id, item_id, value):
+        """
+        This method is called, when some client locked region of mesh
+        """
+        regions_layer = super(VerseMeshRegions, cls).cb_receive_layer_set_value(
+            session, node_id, layer_id, item_id, value)
+        mesh_node = regions_layer.node
+        winner = mesh_node.region_claims.receive(item_id, value[0], session.avatar_id)
+        if winner is not None:
+            regions_layer.items[item_id] = (winner,)
+        mesh_node.update_region_editing()
+        return regions_layer
+
+    @classmethod
+    def cb_receive_layer_unset_value(cls, session, node_id, layer_id, item_id):
+        """
+        This method is called, when some client unlocked region of mesh
+        """
+        regions_layer = super(VerseMeshRegions, cls).cb_receive_layer_unset_value(
+            session, node_id, layer_id, item_id)
+        regions_layer.node.region_claims.remove(item_id)
+        regions_layer.node.update_region_editing()
+        return regions_layer
+
+
+class VerseMeshRegionSlots(vrsent.VerseLayer):
+    """
+    Custom VerseLayer subclass with slots of clients editing regions of mesh.
+    Item ID is slot and value is ID of avatar. Slot is unique for every
+    client and it is used as offset of IDs of new vertices, edges and faces.
+    """
+
+    node_custom_type = VERSE_MESH_CT
+    custom_type = LAYER_REGION_SLOTS_CT
+
+    def __init__(self, node, parent_layer=None, layer_id=None, data_type=vrs.VALUE_TYPE_UINT32,
+                 count=1, custom_type=LAYER_REGION_SLOTS_CT):
+        """
+        Constructor of VerseMeshRegionSlots
+        """
+        super(VerseMeshRegionSlots, self).__init__(node, parent_layer, layer_id, data_type, count, custom_type)
+
+    @classmethod
+    def cb_receive_layer_set_value(cls, session, node_id, layer_id, item_id, value):
+        """
+        This method is called, when some client took slot
+        """
+        slots_layer = super(VerseMeshRegionSlots, cls).cb_receive_layer_set_value(
+            session, node_id, layer_id, item_id, value)
+        mesh_node = slots_layer.node
+        winner = mesh_node.slot_claims.receive(item_id, value[0], session.avatar_id)
+        if winner is not None:
+            slots_layer.items[item_id] = (winner,)
+        mesh_node.update_region_slot()
+        return slots_layer
+
+    @classmethod
+    def cb_receive_layer_unset_value(cls, session, node_id, layer_id, item_id):
+        """
+        This method is called, when some client released slot
+        """
+        slots_layer = super(VerseMeshRegionSlots, cls).cb_receive_layer_unset_value(
+            session, node_id, layer_id, item_id)
+        slots_layer.node.slot_claims.remove(item_id)
+        slots_layer.node.update_region_slot()
+        return slots_layer
+
+
+class VertexOperationJob(object):
+    """
+    Job finishing affine operation sent by this client, when it was not used
+    for OPERATION_IDLE seconds. Exact positions of vertices are sent, even
+    when Blender does not report any change of the mesh.
+    """
+
+    def __init__(self, mesh_node, operation):
+        """
+        Constructor of VertexOperationJob
+        """
+        self.mesh_node = mesh_node
+        self.operation = operation
+
+    def step(self):
+        """
+        This method returns False, when the operation was finished
+        """
+        mesh_node = self.mesh_node
+        if mesh_node.vertex_operation is not self.operation:
+            return False
+        if mesh_node.flush_vertex_operation(idle=OPERATION_IDLE) is True:
+            mesh_node.bump_version()
+            mesh_node.send_hashes(force=True)
+            return False
+        return True
+
+
 class VerseMesh(vrsent.VerseNode):
     """
     Custom VerseNode subclass representing Blender mesh data structure
     """
 
     custom_type = VERSE_MESH_CT
-    
+
+    # Dictionary of mesh nodes indexed by pointer of Blender mesh; nodes are
+    # owned by session
+    meshes = weakref.WeakValueDictionary()
+
     def __init__(self, session, node_id=None, parent=None, user_id=None, custom_type=VERSE_MESH_CT,
-                 mesh=None, autosubscribe=False):
+                 mesh=None, autosubscribe=False, stream=False, encoded=None):
         """
         Constructor of VerseMesh
+        :stream: when it is True, then items of mesh are not sent at once, but
+        they are sent in small parts using method send_pending_items()
+        :encoded: mesh encoded in advance (EncodedMesh) or None, when mesh
+        should be encoded now
         """
         super(VerseMesh, self).__init__(session, node_id, parent, user_id, custom_type)
 
         self.mesh = mesh
+        # Other objects using this mesh (linked duplicates) waiting for ID of this node
+        self.linked_objects = []
         self.vertices = VerseVertices(node=self)
         self.edges = VerseEdges(node=self)
         self.quads = VerseFaces(node=self)
@@ -497,41 +1015,283 @@ class VerseMesh(vrsent.VerseNode):
         self.bmesh = None
         self.bm_from_edit_mesh = False
         self.cache = None
-        self.last_vert_ID = None
-        self.last_edge_ID = None
-        self.last_face_ID = None
+        # Allocators of IDs of vertices, edges and faces
+        self.id_allocators = (id_alloc.IdAllocator(), id_alloc.IdAllocator(), id_alloc.IdAllocator())
+        self.cached = None
+        self.changed = False
+        # IDs of items are renumbered by client editing the mesh
+        self.compacting = False
+        self.info = vrsent.VerseTagGroup(node=self, custom_type=TG_INFO_CT)
+        self.hashes = VerseMeshHashes(node=self)
+        self.resync = VerseMeshResync(node=self)
+        self.operation = VerseMeshOperation(node=self)
+        self.vertex_sets = VerseVertexSets(node=self)
+        self.regions = VerseMeshRegions(node=self)
+        self.region_slots = VerseMeshRegionSlots(node=self)
+        self.cell_size = regions.DEFAULT_CELL_SIZE
+        # Mesh is edited in regions by more clients
+        self.region_editing = False
+        # Locks of regions and slot of this client confirmed by Verse server
+        self.region_claims = regions.Claims()
+        self.slot_claims = regions.Claims()
+        self.region_slot = None
+        # Current affine operation (AffineOperation) sent or received
+        self.vertex_operation = None
+        # Hash trees of vertices, edges and faces
+        self.hash_trees = (merkle.RangeHashTree(), merkle.RangeHashTree(), merkle.RangeHashTree())
+        self.dirty_buckets = set()
+        self.hashes_time = 0.0
+        # Blender mesh could be inconsistent with Verse layers
+        self.suspect = False
+        # Iterator of items (layer index, item ID, value) waiting for sending
+        self.pending_items = iter(())
+        self.pending_count = 0
 
         if self.mesh is not None:
+            self.__class__.meshes[self.mesh.as_pointer()] = self
+            self.info.version = VerseMeshVersion(
+                tg=self.info,
+                value=(random.getrandbits(32), 0))
+            if encoded is None:
+                encoded = mesh_encode.encode_mesh(*extract_mesh_arrays(self.mesh))
+            # Hashes of items are known before sending of items
+            self.hash_trees = tuple(
+                merkle.RangeHashTree.from_hashes(hashes, leaves)
+                for hashes, leaves in zip(encoded.hashes, encoded.leaves))
+            for tree in self.hash_trees:
+                self.dirty_buckets.update(tree.leaves.keys())
+            self.pending_items = encoded.items()
+            self.pending_count = len(encoded)
+
             # TODO: make following code working in edit mode too
-            self.mesh.update(calc_tessface=True)
             self.bmesh = bmesh.new()
             self.bmesh.from_mesh(self.mesh)
-            # TODO: do not do it in this way for huge mesh (do not send whole mesh), but use
-            # vrs.get to get free space in outgoing queue.
-
-            # Send all Vertices
-            for vert in mesh.vertices:
-                self.vertices.items[vert.index] = tuple(vert.co)
-            # Send all Edges
-            for edge in mesh.edges:
-                self.edges.items[edge.index] = (edge.vertices[0], edge.vertices[1])
-            # Send all Faces
-            for face in mesh.tessfaces:
-                if len(face.vertices) == 3:
-                    self.quads.items[face.index] = (face.vertices[0], face.vertices[1], face.vertices[2], 0)
-                else:
-                    self.quads.items[face.index] = tuple(vert for vert in face.vertices)
 
             # Create blender layers storing Verse IDs of vertices, edges and faces
-            self.last_vert_ID = self.__create_bpy_layer_ids('verts', 'VertIDs')
-            self.last_edge_ID = self.__create_bpy_layer_ids('edges', 'EdgeIDs')
-            self.last_face_ID = self.__create_bpy_layer_ids('faces', 'FaceIDs')
+            for allocator, elems_name, layer_name in zip(
+                    self.id_allocators, ('verts', 'edges', 'faces'), ('VertIDs', 'EdgeIDs', 'FaceIDs')):
+                allocator.reset(range(self.__create_bpy_layer_ids(elems_name, layer_name)))
 
             # Safe blender layers containing IDs to original mesh
             self.bmesh.to_mesh(self.mesh)
             self.bmesh.free()
             self.bmesh = None
 
+            self.info.hash = VerseMeshHash(tg=self.info)
+            self.info.epoch = VerseMeshEpoch(tg=self.info, value=(0, 0))
+            if stream is False:
+                self.send_pending_items()
+        else:
+            self.info.version = VerseMeshVersion(tg=self.info)
+            self.info.hash = VerseMeshHash(tg=self.info)
+            self.info.epoch = VerseMeshEpoch(tg=self.info)
+
+    @classmethod
+    def find(cls, mesh):
+        """
+        This method returns mesh node of Blender mesh, when the mesh is
+        already shared. Otherwise it returns None.
+        """
+        return cls.meshes.get(mesh.as_pointer())
+
+    @property
+    def layers_of_items(self):
+        """
+        Tuple of layers with vertices, edges and faces
+        """
+        return self.vertices, self.edges, self.quads
+
+    @property
+    def updates_b3d_mesh(self):
+        """
+        Received items are applied to Blender mesh, when the mesh is edited
+        by someone else or in regions and IDs of items are not being renumbered
+        """
+        return (self.locked_by_me is False or self.region_editing is True) and self.compacting is False
+
+    @property
+    def owned_cells(self):
+        """
+        Set of IDs of cells of regions locked by this client and confirmed
+        by Verse server
+        """
+        owners = dict((cell, owner[0]) for cell, owner in self.regions.items.items())
+        return self.region_claims.owned(owners, self.session.avatar_id)
+
+    def lock_regions(self, cells):
+        """
+        This method requests locks of regions of mesh given by IDs of cells.
+        Regions locked by other clients are skipped. Region is owned by this
+        client, when Verse server confirms the lock. The method returns list
+        of requested cells.
+        """
+        avatar_id = self.session.avatar_id
+        requested = []
+        for cell in cells:
+            owner = self.regions.items.get(cell)
+            if owner is None:
+                self.region_claims.request(cell)
+                self.regions.items[cell] = (avatar_id,)
+            elif owner[0] != avatar_id:
+                continue
+            requested.append(cell)
+        if self.region_slot is None and len(self.slot_claims.requested) == 0:
+            self.request_region_slot()
+        self.update_region_editing()
+        return requested
+
+    def unlock_regions(self, cells=None):
+        """
+        This method unlocks regions of mesh locked by this client. When cells
+        is None, then all regions of this client are unlocked and slot of this
+        client is released.
+        """
+        avatar_id = self.session.avatar_id
+        mine = set(cell for cell, owner in self.regions.items.items() if owner[0] == avatar_id)
+        for cell in (mine if cells is None else mine.intersection(cells)):
+            self.regions.items.pop(cell)
+            self.region_claims.remove(cell)
+        if cells is None and self.region_slot is not None:
+            self.region_slots.items.pop(self.region_slot)
+            self.slot_claims.remove(self.region_slot)
+        self.update_region_editing()
+        self.update_region_slot()
+
+    def request_region_slot(self):
+        """
+        This method requests the lowest free slot of client editing regions.
+        It returns False, when all slots are used.
+        """
+        for slot in range(REGION_ID_STRIDE):
+            if slot not in self.region_slots.items and slot not in self.slot_claims.lost:
+                self.slot_claims.request(slot)
+                self.region_slots.items[slot] = (self.session.avatar_id,)
+                return True
+        logger.LOGGER.error('All slots of clients editing regions of mesh are used',
+                            extra={'fields': {'node_id': self.id}})
+        return False
+
+    def update_region_slot(self):
+        """
+        This method sets offset of allocated IDs according to slot confirmed by
+        Verse server. When slot was taken by other client, then other slot
+        is requested.
+        """
+        owners = dict((slot, owner[0]) for slot, owner in self.region_slots.items.items())
+        slots = self.slot_claims.owned(owners, self.session.avatar_id)
+        region_slot = min(slots) if len(slots) > 0 else None
+        if region_slot == self.region_slot:
+            if region_slot is None and len(self.slot_claims.requested) == 0 and \
+                    len(self.region_claims.requested) + len(self.region_claims.confirmed) > 0:
+                self.request_region_slot()
+            return
+        self.region_slot = region_slot
+        if region_slot is not None and self.region_editing is True:
+            self.reset_id_allocators(stride=REGION_ID_STRIDE, offset=region_slot)
+
+    def update_region_editing(self):
+        """
+        This method switches mesh to editing in regions, when some region is
+        locked, and back, when all regions are unlocked. Clients editing
+        regions allocate IDs with offsets given by their unique slots.
+        """
+        region_editing = len(self.regions.items) > 0
+        if region_editing == self.region_editing:
+            return
+        self.region_editing = region_editing
+        self.flush_vertex_operation()
+        if region_editing is True:
+            self.reset_id_allocators(stride=REGION_ID_STRIDE,
+                                     offset=self.region_slot if self.region_slot is not None else 0)
+        else:
+            self.reset_id_allocators(stride=1, offset=0)
+
+    def __region_filter(self, layer_index, elem_ids, rows, new_positions, changed_positions, removed_ids):
+        """
+        This method returns tuple (new positions, changed positions, removed
+        IDs) of elements, which could be sent by this client, when mesh is
+        edited in regions. Vertices have to be in regions locked by this
+        client before and after change. All vertices of edges and faces have
+        to be in these regions.
+        """
+        owned = self.owned_cells
+        size = self.cell_size
+        layer = self.layers_of_items[layer_index]
+        width = layer.items.width
+        vert_items = self.vertices.items
+
+        if layer_index == 0:
+            def allowed(row):
+                return regions.cell_of(row, size) in owned
+        else:
+            def allowed(row):
+                # The last item of triangle is zero
+                vert_ids = row if layer_index == 1 or row[3] != 0 else row[0:3]
+                for vert_id in vert_ids:
+                    coords = vert_items.get(vert_id)
+                    if coords is None or regions.cell_of(coords, size) not in owned:
+                        return False
+                return True
+
+        def allowed_item(item_id):
+            row = layer.items.get(item_id)
+            return row is None or allowed(row)
+
+        # IDs of new elements can be allocated only with confirmed slot
+        if self.region_slot is None:
+            new_positions = []
+        new_positions = regions.owned_rows(new_positions, rows, width, allowed)
+        changed_positions = [position for position in regions.owned_rows(changed_positions, rows, width, allowed)
+                             if allowed_item(elem_ids[position])]
+        # Edges and faces of removed vertices are removed too
+        removed_ids = [item_id for item_id in removed_ids if allowed_item(item_id)]
+        return new_positions, changed_positions, removed_ids
+
+    def set_item(self, layer_index, item_id, value):
+        """
+        This method sends new value of vertex, edge or face to Verse server
+        and it updates hash of item.
+        """
+        self.layers_of_items[layer_index].items[item_id] = value
+        tree = self.hash_trees[layer_index]
+        tree.set_item(item_id, value)
+        self.dirty_buckets.add(tree.bucket_of(item_id))
+        self.changed = True
+
+    def send_pending_items(self, budget=None):
+        """
+        This method sends items waiting for sending. When budget is not None,
+        then at most budget items are sent. Hashes are sent, when the last
+        item is sent. The method returns number of sent items.
+        """
+        count = self.pending_count
+        if budget is not None:
+            count = min(count, budget)
+        # Hashes of pending items are already in hash trees
+        for layer_index, item_id, value in itertools.islice(self.pending_items, count):
+            self.layers_of_items[layer_index].items[item_id] = value
+        self.pending_count -= count
+        if self.pending_count == 0:
+            self.send_hashes(force=True)
+        return count
+
+    def unset_item(self, layer_index, item_id):
+        """
+        This method removes vertex, edge or face from Verse server and it
+        updates hash of layer.
+        """
+        layer = self.layers_of_items[layer_index]
+        layer.items.pop(item_id)
+        if item_id in layer.id_cache:
+            layer.id_cache.pop(item_id)
+        tree = self.hash_trees[layer_index]
+        tree.unset_item(item_id)
+        self.dirty_buckets.add(tree.bucket_of(item_id))
+        self.id_allocators[layer_index].release(item_id)
+        if layer_index == 0:
+            self.vertex_sets.items.pop(item_id, None)
+        self.changed = True
+
     def __create_bpy_layer_ids(self, elems_name, layer_name):
         """
         This method create Blender layer storing IDs of vertices or edges or faces
@@ -542,12 +1302,12 @@ class VerseMesh(vrsent.VerseNode):
         lay.use_force_default = True
         lay.default_value = -1
         # Set values in layer
-        last_elem_id = None
+        count = 0
         for elem in elems_iter:
-            last_elem_id = elem.index
+            count += 1
             elem[lay] = elem.index
 
-        return last_elem_id
+        return count
 
     def get_verse_id_of_vertex(self, bpy_vert):
         """
@@ -572,137 +1332,302 @@ class VerseMesh(vrsent.VerseNode):
 
     def __send_vertex_updates(self):
         """
-        Try to send updates of geometry and positions of vertices
-        """
-
-        alive_verts = {}
-
-        # Go through bmesh and try to detect new positions of vertices,
-        # deleted vertices and newly created vertices
-        for b3d_vert in self.bmesh.verts:
-            verse_id = self.get_verse_id_of_vertex(b3d_vert)
-            # New vertex was created. Try to send it to Verse server, store it in cache and save verse ID
-            if verse_id == -1:
-                # Update the last vertex ID
-                self.last_vert_ID += 1
-                verse_id = self.last_vert_ID
-                # Send new vertex position to Verse server
-                self.vertices.items[verse_id] = tuple(b3d_vert.co)
-                # Store verse vertex ID in bmesh layer
-                layer = self.bmesh.verts.layers.int.get('VertIDs')
-                b3d_vert[layer] = verse_id
-            # Position of vertex was changed?
-            elif self.vertices.items[verse_id] != tuple(b3d_vert.co):
-                # This will send updated position of vertex
-                self.vertices.items[verse_id] = tuple(b3d_vert.co)
-
-            # Mark vertex as alive
-            alive_verts[verse_id] = b3d_vert.index
-
-        # Try to find deleted vertices
-        rem_verts = [vert_id for vert_id in self.vertices.items.keys() if vert_id not in alive_verts]
-        # This will send unset commands for deleted vertices
-        for vert_id in rem_verts:
-            self.vertices.items.pop(vert_id)
-            if vert_id in self.vertices.id_cache:
-                self.vertices.id_cache.pop(vert_id)
-
-    def __send_edge_updates(self):
+        Try to send updates of geometry and positions of vertices. The method
+        returns tuple (array of Verse IDs of vertices indexed by index of vertex,
+        flat array of coordinates of vertices).
         """
-        Try to send updates of topology (edges)
+        verts = self.bmesh.verts
+        verts.index_update()
+        vert_ids = self.__extract_elem_ids(verts, 'VertIDs')
+        coords = array.array('d', [coord for b3d_vert in verts for coord in b3d_vert.co])
+        self.__send_layer_updates(0, verts, 'VertIDs', vert_ids, coords)
+        return vert_ids, coords
+
+    def __extract_elem_ids(self, elems, layer_name):
+        """
+        This method returns array of Verse IDs of vertices, edges or faces.
+        New elements have ID topology.NEW_ID.
         """
+        layer = elems.layers.int.get(layer_name)
+        return array.array('q', [elem[layer] for elem in elems])
 
-        alive_edges = {}
-
-        # Go through bmesh and try to detect changes in edges (new created edges or deleted edges)
-        for b3d_edge in self.bmesh.edges:
-            verse_id = self.get_verse_id_of_edge(b3d_edge)
-            # New edge was created. Try to send it to Verse server
-            if verse_id == -1:
-                self.last_edge_ID += 1
-                verse_id = self.last_edge_ID
-                # Send new edge to Verse server
-                self.edges.items[verse_id] = (
-                    self.get_verse_id_of_vertex(b3d_edge.verts[0]),
-                    self.get_verse_id_of_vertex(b3d_edge.verts[1])
-                )
-                # Store edge ID in bmesh layer
-                layer = self.bmesh.edges.layers.int.get('EdgeIDs')
-                b3d_edge[layer] = verse_id
-            else:
-                # Was edge changed?
-                edge = (
-                    self.get_verse_id_of_vertex(b3d_edge.verts[0]),
-                    self.get_verse_id_of_vertex(b3d_edge.verts[1])
-                )
-                if self.edges.items[verse_id] != edge:
-                    self.edges.items[verse_id] = edge
-
-            alive_edges[verse_id] = b3d_edge.index
-
-        # Try to find deleted edges
-        rem_edges = [edge_id for edge_id in self.edges.items.keys() if edge_id not in alive_edges]
-        # This will send unset commands for deleted edges
-        for edge_id in rem_edges:
-            self.edges.items.pop(edge_id)
-            if edge_id in self.edges.id_cache:
-                self.edges.id_cache.pop(edge_id)
-
-    def __send_face_updates(self):
+    def __send_layer_updates(self, layer_index, elems, layer_name, elem_ids, rows, deferred=()):
         """
-        Try to send updates of topology (faces)
+        This method sends new, changed and removed vertices, edges or faces.
+        Only these elements are processed in Python. IDs of new elements are
+        stored in elem_ids. Changes of elements at positions in deferred are
+        not sent.
         """
-
-        def b3d_face_to_tuple(_b3d_face):
-            _face = None
-            if len(_b3d_face.verts) == 3:
-                _face = (
-                    self.get_verse_id_of_vertex(_b3d_face.verts[0]),
-                    self.get_verse_id_of_vertex(_b3d_face.verts[1]),
-                    self.get_verse_id_of_vertex(_b3d_face.verts[2]),
-                    0
-                )
-            elif len(b3d_face.verts) == 4:
-                _face = tuple(self.get_verse_id_of_vertex(vert) for vert in _b3d_face.verts)
-                # The last item of tuple can not be zero, because it indicates triangle.
-                if _face[3] == 0:
-                    # Rotate the face to get zero to the beginning of the tuple
-                    _face = (_face[3], _face[0], _face[1], _face[2])
-            else:
-                # TODO: tesselate face
-                print('Error: Face with more than 4 vertices is not supported')
-            return _face
-
-        alive_faces = {}
-
-        # Go through bmesh faces and try to detect changes (newly created)
-        for b3d_face in self.bmesh.faces:
-            verse_id = self.get_verse_id_of_face(b3d_face)
-            # New face was created. Try to send it to Verse server
-            if verse_id == -1:
-                self.last_face_ID += 1
-                verse_id = self.last_face_ID
-                self.quads.items[verse_id] = b3d_face_to_tuple(b3d_face)
-                # Store face ID in bmesh layer
-                layer = self.bmesh.faces.layers.int.get('FaceIDs')
-                b3d_face[layer] = verse_id
+        layer = self.layers_of_items[layer_index]
+        width = layer.items.width
+        new_positions, changed_positions, removed_ids = topology.diff_rows(elem_ids, rows, layer.items)
+        if len(deferred) > 0:
+            deferred = set(deferred)
+            changed_positions = [position for position in changed_positions if position not in deferred]
+        if self.region_editing is True:
+            new_positions, changed_positions, removed_ids = self.__region_filter(
+                layer_index, elem_ids, rows, new_positions, changed_positions, removed_ids)
+        elif layer_index == 0 and len(changed_positions) >= AFFINE_MIN_VERTICES:
+            changed_positions = self.__send_vertex_operation(elem_ids, rows, changed_positions)
+        if len(new_positions) > 0:
+            elems.ensure_lookup_table()
+            id_layer = elems.layers.int.get(layer_name)
+            for position in new_positions:
+                verse_id = self.id_allocators[layer_index].allocate()
+                self.set_item(layer_index, verse_id, tuple(rows[position * width:position * width + width]))
+                # Store ID in bmesh layer
+                b3d_elem = elems[position]
+                b3d_elem[id_layer] = verse_id
+                elem_ids[position] = verse_id
                 # Update id cache
-                self.quads.id_cache[verse_id] = b3d_face
-            else:
-                # Was face changed?
-                face = b3d_face_to_tuple(b3d_face)
-                if self.quads.items[verse_id] != face:
-                    self.quads.items[verse_id] = face
+                if layer_index == 2:
+                    layer.id_cache[verse_id] = b3d_elem
+        for position in changed_positions:
+            self.set_item(layer_index, elem_ids[position], tuple(rows[position * width:position * width + width]))
+        for item_id in removed_ids:
+            self.unset_item(layer_index, item_id)
+
+    def __send_vertex_operation(self, vert_ids, coords, changed_positions):
+        """
+        This method tries to send moved vertices as affine transformation of
+        set of vertices. The set is sent only once, when new operation starts.
+        The method returns positions of vertices, which have to be sent one
+        by one.
+        """
+        changed_ids = [vert_ids[position] for position in changed_positions]
+        operation = self.vertex_operation
+        # Vertices of the set could be removed or moved in Blender mesh since
+        # last update
+        new_set = operation is None or \
+            operation.covers(changed_ids) is False or \
+            operation.located(vert_ids) is False
+        if new_set is True:
+            # Original positions are positions known by other clients
+            item_ids = array.array('q', changed_ids)
+            base, missing = self.vertices.items.gather(item_ids)
+            if len(missing) > 0:
+                return changed_positions
+            operation = affine.AffineOperation(
+                random.getrandbits(31), item_ids, base, array.array('q', changed_positions))
+        current = array.array('d')
+        for position in operation.positions:
+            current.extend(coords[position * 3:position * 3 + 3])
+        matrix, residual = operation.fit(current)
+        if residual > AFFINE_TOLERANCE * max(1.0, max(map(abs, current))):
+            # Motion is not affine
+            self.flush_vertex_operation()
+            return changed_positions
+        if new_set is True:
+            self.flush_vertex_operation()
+            self.vertex_operation = operation
+            for item_id in operation.item_ids:
+                self.vertex_sets.items[item_id] = (operation.set_id,)
+            self.session.jobs.append(VertexOperationJob(self, operation))
+        # Blender vertices keep exact positions, which are sent one by one,
+        # when the operation is finished. Hashes are computed from transformed
+        # positions like by other clients.
+        values = operation.apply(matrix)
+        tree = self.hash_trees[0]
+        for index, item_id in enumerate(operation.item_ids):
+            self.vertices.items.store(item_id, tuple(current[index * 3:index * 3 + 3]))
+            tree.set_item(item_id, tuple(values[index * 3:index * 3 + 3]))
+        self.dirty_buckets.update(tree.bucket_of(item_id) for item_id in operation.item_ids)
+        self.changed = True
+        operation.sequence += 1
+        operation.time = time.time()
+        for row in range(3):
+            self.operation.items[row] = matrix[row * 4:row * 4 + 4]
+        self.operation.items[3] = (float(operation.set_id), float(operation.sequence), 0.0, 0.0)
+        return []
+
+    def __store_vertex_values(self, item_ids, values, b3d_verts):
+        """
+        This method stores positions of vertices transformed by affine operation
+        without sending them and it updates hashes and Blender vertices
+        """
+        tree = self.hash_trees[0]
+        for index, item_id in enumerate(item_ids):
+            value = tuple(values[index * 3:index * 3 + 3])
+            self.vertices.items.store(item_id, value)
+            tree.set_item(item_id, value)
+            b3d_vert = b3d_verts[index]
+            if b3d_vert is not None:
+                b3d_vert.co = mathutils.Vector(value)
 
-            alive_faces[verse_id] = b3d_face.index
+    def flush_vertex_operation(self, idle=None):
+        """
+        This method sends exact positions of vertices of affine operation sent
+        by this client one by one, thus Verse server stores current positions
+        and clients, which could not apply the operation, get them too. When
+        idle is not None, then positions are sent only, when the operation
+        was not used for idle seconds. The method returns True, when the
+        operation was finished.
+        """
+        operation = self.vertex_operation
+        if operation is None or operation.positions is None:
+            return False
+        if idle is not None and time.time() - operation.time < idle:
+            return False
+        self.vertex_operation = None
+        for item_id in operation.item_ids:
+            value = self.vertices.items.get(item_id)
+            if value is not None:
+                self.set_item(0, item_id, value)
+        return True
+
+    def apply_vertex_operation(self, set_id):
+        """
+        This method applies received affine operation to original positions
+        of vertices of the set
+        """
+        rows = [self.operation.items.get(row) for row in range(3)]
+        if None in rows:
+            return
+        matrix = tuple(value for row in rows for value in row)
+        operation = self.vertex_operation
+        if operation is None or operation.set_id != set_id:
+            item_ids = array.array('q', [item_id for item_id, value in self.vertex_sets.items.items()
+                                         if value[0] == set_id])
+            base, missing = self.vertices.items.gather(item_ids)
+            if len(missing) > 0:
+                logger.LOGGER.error('Vertices of affine operation are missing',
+                                    extra={'fields': {'node_id': self.id, 'count': len(missing)}})
+                return
+            operation = self.vertex_operation = affine.AffineOperation(set_id, item_ids, base)
+        values = operation.apply(matrix)
+        if self.updates_b3d_mesh is True:
+            _bmesh = self.vertices.get_bmesh()
+            b3d_verts = [self.vertices.b3d_vertex(item_id) for item_id in operation.item_ids]
+            self.__store_vertex_values(operation.item_ids, values, b3d_verts)
+            self.update_b3d_mesh(_bmesh)
+        else:
+            self.__store_vertex_values(operation.item_ids, values, [None] * len(operation.item_ids))
 
-        # Try to find deleted faces
-        rem_faces = [face_id for face_id in self.quads.items.keys() if face_id not in alive_faces]
-        # This will send unset commands for deleted faces
-        for face_id in rem_faces:
-            self.quads.items.pop(face_id)
-            if face_id in self.quads.id_cache:
-                self.quads.id_cache.pop(face_id)
+    def __send_edge_updates(self, vert_ids):
+        """
+        Try to send updates of topology (edges)
+        :vert_ids: array of Verse IDs of vertices indexed by index of vertex
+        """
+        edges = self.bmesh.edges
+        edge_ids = self.__extract_elem_ids(edges, 'EdgeIDs')
+        # Vertices of all edges mapped to Verse IDs of vertices
+        vert_indexes = [b3d_vert.index for b3d_edge in edges for b3d_vert in b3d_edge.verts]
+        # Vertices outside of regions locked by this client are not sent
+        rows, deferred = topology.skip_unsent(edge_ids, topology.map_ids(vert_indexes, vert_ids, 'q'), 2)
+        self.__send_layer_updates(1, edges, 'EdgeIDs', edge_ids, rows, deferred)
+
+    def b3d_face_to_tuple(self, b3d_face):
+        """
+        This method returns tuple of vertex IDs of Blender face
+        """
+        face = None
+        if len(b3d_face.verts) == 3:
+            face = (
+                self.get_verse_id_of_vertex(b3d_face.verts[0]),
+                self.get_verse_id_of_vertex(b3d_face.verts[1]),
+                self.get_verse_id_of_vertex(b3d_face.verts[2]),
+                0
+            )
+        elif len(b3d_face.verts) == 4:
+            face = tuple(self.get_verse_id_of_vertex(vert) for vert in b3d_face.verts)
+            # The last item of tuple can not be zero, because it indicates triangle.
+            if face[3] == 0:
+                # Rotate the face to get zero to the beginning of the tuple
+                face = (face[3], face[0], face[1], face[2])
+        else:
+            # TODO: tesselate face
+            logger.LOGGER.error('Face with more than 4 vertices is not supported')
+        return face
+
+    def __send_face_updates(self, vert_ids):
+        """
+        Try to send updates of topology (faces)
+        :vert_ids: array of Verse IDs of vertices indexed by index of vertex
+        """
+        faces = self.bmesh.faces
+        face_ids = self.__extract_elem_ids(faces, 'FaceIDs')
+        face_sizes = array.array('I', [len(b3d_face.verts) for b3d_face in faces])
+        vert_indexes = [b3d_vert.index for b3d_face in faces for b3d_vert in b3d_face.verts]
+        # Vertices outside of regions locked by this client are not sent
+        face_vertices, deferred = topology.skip_unsent(
+            face_ids, topology.map_ids(vert_indexes, vert_ids, 'q'), face_sizes)
+        rows, ngons = topology.pad_faces(face_vertices, face_sizes)
+        if len(ngons) > 0:
+            logger.LOGGER.error('Face with more than 4 vertices is not supported',
+                                extra={'fields': {'count': len(ngons)}})
+            for position in ngons:
+                face_ids[position] = topology.SKIP_ID
+        self.__send_layer_updates(2, faces, 'FaceIDs', face_ids, rows, deferred)
+
+    def reset_id_allocators(self, item_ids=None, stride=None, offset=None):
+        """
+        This method sets IDs used by vertices, edges and faces. When item_ids
+        is None, then IDs of items in Verse layers are used. Stride and offset
+        of allocated IDs are changed, when they are not None.
+        """
+        if item_ids is None:
+            item_ids = tuple(layer.items.keys() for layer in self.layers_of_items)
+        for allocator, layer_ids in zip(self.id_allocators, item_ids):
+            allocator.reset(layer_ids, stride, offset)
+
+    def compact_ids(self):
+        """
+        This method renumbers vertices, edges and faces, so their IDs are dense
+        again. Only client editing the mesh can do it. Moved vertices are sent
+        with new IDs first, then edges and faces are rewired or moved and old
+        vertices are removed at the end. Other clients do not apply these items
+        to Blender mesh during compaction, but they repair Blender mesh, when
+        new epoch is received. The method returns count of moved items.
+        """
+        if self.locked_by_me is False or self.region_editing is True or self.pending_count > 0:
+            return 0
+        # Local changes have to be sent before renumbering
+        self.send_updates()
+        self.flush_vertex_operation()
+        id_maps = tuple(id_alloc.compaction_map(layer.items.keys()) for layer in self.layers_of_items)
+        moved = sum(len(id_map) for id_map in id_maps)
+        if moved == 0:
+            return 0
+        epoch = self.info.epoch.value[0] if self.info.epoch.value is not None else 0
+        self.info.epoch.value = (epoch, 1)
+
+        vert_map = id_maps[0]
+        for old_id, new_id in vert_map.items():
+            self.set_item(0, new_id, tuple(self.vertices.items[old_id]))
+        for layer_index in (1, 2):
+            layer = self.layers_of_items[layer_index]
+            id_map = id_maps[layer_index]
+            for item_id, value in list(layer.items.items()):
+                value = tuple(value)
+                new_value = topology.remap_row(value, vert_map)
+                new_id = id_map.get(item_id, item_id)
+                if new_id != item_id:
+                    self.set_item(layer_index, new_id, new_value)
+                    self.unset_item(layer_index, item_id)
+                elif new_value != value:
+                    self.set_item(layer_index, item_id, new_value)
+        for old_id in vert_map.keys():
+            self.unset_item(0, old_id)
+
+        # Store new IDs in Blender layers
+        for elems, layer_name, id_map in zip(
+                (self.bmesh.verts, self.bmesh.edges, self.bmesh.faces),
+                ('VertIDs', 'EdgeIDs', 'FaceIDs'),
+                id_maps):
+            id_layer = elems.layers.int.get(layer_name)
+            for b3d_elem in elems:
+                new_id = id_map.get(b3d_elem[id_layer])
+                if new_id is not None:
+                    b3d_elem[id_layer] = new_id
+        self.clear_ID_cache()
+        self.reset_id_allocators()
+
+        self.info.epoch.value = (epoch + 1, 0)
+        self.bump_version()
+        self.send_hashes(force=True)
+        logger.LOGGER.info('IDs of mesh were compacted', extra={'fields': {
+            'node_id': self.id, 'moved': moved, 'epoch': epoch + 1}})
+        return moved
 
     def clear_ID_cache(self):
         """
@@ -712,6 +1637,27 @@ class VerseMesh(vrsent.VerseNode):
         self.edges.id_cache = {}
         self.quads.id_cache = {}
 
+    def release(self):
+        """
+        This method frees bmesh, references on Blender data and caches, when
+        Blender is disconnected from Verse server
+        """
+        if self.bmesh is not None and self.bm_from_edit_mesh is False:
+            try:
+                self.bmesh.free()
+            except ReferenceError:
+                pass
+        self.bmesh = None
+        self.clear_ID_cache()
+        self.hash_trees = (merkle.RangeHashTree(), merkle.RangeHashTree(), merkle.RangeHashTree())
+        self.dirty_buckets.clear()
+        self.pending_items = iter(())
+        self.pending_count = 0
+        self.vertex_operation = None
+        self.linked_objects = []
+        self.cached = None
+        self.mesh = None
+
     def update_references(self):
         """
         This method tries to update references at bmesh, when  old bmesh was removed
@@ -740,6 +1686,7 @@ class VerseMesh(vrsent.VerseNode):
                     self.bm_from_edit_mesh = False
                 self.clear_ID_cache()
 
+    @profiling.measure()
     def send_updates(self):
         """
         Try to send update of edit mesh to Verse server
@@ -759,9 +1706,326 @@ class VerseMesh(vrsent.VerseNode):
                 except ReferenceError:
                     self.bmesh = bmesh.from_edit_mesh(self.mesh)
                     self.clear_ID_cache()
-        self.__send_vertex_updates()
-        self.__send_edge_updates()
-        self.__send_face_updates()
+        # Original items have to be sent before any update
+        if self.pending_count > 0:
+            self.send_pending_items()
+        self.changed = False
+        profiling.count_items(
+            'VerseMesh.send_updates',
+            len(self.bmesh.verts) + len(self.bmesh.edges) + len(self.bmesh.faces))
+        vert_ids, coords = self.__send_vertex_updates()
+        self.__send_edge_updates(vert_ids)
+        self.__send_face_updates(vert_ids)
+        # Bounding box of objects is changed only by editing of mesh
+        self.send_bounding_box(coords)
+        # Server stores positions of vertices of finished affine operation
+        self.flush_vertex_operation(idle=OPERATION_IDLE)
+        # Increment version of mesh, when anything was sent
+        if self.changed is True:
+            self.bump_version()
+        self.send_hashes()
+
+    def send_bounding_box(self, coords):
+        """
+        This method sends bounding box of vertices to all object nodes using
+        this mesh
+        """
+        bbox = affine.bounding_box(coords)
+        if bbox is None:
+            return
+        for object_node in list(object3d.VerseObject.objects.values()):
+            if object_node.mesh_node is self:
+                object_node.send_bounding_box(bbox)
+
+    def send_hashes(self, force=False):
+        """
+        This method sends hashes of changed buckets and root hashes to
+        Verse server. Hashes are sent at most once per HASH_PERIOD
+        seconds, when force is not True.
+        """
+        if len(self.dirty_buckets) == 0:
+            return
+        if force is False and time.time() - self.hashes_time < HASH_PERIOD:
+            return
+        for bucket in self.dirty_buckets:
+            bucket_hashes = tuple(tree.leaves.get(bucket, 0) for tree in self.hash_trees)
+            if bucket_hashes != (0, 0, 0):
+                self.hashes.items[bucket] = bucket_hashes
+            elif bucket in self.hashes.items:
+                self.hashes.items.pop(bucket)
+        self.dirty_buckets.clear()
+        self.hashes_time = time.time()
+        # Root hashes have to be sent after hashes of buckets
+        self.info.hash.value = tuple(tree.root() for tree in self.hash_trees)
+
+    def unlock(self):
+        """
+        This method sends not sent hashes before the mesh is unlocked
+        """
+        if self.locked_by_me is True:
+            self.flush_vertex_operation()
+            self.send_hashes(force=True)
+        return super(VerseMesh, self).unlock()
+
+    def check_consistency(self):
+        """
+        This method compares hashes of received items with hashes published
+        by client sharing the mesh. Buckets with different hashes are requested
+        again. When Blender mesh could be inconsistent with received items, then
+        differences are repaired too.
+        """
+        root_hashes = self.info.hash.value
+        if root_hashes is None:
+            return
+        for layer_index, tree in enumerate(self.hash_trees):
+            if tree.root() == root_hashes[layer_index]:
+                continue
+            published_tree = merkle.RangeHashTree()
+            for bucket, bucket_hashes in self.hashes.items.items():
+                published_tree.set_leaf(bucket, bucket_hashes[layer_index])
+            for bucket in tree.diff(published_tree):
+                self.request_bucket(layer_index, bucket)
+        if self.suspect is True:
+            self.repair_b3d_mesh()
+
+    def request_bucket(self, layer_index, bucket):
+        """
+        This method asks other clients for sending bucket of items again
+        """
+        self.resync.counter += 1
+        self.resync.items[bucket] = (layer_index, self.resync.counter)
+
+    def can_resend_bucket(self, layer_index, bucket):
+        """
+        This method returns True, when this client has the bucket of items
+        consistent with hashes published by client sharing the mesh
+        """
+        if self.locked_by_me is True:
+            return True
+        if self.locked is True:
+            return False
+        published = self.hashes.items.get(bucket)
+        if published is None:
+            return False
+        return self.hash_trees[layer_index].leaves.get(bucket, 0) == published[layer_index]
+
+    def resend_bucket(self, layer_index, bucket):
+        """
+        This method sends all items of the bucket again
+        """
+        layer = self.layers_of_items[layer_index]
+        for item_id in self.hash_trees[layer_index].bucket_range(bucket):
+            try:
+                value = layer.items[item_id]
+            except KeyError:
+                continue
+            layer.items[item_id] = value
+
+    def b3d_elements(self, layer_index):
+        """
+        This method returns hash tree of Blender vertices, edges or faces
+        and dictionary of these elements indexed by Verse IDs
+        """
+        if layer_index == 0:
+            id_layer = self.bmesh.verts.layers.int.get('VertIDs')
+            elems = {b3d_vert[id_layer]: b3d_vert for b3d_vert in self.bmesh.verts}
+            values = {vert_id: tuple(b3d_vert.co) for vert_id, b3d_vert in elems.items()}
+        elif layer_index == 1:
+            id_layer = self.bmesh.edges.layers.int.get('EdgeIDs')
+            elems = {b3d_edge[id_layer]: b3d_edge for b3d_edge in self.bmesh.edges}
+            values = {edge_id: (
+                self.get_verse_id_of_vertex(b3d_edge.verts[0]),
+                self.get_verse_id_of_vertex(b3d_edge.verts[1])) for edge_id, b3d_edge in elems.items()}
+        else:
+            id_layer = self.bmesh.faces.layers.int.get('FaceIDs')
+            elems = {b3d_face[id_layer]: b3d_face for b3d_face in self.bmesh.faces}
+            values = {face_id: self.b3d_face_to_tuple(b3d_face) for face_id, b3d_face in elems.items()}
+        # Elements without Verse ID are ignored
+        elems.pop(-1, None)
+        values.pop(-1, None)
+        return merkle.RangeHashTree.from_items(values), elems
+
+    def repair_b3d_mesh(self):
+        """
+        This method compares Blender mesh with received items and it recreates
+        vertices, edges and faces only in buckets with different hashes.
+        """
+        _bmesh = self.vertices.get_bmesh()
+        self.suspect = False
+        repaired = False
+        # Vertices have to be repaired first, because deleting of vertex
+        # deletes edges and faces too
+        for layer_index, layer in enumerate(self.layers_of_items):
+            tree = self.hash_trees[layer_index]
+            b3d_tree, b3d_elems = self.b3d_elements(layer_index)
+            # Elements are created after all wrong elements are deleted,
+            # because element with new ID could duplicate deleted element
+            created = []
+            for bucket in b3d_tree.diff(tree):
+                for item_id in tree.bucket_range(bucket):
+                    b3d_elem = b3d_elems.get(item_id)
+                    value = layer.items.get(item_id)
+                    if layer_index == 0 and b3d_elem is not None and value is not None:
+                        # Update only position of existing vertex
+                        b3d_elem.co = mathutils.Vector(value)
+                        repaired = True
+                        continue
+                    if b3d_elem is not None:
+                        if layer_index == 0:
+                            bmesh.ops.delete(_bmesh, geom=[b3d_elem], context=1)
+                        elif layer_index == 1:
+                            _bmesh.edges.remove(b3d_elem)
+                        else:
+                            _bmesh.faces.remove(b3d_elem)
+                        layer.id_cache.pop(item_id, None)
+                    if value is not None:
+                        created.append((item_id, value))
+                    repaired = True
+            for item_id, value in created:
+                try:
+                    self.create_b3d_elem(layer_index, item_id, value)
+                except (ValueError, TypeError):
+                    # Missing vertex or duplicated edge/face
+                    pass
+        if repaired is True:
+            self.update_b3d_mesh(_bmesh)
+
+    def create_b3d_elem(self, layer_index, item_id, value):
+        """
+        This method creates Blender vertex, edge or face from received item
+        """
+        _bmesh = self.bmesh
+        b3d_vertex = self.vertices.b3d_vertex
+        if layer_index == 0:
+            b3d_elem = _bmesh.verts.new(value)
+            id_layer = _bmesh.verts.layers.int.get('VertIDs')
+        elif layer_index == 1:
+            b3d_elem = _bmesh.edges.new([b3d_vertex(vert_id) for vert_id in value])
+            id_layer = _bmesh.edges.layers.int.get('EdgeIDs')
+        else:
+            if value[3] == 0:
+                value = value[0:3]
+            b3d_elem = _bmesh.faces.new([b3d_vertex(vert_id) for vert_id in value])
+            id_layer = _bmesh.faces.layers.int.get('FaceIDs')
+        b3d_elem[id_layer] = item_id
+        self.layers_of_items[layer_index].id_cache[item_id] = b3d_elem
+        return b3d_elem
+
+    def bump_version(self):
+        """
+        This method increments counter of mesh version shared at Verse server
+        """
+        version = self.info.version.value
+        if version is not None:
+            self.info.version.value = (version[0], version[1] + 1)
+
+    def cache_hit(self, layer_name, item_id, value):
+        """
+        This method returns True, when received value of item is equal to the
+        value loaded from local cache. Such item is already in Blender mesh
+        and it is not necessary to update Blender mesh again.
+        """
+        if self.cached is None:
+            return False
+        items = getattr(self.cached, layer_name)
+        try:
+            cached_value = items[item_id]
+        except KeyError:
+            return False
+        # Every cached item could be used only once. Next value of the item
+        # is change made by someone else.
+        items.pop(item_id)
+        if self.cached.is_empty():
+            self.cached = None
+        return cached_value == tuple(value)
+
+    def save_to_cache(self, cache):
+        """
+        This method stores content of mesh to the local cache
+        """
+        version = self.info.version.value
+        if version is None or self.id is None:
+            return
+        cache.store(
+            self.session.hostname,
+            self.session.service,
+            self.id,
+            mesh_cache.CachedMesh(
+                version,
+                dict(self.vertices.items),
+                dict(self.edges.items),
+                dict(self.quads.items)))
+
+    def warm_start(self, version):
+        """
+        This method tries to fill Blender mesh with data from local cache, when
+        the cached version of mesh is equal to the version shared at Verse server.
+        Values received later from Verse server are compared with cached values
+        and only changed values are applied to Blender mesh. Verse server still
+        sends all items of subscribed layers; the cache saves only building of
+        Blender mesh from received items.
+        """
+        if self.mesh is None or \
+                self.cached is not None or \
+                len(self.vertices.items) > 0:
+            return
+        cached = get_mesh_cache().load(self.session.hostname, self.session.service, self.id)
+        if cached is None or cached.version != version:
+            return
+        self.load_cached_mesh(cached)
+        self.cached = cached
+
+    def load_cached_mesh(self, cached):
+        """
+        This method creates vertices, edges and faces of cached mesh in Blender mesh
+        """
+        _bmesh = self.vertices.get_bmesh()
+        vert_lay = _bmesh.verts.layers.int.get('VertIDs')
+        edge_lay = _bmesh.edges.layers.int.get('EdgeIDs')
+        face_lay = _bmesh.faces.layers.int.get('FaceIDs')
+
+        for vert_id, vert_co in cached.vertices.items():
+            b3d_vert = _bmesh.verts.new(vert_co)
+            b3d_vert[vert_lay] = vert_id
+            self.vertices.id_cache[vert_id] = b3d_vert
+
+        for edge_id, edge_verts in cached.edges.items():
+            try:
+                b3d_edge = _bmesh.edges.new([self.vertices.id_cache[vert_id] for vert_id in edge_verts])
+            except (KeyError, ValueError):
+                # Missing vertex or duplicated edge
+                continue
+            b3d_edge[edge_lay] = edge_id
+            self.edges.id_cache[edge_id] = b3d_edge
+
+        for face_id, face_verts in cached.faces.items():
+            if face_verts[3] == 0:
+                face_verts = face_verts[0:3]
+            try:
+                b3d_face = _bmesh.faces.new([self.vertices.id_cache[vert_id] for vert_id in face_verts])
+            except (KeyError, ValueError):
+                # Missing vertex or duplicated face
+                continue
+            b3d_face[face_lay] = face_id
+            self.quads.id_cache[face_id] = b3d_face
+
+        # Update IDs used by vertices, edges and faces
+        self.reset_id_allocators((cached.vertices.keys(), cached.edges.keys(), cached.faces.keys()))
+
+        # Update Blender mesh
+        self.update_b3d_mesh(_bmesh)
+
+    def update_b3d_mesh(self, _bmesh):
+        """
+        This method writes bmesh to Blender mesh and updates Blender mesh
+        """
+        with profiling.span('to_mesh'):
+            if self.bm_from_edit_mesh is True:
+                # Mesh edited in regions is updated in edit mode
+                bmesh.update_edit_mesh(self.mesh)
+            else:
+                _bmesh.to_mesh(self.mesh)
+                self.mesh.update()
 
     def create_empty_b3d_mesh(self, object_node):
         """
@@ -785,6 +2049,9 @@ class VerseMesh(vrsent.VerseNode):
         self.bmesh.to_mesh(self.mesh)
         self.bmesh.free()
         self.bmesh = None
+        self.__class__.meshes[self.mesh.as_pointer()] = self
+        # Link other objects using this mesh
+        object3d.VerseObject.link_waiting_objects(self)
 
     @classmethod
     def cb_receive_node_link(cls, session, parent_node_id, child_node_id):
@@ -834,6 +2101,12 @@ class VerseMesh(vrsent.VerseNode):
                 mesh_node.create_empty_b3d_mesh(object_node)
                 mesh_node.mesh.verse_node_id = node_id
                 object_node.mesh_node = mesh_node
+        else:
+            mesh_node.mesh.verse_node_id = node_id
+            # Share ID of this node with objects using this mesh too
+            for object_node in mesh_node.linked_objects:
+                object_node.info.mesh.value = (node_id,)
+            mesh_node.linked_objects = []
 
         return mesh_node
 
@@ -943,24 +2216,12 @@ class VerseMesh(vrsent.VerseNode):
 classes = ()
 
 
-def init_properties():
-    """
-    Init properties in blender object data type
-    """
-    bpy.types.Mesh.verse_node_id = bpy.props.IntProperty(
-        name="ID of verse mesh node",
-        default=-1,
-        description="ID of node representing mesh at Verse server"
-    )
-
-
 def register():
     """
     This method register all methods of this submodule
     """
     for c in classes:
         bpy.utils.register_class(c)
-    init_properties()
 
 
 def unregister():
@@ -0,0 +1,202 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements fitting of affine transformation to moved vertices.
+When many vertices are moved by one affine transformation (grab, rotate or
+scale), then only transformation matrix and ID of set of vertices could be
+sent instead of positions of all vertices. Transformed positions are rounded
+to single precision, because Blender stores positions of vertices in single
+precision. All clients compute the same positions from the same matrix and
+original positions.
+"""
+
+
+import array
+import operator
+
+
+# Pivots of normal equations smaller than this fraction of the biggest pivot
+# are considered to be zero (e.g. vertices lying in one plane)
+SINGULAR_EPSILON = 1e-12
+
+
+def split_coords(coords):
+    """
+    This function returns lists of x, y and z coordinates of flat array
+    """
+    return coords[0::3], coords[1::3], coords[2::3]
+
+
+def bounding_box(coords):
+    """
+    This function returns tuple (minimal corner, maximal corner) of box
+    containing all points of flat array of coordinates or None for no points
+    """
+    if len(coords) == 0:
+        return None
+    axes = split_coords(coords)
+    return tuple(min(axis) for axis in axes), tuple(max(axis) for axis in axes)
+
+
+def dot(values1, values2):
+    """
+    This function returns dot product of two sequences
+    """
+    return sum(map(operator.mul, values1, values2))
+
+
+def solve(matrix, rhs):
+    """
+    This function solves linear equations matrix * x = rhs for every column
+    of rhs using Gaussian elimination with partial pivoting. Unknowns of
+    singular equations are set to zero.
+    :matrix: list of rows of square matrix
+    :rhs: list of rows of right hand sides
+    """
+    size = len(matrix)
+    rows = [list(matrix[index]) + list(rhs[index]) for index in range(size)]
+    scale = max([abs(rows[index][index]) for index in range(size)] + [0.0])
+    pivots = []
+    row_index = 0
+    for column in range(size):
+        pivot_index = max(range(row_index, size), key=lambda index: abs(rows[index][column]), default=None)
+        if pivot_index is None or abs(rows[pivot_index][column]) <= SINGULAR_EPSILON * scale:
+            continue
+        rows[row_index], rows[pivot_index] = rows[pivot_index], rows[row_index]
+        pivot_row = rows[row_index]
+        pivot = pivot_row[column]
+        for index in range(size):
+            if index != row_index and rows[index][column] != 0.0:
+                factor = rows[index][column] / pivot
+                rows[index] = [value - factor * pivot_value for value, pivot_value in zip(rows[index], pivot_row)]
+        pivots.append((row_index, column))
+        row_index += 1
+    width = len(rhs[0])
+    result = [[0.0] * width for _ in range(size)]
+    for row_index, column in pivots:
+        row = rows[row_index]
+        result[column] = [value / row[column] for value in row[size:]]
+    return result
+
+
+def apply(matrix, base):
+    """
+    This function returns flat array of positions transformed by matrix. The
+    positions are rounded to single precision.
+    :matrix: tuple of 12 values (three rows of 3x4 matrix)
+    :base: flat array of original positions
+    """
+    xs, ys, zs = split_coords(base)
+    result = array.array('f', bytes(4 * len(base)))
+    for row in range(3):
+        m0, m1, m2, m3 = matrix[row * 4:row * 4 + 4]
+        result[row::3] = array.array('f', [m0 * x + m1 * y + m2 * z + m3 for x, y, z in zip(xs, ys, zs)])
+    return array.array('d', result)
+
+
+def fit(base, current):
+    """
+    This function returns tuple (matrix, residual). Matrix is 3x4 affine
+    transformation (tuple of 12 values), which moves original positions to
+    current positions with the least squares error. Residual is the biggest
+    difference of coordinate of transformed and current position.
+    :base: flat array of original positions
+    :current: flat array of current positions
+    """
+    count = len(base) // 3
+    if count == 0:
+        return (1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0), 0.0
+    base_columns = [list(column) for column in split_coords(base)]
+    current_columns = [list(column) for column in split_coords(current)]
+    base_center = [sum(column) / count for column in base_columns]
+    current_center = [sum(column) / count for column in current_columns]
+    # Coordinates relative to centroids
+    base_columns = [[value - center for value in column]
+                    for column, center in zip(base_columns, base_center)]
+    current_columns = [[value - center for value in column]
+                       for column, center in zip(current_columns, current_center)]
+    normal = [[dot(column1, column2) for column2 in base_columns] for column1 in base_columns]
+    rhs = [[dot(column1, column2) for column2 in current_columns] for column1 in base_columns]
+    linear = solve(normal, rhs)
+    matrix = []
+    for row in range(3):
+        coefs = [linear[index][row] for index in range(3)]
+        matrix.extend(coefs)
+        matrix.append(current_center[row] - dot(coefs, base_center))
+    matrix = tuple(matrix)
+    residual = max(map(abs, map(operator.sub, apply(matrix, base), current)))
+    return matrix, residual
+
+
+class AffineOperation(object):
+    """
+    Set of vertices transformed by affine transformations relative to
+    their original positions
+    """
+
+    def __init__(self, set_id, item_ids, base, positions=None):
+        """
+        Constructor of AffineOperation
+        :set_id: ID of set of vertices
+        :item_ids: array of IDs of vertices
+        :base: flat array of original positions of vertices
+        :positions: array of indexes of vertices in Blender mesh or None,
+        when the operation was received from Verse server
+        """
+        self.set_id = set_id
+        self.item_ids = item_ids
+        self.base = base
+        self.positions = positions
+        self.members = set(item_ids)
+        self.sequence = 0
+        self.time = 0.0
+
+    def covers(self, item_ids):
+        """
+        This method returns True, when all vertices are members of the set
+        """
+        return all(item_id in self.members for item_id in item_ids)
+
+    def located(self, elem_ids):
+        """
+        This method returns True, when vertices of the set are still at the
+        same positions of array elem_ids (IDs indexed by index of vertex).
+        Positions are not valid after vertices were removed or added.
+        """
+        if self.positions is None:
+            return False
+        count = len(elem_ids)
+        return all(position < count and elem_ids[position] == item_id
+                   for position, item_id in zip(self.positions, self.item_ids))
+
+    def fit(self, current):
+        """
+        This method returns tuple (matrix, residual) of transformation of
+        original positions to current positions
+        """
+        return fit(self.base, current)
+
+    def apply(self, matrix):
+        """
+        This method returns positions of vertices transformed by matrix
+        """
+        return apply(matrix, self.base)
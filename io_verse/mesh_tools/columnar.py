@@ -0,0 +1,278 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+
+"""
+This module implements compact storage of items of Verse layers. Values of
+items are stored in one contiguous typed array (width values per item) and
+item IDs are mapped to slots of the array. Dense item IDs are mapped by
+array indexed by item ID, sparse item IDs by dictionary. Slots of removed
+items are reused.
+"""
+
+
+import array
+
+
+# Free slot or missing item
+NO_SLOT = -1
+
+# Item IDs lower than this count above size of dense index are stored in
+# dense index; higher item IDs are stored in dictionary
+DENSE_GAP = 4096
+
+
+class ColumnarStore(object):
+    """
+    Dictionary-like storage of items with fixed count of values
+    """
+
+    def __init__(self, width, typecode='d'):
+        """
+        Constructor of ColumnarStore
+        :width: count of values of one item
+        :typecode: type of values (see module array)
+        """
+        self.width = width
+        self.typecode = typecode
+        self.empty_item = array.array(typecode, [0] * width)
+        # Values of items: slot * width ... slot * width + width - 1
+        self.data = array.array(typecode)
+        # Item ID of every slot or NO_SLOT for free slot
+        self.slot_ids = array.array('q')
+        # Slot of dense item IDs or NO_SLOT
+        self.index = array.array('q')
+        # Slots of sparse item IDs
+        self.sparse = {}
+        # Free slots
+        self.free = []
+        self.count = 0
+        # Reusable marks of slots used by method removed()
+        self.marks = bytearray()
+        self.stamp = 0
+
+    def slot(self, item_id):
+        """
+        This method returns slot of item or NO_SLOT, when item is missing
+        """
+        if 0 <= item_id < len(self.index):
+            return self.index[item_id]
+        return self.sparse.get(item_id, NO_SLOT)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, item_id):
+        return self.slot(item_id) != NO_SLOT
+
+    def __iter__(self):
+        for item_id in self.slot_ids:
+            if item_id != NO_SLOT:
+                yield item_id
+
+    def __getitem__(self, item_id):
+        slot = self.slot(item_id)
+        if slot == NO_SLOT:
+            raise KeyError(item_id)
+        start = slot * self.width
+        return tuple(self.data[start:start + self.width])
+
+    def __setitem__(self, item_id, value):
+        if len(value) != self.width:
+            raise ValueError('Item has to contain %d values' % self.width)
+        slot = self.slot(item_id)
+        if slot == NO_SLOT:
+            slot = self.__allocate(item_id)
+        start = slot * self.width
+        self.data[start:start + self.width] = array.array(self.typecode, value)
+
+    def __delitem__(self, item_id):
+        slot = self.slot(item_id)
+        if slot == NO_SLOT:
+            raise KeyError(item_id)
+        if 0 <= item_id < len(self.index):
+            self.index[item_id] = NO_SLOT
+        else:
+            del self.sparse[item_id]
+        self.slot_ids[slot] = NO_SLOT
+        self.free.append(slot)
+        self.count -= 1
+
+    def __allocate(self, item_id):
+        """
+        This method assigns free slot to new item
+        """
+        if len(self.free) > 0:
+            slot = self.free.pop()
+            self.slot_ids[slot] = item_id
+        else:
+            slot = len(self.slot_ids)
+            self.slot_ids.append(item_id)
+            self.data.extend(self.empty_item)
+        if 0 <= item_id < len(self.index) + DENSE_GAP:
+            if item_id >= len(self.index):
+                self.index.extend(array.array('q', [NO_SLOT]) * (item_id + 1 - len(self.index)))
+                # Move sparse items covered by dense index
+                for sparse_id in [i for i in self.sparse if i < len(self.index)]:
+                    self.index[sparse_id] = self.sparse.pop(sparse_id)
+            self.index[item_id] = slot
+        else:
+            self.sparse[item_id] = slot
+        self.count += 1
+        return slot
+
+    def get(self, item_id, default=None):
+        """
+        This method returns value of item or default value
+        """
+        try:
+            return self[item_id]
+        except KeyError:
+            return default
+
+    def pop(self, item_id, *default):
+        """
+        This method removes item and returns its value
+        """
+        try:
+            value = self[item_id]
+        except KeyError:
+            if len(default) > 0:
+                return default[0]
+            raise
+        del self[item_id]
+        return value
+
+    def keys(self):
+        """
+        This method returns list of item IDs
+        """
+        return list(self)
+
+    def values(self):
+        """
+        This generator yields values of items
+        """
+        for _item_id, value in self.items():
+            yield value
+
+    def items(self):
+        """
+        This generator yields tuples (item ID, value)
+        """
+        width = self.width
+        data = self.data
+        for slot, item_id in enumerate(self.slot_ids):
+            if item_id != NO_SLOT:
+                start = slot * width
+                yield item_id, tuple(data[start:start + width])
+
+    def clear(self):
+        """
+        This method removes all items
+        """
+        self.data = array.array(self.typecode)
+        self.slot_ids = array.array('q')
+        self.index = array.array('q')
+        self.sparse = {}
+        self.free = []
+        self.count = 0
+        self.marks = bytearray()
+
+    def gather(self, item_ids):
+        """
+        This method returns tuple (flat array with values of items in order of
+        item_ids, list of missing item IDs). Values of missing items are zeros.
+        """
+        width = self.width
+        data = self.data
+        result = array.array(self.typecode, bytes(data.itemsize * width * len(item_ids)))
+        missing = []
+        for position, item_id in enumerate(item_ids):
+            slot = self.slot(item_id)
+            if slot != NO_SLOT:
+                result[position * width:position * width + width] = data[slot * width:slot * width + width]
+            else:
+                missing.append(item_id)
+        return result, missing
+
+    def changed_positions(self, item_ids, new_values):
+        """
+        This method returns list of positions in item_ids of items, which are
+        missing or which have different values in flat array new_values (in
+        order of item_ids)
+        """
+        if not isinstance(new_values, array.array) or new_values.typecode != self.typecode:
+            new_values = array.array(self.typecode, new_values)
+        old_values, missing = self.gather(item_ids)
+        # Comparison of whole arrays is done in C
+        if len(missing) == 0 and old_values == new_values:
+            return []
+        width = self.width
+        missing = set(missing)
+        return [position for position, item_id in enumerate(item_ids)
+                if item_id in missing or
+                old_values[position * width:position * width + width] !=
+                new_values[position * width:position * width + width]]
+
+    def removed(self, item_ids):
+        """
+        This method returns list of IDs of stored items, which are not in
+        item_ids. Slots of items in item_ids are marked in reusable array of
+        marks, thus nothing proportional to count of items is allocated, when
+        all stored items are in item_ids.
+        """
+        marks = self.marks
+        if len(marks) < len(self.slot_ids):
+            marks.extend(bytes(len(self.slot_ids) - len(marks)))
+        # Every call uses new value of mark; old marks are cleared only, when
+        # values of marks are exhausted
+        self.stamp = self.stamp % 255 + 1
+        if self.stamp == 1:
+            marks[:] = bytes(len(marks))
+        stamp = self.stamp
+        seen = 0
+        for item_id in item_ids:
+            slot = self.slot(item_id)
+            if slot != NO_SLOT and marks[slot] != stamp:
+                marks[slot] = stamp
+                seen += 1
+        if seen == self.count:
+            return []
+        return [item_id for slot, item_id in enumerate(self.slot_ids)
+                if item_id != NO_SLOT and marks[slot] != stamp]
+
+    def changed(self, item_ids, new_values):
+        """
+        This method returns list of item IDs, which are missing or which
+        have different values in flat array new_values (in order of item_ids)
+        """
+        return [item_ids[position] for position in self.changed_positions(item_ids, new_values)]
+
+    @property
+    def nbytes(self):
+        """
+        Estimated count of bytes used by storage
+        """
+        return (self.data.itemsize * len(self.data) +
+                self.slot_ids.itemsize * len(self.slot_ids) +
+                self.index.itemsize * len(self.index) +
+                100 * len(self.sparse) + 8 * len(self.free) + len(self.marks))
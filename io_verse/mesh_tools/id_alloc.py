@@ -0,0 +1,151 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements allocation of IDs of vertices, edges and faces. IDs
+of removed items are reused, thus IDs of items stay dense during long editing
+sessions. The lowest free ID is always allocated first. Clients editing
+one mesh at the same time allocate IDs with different offset and the same
+stride, thus their new items never get the same ID.
+"""
+
+
+import heapq
+
+
+class IdAllocator(object):
+    """
+    Allocator of item IDs with list of free IDs
+    """
+
+    def __init__(self, item_ids=(), stride=1, offset=0):
+        """
+        Constructor of IdAllocator
+        :item_ids: IDs of existing items
+        :stride: distance of IDs allocated by this allocator
+        :offset: remainder of IDs allocated by this allocator divided by stride
+        """
+        self.stride = stride
+        self.offset = offset % stride
+        self.next_id = self.offset
+        # Heap of free IDs lower than next_id and set with the same IDs
+        self.free = []
+        self.free_ids = set()
+        self.reset(item_ids)
+
+    def __len__(self):
+        """
+        This method returns count of used IDs
+        """
+        return self.__range_length() - len(self.free_ids)
+
+    def __range_length(self):
+        """
+        This method returns count of IDs of this allocator lower than next_id
+        """
+        return len(range(self.offset, self.next_id, self.stride))
+
+    @property
+    def last_id(self):
+        """
+        The highest ID, which could be used or None
+        """
+        return self.next_id - self.stride if self.next_id > self.offset else None
+
+    def owns(self, item_id):
+        """
+        This method returns True, when ID could be allocated by this allocator
+        """
+        return item_id % self.stride == self.offset
+
+    def reset(self, item_ids, stride=None, offset=None):
+        """
+        This method sets IDs of existing items. All other IDs are free. Stride
+        and offset of allocated IDs are changed, when they are not None.
+        """
+        if stride is not None:
+            self.stride = stride
+        if offset is not None:
+            self.offset = offset % self.stride
+        used_ids = set(item_id for item_id in item_ids if self.owns(item_id))
+        self.next_id = max(used_ids) + self.stride if len(used_ids) > 0 else self.offset
+        self.free = [item_id for item_id in range(self.offset, self.next_id, self.stride)
+                     if item_id not in used_ids]
+        self.free_ids = set(self.free)
+
+    def allocate(self):
+        """
+        This method returns the lowest free ID
+        """
+        while len(self.free) > 0:
+            item_id = heapq.heappop(self.free)
+            # Reserved IDs are removed from heap lazily
+            if item_id in self.free_ids:
+                self.free_ids.remove(item_id)
+                return item_id
+        item_id = self.next_id
+        self.next_id += self.stride
+        return item_id
+
+    def reserve(self, item_id):
+        """
+        This method marks ID as used, e.g. when item was received from
+        Verse server. IDs of other allocators are ignored.
+        """
+        if self.owns(item_id) is False:
+            return
+        if item_id >= self.next_id:
+            for free_id in range(self.next_id, item_id, self.stride):
+                heapq.heappush(self.free, free_id)
+                self.free_ids.add(free_id)
+            self.next_id = item_id + self.stride
+        else:
+            self.free_ids.discard(item_id)
+
+    def release(self, item_id):
+        """
+        This method returns ID of removed item to free IDs
+        """
+        if self.owns(item_id) and item_id < self.next_id and item_id not in self.free_ids:
+            heapq.heappush(self.free, item_id)
+            self.free_ids.add(item_id)
+
+    def fragmentation(self):
+        """
+        This method returns ratio of free IDs lower than the highest used ID
+        """
+        count = self.__range_length()
+        if count == 0:
+            return 0.0
+        return len(self.free_ids) / count
+
+
+def compaction_map(item_ids):
+    """
+    This function returns dictionary {old ID: new ID}, which moves IDs of
+    items to the range from zero to the count of items. Only IDs outside the
+    range are moved; they fill holes in the range.
+    """
+    item_ids = set(item_ids)
+    count = len(item_ids)
+    holes = (item_id for item_id in range(count) if item_id not in item_ids)
+    moved = sorted(item_id for item_id in item_ids if item_id >= count)
+    return dict(zip(moved, holes))
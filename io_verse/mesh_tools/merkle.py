@@ -0,0 +1,214 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements hash tree over ranges of item IDs. It is used for
+detection of differences between mesh layers of two clients. Items are
+grouped into buckets of consecutive IDs. Hash of bucket is XOR of hashes
+of items, thus it could be updated incrementally, when one item is changed.
+Hashes of items are stored in array indexed by item ID.
+Buckets are grouped by upper levels of tree up to the root.
+"""
+
+
+import array
+import struct
+import zlib
+
+
+BUCKET_SIZE = 256
+FANOUT = 16
+
+CHILD = struct.Struct('<II')
+
+
+def item_hash(item_id, value):
+    """
+    This function returns hash of one item
+    """
+    return zlib.crc32(repr((item_id, tuple(value))).encode('ascii'))
+
+
+def layer_hashes(values, width):
+    """
+    This function returns array of hashes of items stored in flat array
+    of values. ID of item is its index.
+    """
+    hashes = array.array('I', [0]) * (len(values) // width)
+    for item_id in range(len(hashes)):
+        hashes[item_id] = item_hash(item_id, values[item_id * width:(item_id + 1) * width]) or 1
+    return hashes
+
+
+def leaves_of_hashes(item_hashes, bucket_size=BUCKET_SIZE):
+    """
+    This function returns dictionary of bucket hashes computed from array
+    of item hashes
+    """
+    leaves = {}
+    for item_id, hash_value in enumerate(item_hashes):
+        if hash_value != 0:
+            bucket = item_id // bucket_size
+            leaves[bucket] = leaves.get(bucket, 0) ^ hash_value
+    return {bucket: leaf_hash for bucket, leaf_hash in leaves.items() if leaf_hash != 0}
+
+
+class RangeHashTree(object):
+    """
+    Hash tree over ranges of item IDs
+    """
+
+    def __init__(self, bucket_size=BUCKET_SIZE, fanout=FANOUT):
+        """
+        Constructor of RangeHashTree
+        """
+        self.bucket_size = bucket_size
+        self.fanout = fanout
+        self.leaves = {}
+        # Hashes of items indexed by item ID
+        self.item_hashes = array.array('I')
+        self._levels = None
+
+    @classmethod
+    def from_items(cls, items, bucket_size=BUCKET_SIZE, fanout=FANOUT):
+        """
+        This method creates tree from dictionary of items
+        """
+        tree = cls(bucket_size, fanout)
+        for item_id, value in items.items():
+            tree.set_item(item_id, value)
+        return tree
+
+    @classmethod
+    def from_hashes(cls, item_hashes, leaves=None, bucket_size=BUCKET_SIZE, fanout=FANOUT):
+        """
+        This method creates tree from array of item hashes. Hashes of buckets
+        could be computed in advance.
+        """
+        tree = cls(bucket_size, fanout)
+        tree.item_hashes = array.array('I', item_hashes)
+        if leaves is None:
+            leaves = leaves_of_hashes(item_hashes, bucket_size)
+        tree.leaves = dict(leaves)
+        return tree
+
+    def bucket_of(self, item_id):
+        """
+        This method returns index of bucket containing item
+        """
+        return item_id // self.bucket_size
+
+    def bucket_range(self, bucket):
+        """
+        This method returns range of item IDs in the bucket
+        """
+        return range(bucket * self.bucket_size, (bucket + 1) * self.bucket_size)
+
+    def set_leaf(self, bucket, leaf_hash):
+        """
+        This method sets hash of bucket. It is used for tree received from
+        other client.
+        """
+        if leaf_hash == 0:
+            self.leaves.pop(bucket, None)
+        else:
+            self.leaves[bucket] = leaf_hash
+        self._levels = None
+
+    def set_item(self, item_id, value):
+        """
+        This method adds new item to the tree or changes value of existing item
+        """
+        # Zero hash is reserved for items that do not exist
+        new_hash = item_hash(item_id, value) or 1
+        if item_id >= len(self.item_hashes):
+            self.item_hashes.extend([0] * (item_id + 1 - len(self.item_hashes)))
+        old_hash = self.item_hashes[item_id]
+        self.item_hashes[item_id] = new_hash
+        bucket = self.bucket_of(item_id)
+        self.set_leaf(bucket, self.leaves.get(bucket, 0) ^ old_hash ^ new_hash)
+
+    def unset_item(self, item_id):
+        """
+        This method removes item from the tree
+        """
+        if item_id >= len(self.item_hashes) or self.item_hashes[item_id] == 0:
+            return
+        old_hash = self.item_hashes[item_id]
+        self.item_hashes[item_id] = 0
+        bucket = self.bucket_of(item_id)
+        self.set_leaf(bucket, self.leaves.get(bucket, 0) ^ old_hash)
+
+    def height(self):
+        """
+        This method returns number of levels of the tree
+        """
+        height = 1
+        index = max(self.leaves.keys()) if len(self.leaves) > 0 else 0
+        while index > 0:
+            index //= self.fanout
+            height += 1
+        return height
+
+    def levels(self, height=None):
+        """
+        This method returns list of levels of the tree. The first level
+        contains buckets and the last level contains only the root.
+        """
+        if height is None:
+            height = self.height()
+        if self._levels is not None and len(self._levels) == height:
+            return self._levels
+        levels = [self.leaves]
+        for _level in range(1, height):
+            children = {}
+            for index, child_hash in levels[-1].items():
+                children.setdefault(index // self.fanout, []).append((index, child_hash))
+            level = {}
+            for index, child_hashes in children.items():
+                data = b''.join(CHILD.pack(child, child_hash) for child, child_hash in sorted(child_hashes))
+                level[index] = zlib.crc32(data)
+            levels.append(level)
+        self._levels = levels
+        return levels
+
+    def root(self):
+        """
+        This method returns hash of the root. Empty tree has zero hash.
+        """
+        return self.levels()[-1].get(0, 0)
+
+    def diff(self, other):
+        """
+        This method returns sorted list of buckets, which differ in this tree
+        and other tree. Only subtrees with different hashes are compared.
+        """
+        height = max(self.height(), other.height())
+        mine = self.levels(height)
+        theirs = other.levels(height)
+        candidates = {0}
+        for level in range(height - 1, 0, -1):
+            children = set()
+            for index in candidates:
+                if mine[level].get(index, 0) != theirs[level].get(index, 0):
+                    children.update(range(index * self.fanout, (index + 1) * self.fanout))
+            candidates = children
+        return sorted(bucket for bucket in candidates if mine[0].get(bucket, 0) != theirs[0].get(bucket, 0))
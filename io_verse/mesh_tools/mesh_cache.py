@@ -0,0 +1,170 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements local on-disk cache of mesh data shared at Verse server.
+Every cached mesh is stored in one binary file containing header and contiguous
+arrays of IDs and values of vertices, edges and faces. Cached mesh is used
+for building of Blender mesh before items are received from Verse server;
+it does not reduce count of items sent by Verse server.
+"""
+
+
+import array
+import os
+import re
+import struct
+
+
+CACHE_MAGIC = b'VRSM'
+CACHE_FORMAT = 1
+
+# Magic, format, version of content (nonce, counter), count of vertices, edges, faces
+HEADER = struct.Struct('<4sHIIIII')
+
+VERTEX_WIDTH = 3
+EDGE_WIDTH = 2
+FACE_WIDTH = 4
+
+
+class CachedMesh(object):
+    """
+    Class representing content of one cached mesh
+    """
+
+    def __init__(self, version, vertices=None, edges=None, faces=None):
+        """
+        Constructor of CachedMesh
+        :version: tuple (nonce, counter) identifying content of mesh
+        """
+        self.version = tuple(version)
+        self.vertices = vertices if vertices is not None else {}
+        self.edges = edges if edges is not None else {}
+        self.faces = faces if faces is not None else {}
+
+    def is_empty(self):
+        """
+        This method returns True, when there is no cached item
+        """
+        return len(self.vertices) == 0 and len(self.edges) == 0 and len(self.faces) == 0
+
+
+def pack_items(items, typecode, width):
+    """
+    This function packs dictionary of items to array of IDs and array of values
+    """
+    ids = array.array('I', sorted(items.keys()))
+    values = array.array(typecode)
+    for item_id in ids:
+        value = items[item_id]
+        if len(value) != width:
+            raise ValueError('Item %d has %d values, expected %d' % (item_id, len(value), width))
+        values.extend(value)
+    return ids, values
+
+
+def unpack_items(ids, values, width):
+    """
+    This function unpacks array of IDs and array of values to dictionary of items
+    """
+    return {item_id: tuple(values[index * width:(index + 1) * width]) for index, item_id in enumerate(ids)}
+
+
+class MeshCache(object):
+    """
+    Local cache of meshes. Key of cached mesh is hostname and service of
+    Verse server and ID of mesh node.
+    """
+
+    def __init__(self, root_dir):
+        """
+        Constructor of MeshCache
+        """
+        self.root_dir = root_dir
+
+    def path(self, hostname, service, node_id):
+        """
+        This method returns path of file with cached mesh
+        """
+        server = re.sub(r'[^A-Za-z0-9_.-]', '_', '%s_%s' % (hostname, service))
+        return os.path.join(self.root_dir, server, 'mesh_%d.bin' % node_id)
+
+    def store(self, hostname, service, node_id, cached_mesh):
+        """
+        This method stores mesh to the cache. The file is written atomically.
+        """
+        file_path = self.path(hostname, service, node_id)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        packed = (
+            pack_items(cached_mesh.vertices, 'd', VERTEX_WIDTH),
+            pack_items(cached_mesh.edges, 'I', EDGE_WIDTH),
+            pack_items(cached_mesh.faces, 'I', FACE_WIDTH)
+        )
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'wb') as cache_file:
+            cache_file.write(HEADER.pack(
+                CACHE_MAGIC,
+                CACHE_FORMAT,
+                cached_mesh.version[0],
+                cached_mesh.version[1],
+                len(packed[0][0]),
+                len(packed[1][0]),
+                len(packed[2][0])
+            ))
+            for ids, values in packed:
+                ids.tofile(cache_file)
+                values.tofile(cache_file)
+        os.replace(tmp_path, file_path)
+
+    def load(self, hostname, service, node_id):
+        """
+        This method tries to load mesh from the cache. It returns None, when
+        mesh is not cached or cache file is not valid.
+        """
+        file_path = self.path(hostname, service, node_id)
+        try:
+            with open(file_path, 'rb') as cache_file:
+                magic, cache_format, nonce, counter, vert_count, edge_count, face_count = \
+                    HEADER.unpack(cache_file.read(HEADER.size))
+                if magic != CACHE_MAGIC or cache_format != CACHE_FORMAT:
+                    return None
+                layers = []
+                for count, typecode, width in (
+                        (vert_count, 'd', VERTEX_WIDTH),
+                        (edge_count, 'I', EDGE_WIDTH),
+                        (face_count, 'I', FACE_WIDTH)):
+                    ids = array.array('I')
+                    ids.fromfile(cache_file, count)
+                    values = array.array(typecode)
+                    values.fromfile(cache_file, count * width)
+                    layers.append(unpack_items(ids, values, width))
+        except (OSError, EOFError, struct.error):
+            return None
+        return CachedMesh((nonce, counter), layers[0], layers[1], layers[2])
+
+    def remove(self, hostname, service, node_id):
+        """
+        This method removes mesh from the cache
+        """
+        try:
+            os.remove(self.path(hostname, service, node_id))
+        except OSError:
+            pass
@@ -0,0 +1,113 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements encoding of mesh to items of Verse layers. Input of
+encoding are flat arrays of vertex coordinates, edge vertices and tessface
+vertices, thus encoding could run in other process than Blender. Result of
+encoding contains values of items and hashes of items and buckets.
+"""
+
+
+import array
+
+try:
+    from . import merkle
+except ImportError:
+    import merkle
+
+
+VERTEX_WIDTH = 3
+EDGE_WIDTH = 2
+FACE_WIDTH = 4
+
+
+def encode_faces(face_vertices, face_sizes=None):
+    """
+    This function returns flat array of faces with four vertices. Triangles
+    are padded with zero and quads with zero vertex at the last position are
+    rotated, because such quads could not be distinguished from triangles.
+    :face_vertices: flat array with four vertices per face (vertices_raw)
+    :face_sizes: array of count of vertices of faces or None, when faces
+    were already padded
+    """
+    faces = array.array('I', face_vertices)
+    if face_sizes is None:
+        return faces
+    for face_index, face_size in enumerate(face_sizes):
+        start = face_index * FACE_WIDTH
+        if face_size == 3:
+            faces[start + 3] = 0
+        elif faces[start + 3] == 0:
+            faces[start:start + FACE_WIDTH] = array.array('I', (
+                faces[start + 3], faces[start], faces[start + 1], faces[start + 2]))
+    return faces
+
+
+class EncodedMesh(object):
+    """
+    Class representing mesh encoded to items of Verse layers
+    """
+
+    def __init__(self, vertices, edges, faces, hashes, leaves):
+        """
+        Constructor of EncodedMesh
+        :vertices: flat array of coordinates
+        :edges: flat array of vertex indexes
+        :faces: flat array of vertex indexes
+        :hashes: tuple of arrays with hashes of items in each layer
+        :leaves: tuple of dictionaries with hashes of buckets in each layer
+        """
+        self.layers = (vertices, edges, faces)
+        self.hashes = hashes
+        self.leaves = leaves
+
+    def __len__(self):
+        """
+        This method returns count of all items
+        """
+        return sum(len(hashes) for hashes in self.hashes)
+
+    def items(self):
+        """
+        This generator yields tuples (layer index, item ID, value)
+        """
+        for layer_index, values in enumerate(self.layers):
+            width = (VERTEX_WIDTH, EDGE_WIDTH, FACE_WIDTH)[layer_index]
+            for item_id in range(len(values) // width):
+                yield layer_index, item_id, tuple(values[item_id * width:(item_id + 1) * width])
+
+
+def encode_mesh(coords, edge_vertices, face_vertices, face_sizes=None, bucket_size=merkle.BUCKET_SIZE):
+    """
+    This function encodes mesh and computes hashes of its items. It does not
+    use Blender API, thus it could be called in worker process.
+    """
+    vertices = array.array('f', coords)
+    edges = array.array('I', edge_vertices)
+    faces = encode_faces(face_vertices, face_sizes)
+    hashes = (
+        merkle.layer_hashes(vertices, VERTEX_WIDTH),
+        merkle.layer_hashes(edges, EDGE_WIDTH),
+        merkle.layer_hashes(faces, FACE_WIDTH)
+    )
+    leaves = tuple(merkle.leaves_of_hashes(layer_hashes, bucket_size) for layer_hashes in hashes)
+    return EncodedMesh(vertices, edges, faces, hashes, leaves)
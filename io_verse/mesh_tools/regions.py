@@ -0,0 +1,141 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements spatial regions of mesh, which could be locked by
+different clients. Space is divided to cubic cells and every cell has ID,
+which is used as ID of item in layer of region owners. Coordinates of cells
+have CELL_BITS bits; cells outside of this range are clamped to border cells.
+Locks of cells and slots of editors are claims confirmed by Verse server.
+"""
+
+
+import array
+import math
+
+
+DEFAULT_CELL_SIZE = 1.0
+
+# Count of bits of one coordinate of cell in ID of cell
+CELL_BITS = 10
+CELL_OFFSET = 1 << (CELL_BITS - 1)
+CELL_MASK = (1 << CELL_BITS) - 1
+
+
+def cell_id(cell_x, cell_y, cell_z):
+    """
+    This function returns ID of cell with integer coordinates
+    """
+    result = 0
+    for coord in (cell_x, cell_y, cell_z):
+        coord = min(max(coord + CELL_OFFSET, 0), CELL_MASK)
+        result = (result << CELL_BITS) | coord
+    return result
+
+
+def cell_coords(item_id):
+    """
+    This function returns integer coordinates of cell with ID
+    """
+    return tuple(((item_id >> shift) & CELL_MASK) - CELL_OFFSET
+                 for shift in (2 * CELL_BITS, CELL_BITS, 0))
+
+
+def cell_of(point, size=DEFAULT_CELL_SIZE):
+    """
+    This function returns ID of cell containing point
+    """
+    return cell_id(*(int(math.floor(coord / size)) for coord in point))
+
+
+def cells_of_coords(coords, size=DEFAULT_CELL_SIZE):
+    """
+    This function returns array of IDs of cells containing points of flat
+    array of coordinates
+    """
+    return array.array('I', [cell_of(coords[index:index + 3], size) for index in range(0, len(coords), 3)])
+
+
+def owned_rows(positions, rows, width, allowed):
+    """
+    This function returns positions of rows of flat array, which are allowed
+    by function allowed(row)
+    """
+    return [position for position in positions
+            if allowed(tuple(rows[position * width:position * width + width]))]
+
+
+class Claims(object):
+    """
+    Claims of keys (cells of regions or slots of editors) stored in layer of
+    owners. Verse server sends value of item back to all clients in the order,
+    in which it received them. Key is owned by client, when the first value
+    received after its request is ID of the client. Client, which lost key,
+    restores value of the winner, when its own value is received later.
+    """
+
+    def __init__(self):
+        """
+        Constructor of Claims
+        """
+        # Keys requested by this client waiting for value from Verse server
+        self.requested = set()
+        # Keys confirmed by Verse server
+        self.confirmed = set()
+        # Owners of keys, which were requested by this client, but won by other client
+        self.lost = {}
+
+    def request(self, key):
+        """
+        This method marks key as requested by this client
+        """
+        self.requested.add(key)
+        self.lost.pop(key, None)
+
+    def receive(self, key, owner, me):
+        """
+        This method processes value of key received from Verse server. It
+        returns owner, which has to be restored, or None.
+        """
+        if key in self.requested:
+            self.requested.discard(key)
+            if owner == me:
+                self.confirmed.add(key)
+            else:
+                self.lost[key] = owner
+        elif owner == me and key in self.lost:
+            return self.lost.pop(key)
+        return None
+
+    def remove(self, key):
+        """
+        This method forgets key, which was removed
+        """
+        self.requested.discard(key)
+        self.confirmed.discard(key)
+        self.lost.pop(key, None)
+
+    def owned(self, owners, me):
+        """
+        This method returns set of confirmed keys, which are currently owned
+        by this client according to dictionary {key: owner}
+        """
+        return set(key for key in self.confirmed if owners.get(key) == me)
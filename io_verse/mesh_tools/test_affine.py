@@ -0,0 +1,98 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Module with unit tests for affine module
+"""
+
+import array
+import math
+import affine
+
+
+def transform(matrix, coords):
+    """
+    Reference implementation of affine transformation
+    """
+    result = []
+    for index in range(0, len(coords), 3):
+        x, y, z = coords[index:index + 3]
+        for row in range(3):
+            m0, m1, m2, m3 = matrix[row * 4:row * 4 + 4]
+            result.append(m0 * x + m1 * y + m2 * z + m3)
+    return array.array('d', result)
+
+
+def test_fit_rotation():
+    """
+    Test of fitting rotation, scale and translation
+    """
+    base = array.array('d', [float(value % 7) * (1 + value % 3) for value in range(60)])
+    angle = math.radians(30.0)
+    cos, sin = math.cos(angle), math.sin(angle)
+    matrix = (2 * cos, -2 * sin, 0.0, 1.0, 2 * sin, 2 * cos, 0.0, -2.0, 0.0, 0.0, 2.0, 0.5)
+    current = affine.apply(matrix, base)
+    fitted, residual = affine.fit(base, current)
+    assert residual < 1e-5
+    assert max(abs(value - reference) for value, reference in zip(fitted, matrix)) < 1e-5
+
+
+def test_fit_planar():
+    """
+    Test of fitting translation of vertices lying in one plane
+    """
+    base = array.array('d', [coord for x in range(4) for y in range(4) for coord in (x, y, 0.0)])
+    current = transform((1.0, 0.0, 0.0, 0.5, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 3.0), base)
+    _matrix, residual = affine.fit(base, current)
+    assert residual < 1e-6
+
+
+def test_fit_non_affine():
+    """
+    Test of detecting motion, which is not affine
+    """
+    base = array.array('d', [coord for x in range(4) for y in range(4) for coord in (x, y, x * y)])
+    current = array.array('d', base)
+    current[2] += 1.0
+    _matrix, residual = affine.fit(base, current)
+    assert residual > 0.1
+
+
+def test_bounding_box():
+    """
+    Test of computing bounding box of points
+    """
+    coords = array.array('d', [1.0, -2.0, 3.0, -1.0, 4.0, 0.5, 0.0, 0.0, 5.0])
+    assert affine.bounding_box(coords) == ((-1.0, -2.0, 0.5), (1.0, 4.0, 5.0))
+    assert affine.bounding_box(array.array('d')) is None
+
+
+def test_operation_located():
+    """
+    Test of checking positions of vertices of operation in Blender mesh
+    """
+    operation = affine.AffineOperation(
+        1, array.array('q', [5, 7]), array.array('d', [0.0] * 6), array.array('q', [1, 3]))
+    assert operation.located(array.array('q', [4, 5, 6, 7])) is True
+    # Vertices were removed or reordered
+    assert operation.located(array.array('q', [4, 5])) is False
+    assert operation.located(array.array('q', [4, 5, 7, 6])) is False
+    # Operation received from Verse server has no positions
+    assert affine.AffineOperation(1, array.array('q', [5]), array.array('d', [0.0] * 3)).located([5]) is False
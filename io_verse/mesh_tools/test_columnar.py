@@ -0,0 +1,102 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Module with unit tests for columnar module
+"""
+
+import array
+import columnar
+
+
+def test_set_get_pop():
+    """
+    Test storing, reading and removing of items
+    """
+    store = columnar.ColumnarStore(3)
+    store[0] = (1.0, 2.0, 3.0)
+    store[1] = (4.0, 5.0, 6.0)
+    store[0] = (7.0, 8.0, 9.0)
+    assert len(store) == 2
+    assert store[0] == (7.0, 8.0, 9.0)
+    assert 1 in store and 2 not in store
+    assert store.get(2) is None
+    assert store.pop(1) == (4.0, 5.0, 6.0)
+    assert store.pop(1, None) is None
+    assert len(store) == 1
+    assert dict(store.items()) == {0: (7.0, 8.0, 9.0)}
+
+
+def test_reuse_of_free_slots():
+    """
+    Test that slots of removed items are reused
+    """
+    store = columnar.ColumnarStore(2, 'I')
+    for item_id in range(10):
+        store[item_id] = (item_id, item_id + 1)
+    for item_id in range(0, 10, 2):
+        del store[item_id]
+    size = len(store.data)
+    for item_id in range(10, 15):
+        store[item_id] = (item_id, 0)
+    assert len(store.data) == size
+    assert sorted(store.keys()) == [1, 3, 5, 7, 9, 10, 11, 12, 13, 14]
+    assert store[12] == (12, 0)
+
+
+def test_sparse_item_ids():
+    """
+    Test that huge item IDs do not grow dense index
+    """
+    store = columnar.ColumnarStore(1, 'I')
+    store[4000000000] = (1,)
+    store[5] = (2,)
+    assert len(store.index) == 6
+    assert store[4000000000] == (1,)
+    assert sorted(store) == [5, 4000000000]
+    assert store.pop(4000000000) == (1,)
+    assert 4000000000 not in store
+
+
+def test_changed():
+    """
+    Test detection of changed and missing items
+    """
+    store = columnar.ColumnarStore(3)
+    for item_id in range(4):
+        store[item_id] = (float(item_id), 0.0, 0.0)
+    values = array.array('d', [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 2.0, 0.0, 0.0, 3.0, 0.0, 0.0])
+    assert store.changed([0, 1, 2, 3], values) == []
+    values[4] = 1.0
+    assert store.changed([0, 1, 2, 3, 4], list(values) + [0.0, 0.0, 0.0]) == [1, 4]
+
+
+def test_removed():
+    """
+    Test of detecting removed items with reusable marks
+    """
+    store = columnar.ColumnarStore(1)
+    for item_id in (0, 1, 2, 100000):
+        store[item_id] = (float(item_id),)
+    assert store.removed([2, 1, 0, 100000]) == []
+    assert sorted(store.removed([2, 0])) == [1, 100000]
+    # Marks of previous call are not used again
+    for _ in range(300):
+        assert store.removed([0, 1, 2]) == [100000]
@@ -0,0 +1,76 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Module with unit tests for id_alloc module
+"""
+
+import id_alloc
+
+
+def test_allocate_release():
+    """
+    Test of reusing released IDs
+    """
+    allocator = id_alloc.IdAllocator()
+    assert [allocator.allocate() for _ in range(4)] == [0, 1, 2, 3]
+    allocator.release(2)
+    allocator.release(0)
+    allocator.release(0)
+    assert len(allocator) == 2
+    assert allocator.allocate() == 0
+    assert allocator.allocate() == 2
+    assert allocator.allocate() == 4
+    assert allocator.last_id == 4
+
+
+def test_reserve():
+    """
+    Test of reserving IDs of received items
+    """
+    allocator = id_alloc.IdAllocator([0, 3])
+    assert allocator.fragmentation() == 0.5
+    allocator.reserve(1)
+    allocator.reserve(6)
+    assert [allocator.allocate() for _ in range(4)] == [2, 4, 5, 7]
+
+
+def test_stride():
+    """
+    Test of allocating IDs of one client editing mesh with other clients
+    """
+    allocator = id_alloc.IdAllocator([0, 1, 4, 9], stride=4, offset=1)
+    assert allocator.allocate() == 5
+    assert allocator.allocate() == 13
+    allocator.reserve(2)
+    allocator.reserve(21)
+    allocator.release(9)
+    assert [allocator.allocate() for _ in range(3)] == [9, 17, 25]
+    assert allocator.last_id == 25
+    assert len(allocator) == 7
+
+
+def test_compaction_map():
+    """
+    Test of moving IDs to holes
+    """
+    assert id_alloc.compaction_map([0, 2, 5, 9]) == {5: 1, 9: 3}
+    assert id_alloc.compaction_map([0, 1, 2]) == {}
+    assert id_alloc.compaction_map([]) == {}
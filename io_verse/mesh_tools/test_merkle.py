@@ -0,0 +1,77 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Module with unit tests for merkle module
+"""
+
+import merkle
+
+ITEMS = {item_id: (float(item_id), 0.0, 1.0) for item_id in range(10000)}
+
+
+def test_equal_trees():
+    """
+    Test that trees of equal items have equal root and no differences
+    """
+    tree1 = merkle.RangeHashTree.from_items(ITEMS)
+    tree2 = merkle.RangeHashTree.from_items(dict(ITEMS))
+    assert tree1.root() == tree2.root()
+    assert tree1.diff(tree2) == []
+
+
+def test_incremental_update():
+    """
+    Test that incremental update gives the same tree as building from items
+    """
+    tree = merkle.RangeHashTree.from_items(ITEMS)
+    items = dict(ITEMS)
+    items[42] = (0.5, 0.5, 0.5)
+    items.pop(9999)
+    tree.set_item(42, items[42])
+    tree.unset_item(9999)
+    assert tree.root() == merkle.RangeHashTree.from_items(items).root()
+
+
+def test_diff_buckets():
+    """
+    Test that only buckets with changed items are reported
+    """
+    items = dict(ITEMS)
+    items[3] = (3.0, 1.0, 1.0)
+    items[5000] = (0.0, 0.0, 0.0)
+    items[20000] = (1.0, 1.0, 1.0)
+    tree1 = merkle.RangeHashTree.from_items(ITEMS)
+    tree2 = merkle.RangeHashTree.from_items(items)
+    assert tree1.root() != tree2.root()
+    buckets = tree1.diff(tree2)
+    assert buckets == [tree1.bucket_of(3), tree1.bucket_of(5000), tree1.bucket_of(20000)]
+    assert tree2.diff(tree1) == buckets
+
+
+def test_received_leaves():
+    """
+    Test that tree created from received hashes of buckets is equal to original tree
+    """
+    tree1 = merkle.RangeHashTree.from_items(ITEMS)
+    tree2 = merkle.RangeHashTree()
+    for bucket, leaf_hash in tree1.leaves.items():
+        tree2.set_leaf(bucket, leaf_hash)
+    assert tree1.root() == tree2.root()
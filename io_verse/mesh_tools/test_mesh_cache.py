@@ -0,0 +1,73 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Module with unit tests for mesh_cache module
+"""
+
+import mesh_cache as mc
+
+VERTICES = {0: (0.0, 0.0, 0.0), 1: (1.0, 0.0, 0.0), 2: (1.0, 1.0, 0.0), 5: (0.0, 1.0, 0.5)}
+EDGES = {0: (0, 1), 1: (1, 2), 2: (2, 5), 3: (5, 0)}
+FACES = {0: (0, 1, 2, 5)}
+
+
+def test_store_load(tmp_path):
+    """
+    Test that loaded mesh is equal to stored mesh
+    """
+    cache = mc.MeshCache(str(tmp_path))
+    cache.store('localhost', '12345', 65537, mc.CachedMesh((7, 3), VERTICES, EDGES, FACES))
+    cached = cache.load('localhost', '12345', 65537)
+    assert cached.version == (7, 3)
+    assert cached.vertices == VERTICES
+    assert cached.edges == EDGES
+    assert cached.faces == FACES
+
+
+def test_load_missing(tmp_path):
+    """
+    Test loading of mesh that was not cached
+    """
+    cache = mc.MeshCache(str(tmp_path))
+    assert cache.load('localhost', '12345', 65537) is None
+
+
+def test_load_truncated(tmp_path):
+    """
+    Test that truncated cache file is ignored
+    """
+    cache = mc.MeshCache(str(tmp_path))
+    cache.store('localhost', '12345', 65537, mc.CachedMesh((7, 3), VERTICES, EDGES, FACES))
+    file_path = cache.path('localhost', '12345', 65537)
+    with open(file_path, 'rb') as cache_file:
+        data = cache_file.read()
+    with open(file_path, 'wb') as cache_file:
+        cache_file.write(data[:-8])
+    assert cache.load('localhost', '12345', 65537) is None
+
+
+def test_servers_separated(tmp_path):
+    """
+    Test that meshes of different servers do not share cache files
+    """
+    cache = mc.MeshCache(str(tmp_path))
+    assert cache.path('localhost', '12345', 1) != cache.path('localhost', '12346', 1)
+    assert cache.path('../etc', '12345', 1).startswith(str(tmp_path))
@@ -0,0 +1,64 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Module with unit tests for mesh_encode module
+"""
+
+import mesh_encode as me
+import merkle
+
+COORDS = [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 1.0, 1.0, 0.0, 0.0, 1.0, 0.5, 2.0, 0.0, 0.0]
+EDGES = [0, 1, 1, 2, 2, 3, 3, 0, 1, 4, 4, 2]
+FACES = [1, 2, 3, 0, 1, 4, 2, 7]
+
+
+def test_encode_faces():
+    """
+    Test padding of triangles and rotation of quads with zero vertex at the end
+    """
+    faces = me.encode_faces(FACES, (4, 3))
+    assert list(faces) == [0, 1, 2, 3, 1, 4, 2, 0]
+    assert list(me.encode_faces(FACES)) == FACES
+
+
+def test_items():
+    """
+    Test that encoded items are equal to items built from Blender mesh
+    """
+    encoded = me.encode_mesh(COORDS, EDGES, FACES, (4, 3))
+    items = list(encoded.items())
+    assert len(encoded) == len(items) == 5 + 6 + 2
+    assert items[3] == (0, 3, (0.0, 1.0, 0.5))
+    assert items[5] == (1, 0, (0, 1))
+    assert items[-1] == (2, 1, (1, 4, 2, 0))
+
+
+def test_hashes():
+    """
+    Test that hash trees built from encoded hashes are equal to trees built from items
+    """
+    encoded = me.encode_mesh(COORDS, EDGES, FACES, (4, 3))
+    for layer_index in range(3):
+        items = {item_id: value for index, item_id, value in encoded.items() if index == layer_index}
+        tree = merkle.RangeHashTree.from_hashes(encoded.hashes[layer_index], encoded.leaves[layer_index])
+        assert tree.root() == merkle.RangeHashTree.from_items(items).root()
+        tree.set_item(0, (9, 9))
+        assert tree.root() != merkle.RangeHashTree.from_items(items).root()
@@ -0,0 +1,66 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Module with unit tests for regions module
+"""
+
+import array
+import regions
+
+
+def test_cell_id():
+    """
+    Test of packing coordinates of cells to IDs
+    """
+    for coords in ((0, 0, 0), (-1, 2, -3), (511, -512, 7)):
+        assert regions.cell_coords(regions.cell_id(*coords)) == coords
+    assert regions.cell_coords(regions.cell_id(1000, -1000, 0)) == (511, -512, 0)
+
+
+def test_cells_of_coords():
+    """
+    Test of finding cells of points
+    """
+    coords = array.array('d', [0.5, 0.5, 0.5, -0.5, 1.5, 0.0, 2.0, 2.0, 2.0])
+    cells = regions.cells_of_coords(coords, 2.0)
+    assert [regions.cell_coords(cell) for cell in cells] == [(0, 0, 0), (-1, 0, 0), (1, 1, 1)]
+    assert regions.cell_of((0.5, 0.5, 0.5), 2.0) == cells[0]
+
+
+def test_claims():
+    """
+    Test of resolving of two clients locking one region at the same time
+    """
+    first, second = regions.Claims(), regions.Claims()
+    first.request(7)
+    second.request(7)
+    # Verse server received value of the first client first
+    assert first.receive(7, 1, 1) is None
+    assert second.receive(7, 1, 2) is None
+    assert first.receive(7, 2, 1) is None
+    assert first.owned({7: 2}, 1) == set()
+    # The second client restores value of the winner
+    assert second.receive(7, 2, 2) == 1
+    assert first.receive(7, 1, 1) is None
+    assert first.owned({7: 1}, 1) == {7}
+    assert second.owned({7: 1}, 2) == set()
+    first.remove(7)
+    assert first.owned({7: 1}, 1) == set()
@@ -0,0 +1,97 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Module with unit tests for topology module
+"""
+
+import array
+import columnar
+import topology
+
+
+def test_map_ids():
+    """
+    Test of mapping vertex indexes to vertex IDs
+    """
+    ids = array.array('q', [10, 11, 12])
+    assert topology.map_ids(array.array('I', [2, 0, 1, 2]), ids) == array.array('I', [12, 10, 11, 12])
+
+
+def test_skip_unsent():
+    """
+    Test of skipping edges with vertices, which were not sent
+    """
+    vert_ids = array.array('q', [0, 1, topology.NEW_ID])
+    vertex_ids = topology.map_ids(array.array('I', [0, 1, 1, 2, 2, 0]), vert_ids, 'q')
+    edge_ids = array.array('q', [0, topology.NEW_ID, 1])
+    rows, deferred = topology.skip_unsent(edge_ids, vertex_ids, 2)
+    assert rows == array.array('I', [0, 1, 1, 0, 0, 0])
+    assert edge_ids == array.array('q', [0, topology.SKIP_ID, 1])
+    assert deferred == [2]
+    rows, deferred = topology.skip_unsent(edge_ids, array.array('q', [0, 1]), array.array('I', [2]))
+    assert (rows, deferred) == (array.array('I', [0, 1]), [])
+
+
+def test_pad_faces():
+    """
+    Test of padding triangles and skipping ngons
+    """
+    faces, ngons = topology.pad_faces(array.array('I', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]),
+                                      array.array('I', [3, 4, 5]))
+    assert faces == array.array('I', [1, 2, 3, 0, 4, 5, 6, 7, 0, 0, 0, 0])
+    assert ngons == [2]
+    faces, ngons = topology.pad_faces(array.array('I', [1, 2, 3, 0]), array.array('I', [4]))
+    assert faces == array.array('I', [0, 1, 2, 3])
+    assert ngons == []
+
+
+def test_diff_rows():
+    """
+    Test of detecting new, changed and removed edges
+    """
+    store = columnar.ColumnarStore(2, 'I')
+    store[0] = (1, 2)
+    store[1] = (2, 3)
+    store[2] = (3, 4)
+    rows = array.array('I', [1, 2, 2, 5, 5, 6, 6, 7])
+    elem_ids = array.array('q', [0, 1, topology.NEW_ID, topology.SKIP_ID])
+    new, changed, removed = topology.diff_rows(elem_ids, rows, store)
+    assert new == [2]
+    assert changed == [1]
+    assert removed == [2]
+    new, changed, removed = topology.diff_rows(array.array('q', [0, 1, 2]),
+                                               array.array('I', [1, 2, 2, 3, 3, 4]), store)
+    assert (new, changed, removed) == ([], [], [])
+    # Duplicated edge copied ID of original edge
+    elem_ids = array.array('q', [0, 1, 1])
+    new, changed, removed = topology.diff_rows(elem_ids, array.array('I', [1, 2, 2, 3, 2, 3]), store)
+    assert (new, changed, removed) == ([2], [], [2])
+    assert list(elem_ids) == [0, 1, topology.NEW_ID]
+
+
+def test_remap_row():
+    """
+    Test of renumbering vertices of edges and faces
+    """
+    id_map = {7: 0, 9: 2}
+    assert topology.remap_row((7, 3), id_map) == (0, 3)
+    assert topology.remap_row((9, 7, 3, 0), id_map) == (2, 0, 3, 0)
+    assert topology.remap_row((1, 3, 4, 7), id_map) == (0, 1, 3, 4)
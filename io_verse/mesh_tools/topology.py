@@ -0,0 +1,177 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements diffing of topology of mesh. Edges and faces are
+represented by flat arrays of vertex indexes extracted from mesh at once.
+Indexes are mapped to Verse IDs of vertices and resulting rows are compared
+with items of Verse layers stored in columnar storage, thus only created,
+deleted or changed edges and faces are processed individually.
+"""
+
+
+import array
+
+try:
+    from . import mesh_encode
+except ImportError:
+    import mesh_encode
+
+
+# ID of element, which was not sent to Verse server yet
+NEW_ID = -1
+
+# ID of element, which can not be sent to Verse server (e.g. face with more
+# than four vertices)
+SKIP_ID = -2
+
+
+def map_ids(indexes, ids, typecode='I'):
+    """
+    This function returns array of IDs of elements with given indexes
+    :indexes: flat array of indexes of elements (e.g. vertices)
+    :ids: array of IDs of elements indexed by index of element
+    """
+    return array.array(typecode, map(ids.__getitem__, indexes))
+
+
+def skip_unsent(elem_ids, vertex_ids, sizes):
+    """
+    This function handles edges and faces with vertices, which were not sent
+    to Verse server yet (negative IDs of vertices). New elements are marked as
+    SKIP_ID. The function returns tuple (array of vertex IDs with negative IDs
+    replaced by zero, positions of already sent elements, which can not be
+    changed now).
+    :elem_ids: array of IDs of elements
+    :vertex_ids: flat array of vertex IDs of all elements
+    :sizes: count of vertices of every element or one count for all elements
+    """
+    if len(vertex_ids) == 0 or min(vertex_ids) >= 0:
+        return array.array('I', vertex_ids), []
+    deferred = []
+    start = 0
+    for position, elem_id in enumerate(elem_ids):
+        size = sizes if isinstance(sizes, int) else sizes[position]
+        if min(vertex_ids[start:start + size], default=0) < 0:
+            if elem_id == NEW_ID:
+                elem_ids[position] = SKIP_ID
+            elif elem_id >= 0:
+                deferred.append(position)
+        start += size
+    return array.array('I', [max(vertex_id, 0) for vertex_id in vertex_ids]), deferred
+
+
+def reset_duplicates(elem_ids):
+    """
+    This function marks elements with ID used by previous element as NEW_ID
+    (e.g. elements duplicated in Blender copy layers with IDs). It returns
+    set of IDs of elements already sent to Verse server.
+    :elem_ids: array of IDs of elements
+    """
+    known_ids = set(elem_ids)
+    known_ids.discard(NEW_ID)
+    known_ids.discard(SKIP_ID)
+    if len(known_ids) == len(elem_ids) - elem_ids.count(NEW_ID) - elem_ids.count(SKIP_ID):
+        return known_ids
+    seen = set()
+    for position, elem_id in enumerate(elem_ids):
+        if elem_id < 0:
+            continue
+        if elem_id in seen:
+            elem_ids[position] = NEW_ID
+        else:
+            seen.add(elem_id)
+    return known_ids
+
+
+def pad_faces(face_vertices, face_sizes):
+    """
+    This function returns tuple (flat array of faces with four vertices,
+    list of positions of faces with more than four vertices). Triangles are
+    padded and quads are rotated like in mesh_encode.encode_faces(). Vertices
+    of faces with more than four vertices are zeros.
+    :face_vertices: flat array of vertex IDs of all faces
+    :face_sizes: array of count of vertices of faces
+    """
+    width = mesh_encode.FACE_WIDTH
+    ngons = []
+    if face_sizes.count(width) == len(face_sizes):
+        faces = array.array('I', face_vertices)
+    else:
+        faces = array.array('I', [0]) * (width * len(face_sizes))
+        start = 0
+        for face_index, face_size in enumerate(face_sizes):
+            if face_size <= width:
+                faces[face_index * width:face_index * width + face_size] = \
+                    array.array('I', face_vertices[start:start + face_size])
+            else:
+                ngons.append(face_index)
+            start += face_size
+    return mesh_encode.encode_faces(faces, face_sizes), ngons
+
+
+def diff_rows(elem_ids, rows, store):
+    """
+    This function compares rows of elements with items in store. It returns
+    tuple (positions of new elements, positions of changed elements, IDs of
+    removed items).
+    :elem_ids: array of IDs of elements; NEW_ID for new elements and SKIP_ID
+    for elements, which should be ignored; duplicated IDs are reset to NEW_ID
+    :rows: flat array of values of elements (store.width values per element)
+    :store: columnar.ColumnarStore with items sent to Verse server
+    """
+    width = store.width
+    distinct_ids = reset_duplicates(elem_ids)
+    new_positions = []
+    if NEW_ID in elem_ids or SKIP_ID in elem_ids:
+        # Compare only elements already sent to Verse server
+        known_positions = [position for position, elem_id in enumerate(elem_ids) if elem_id >= 0]
+        new_positions = [position for position, elem_id in enumerate(elem_ids) if elem_id == NEW_ID]
+        known_ids = array.array('q', (elem_ids[position] for position in known_positions))
+        known_rows = array.array(rows.typecode)
+        for position in known_positions:
+            known_rows.extend(rows[position * width:position * width + width])
+        changed = [known_positions[position] for position in store.changed_positions(known_ids, known_rows)]
+    else:
+        known_ids = elem_ids
+        changed = store.changed_positions(elem_ids, rows)
+    # When all known elements are stored and count of their distinct IDs is
+    # equal to count of stored items, then nothing was removed
+    if len(distinct_ids) == len(store) and \
+            all(elem_ids[position] in store for position in changed):
+        return new_positions, changed, []
+    return new_positions, changed, store.removed(known_ids)
+
+
+def remap_row(row, id_map):
+    """
+    This function returns tuple of vertex IDs of edge or face with IDs changed
+    according to id_map. Padding of triangles is kept and quads are rotated
+    like in mesh_encode.encode_faces().
+    :row: tuple of vertex IDs
+    :id_map: dictionary {old ID: new ID}
+    """
+    width = mesh_encode.FACE_WIDTH
+    if len(row) != width:
+        return tuple(id_map.get(vert_id, vert_id) for vert_id in row)
+    size = 3 if row[3] == 0 else width
+    face = [id_map.get(vert_id, vert_id) for vert_id in row[:size]] + [0] * (width - size)
+    return tuple(mesh_encode.encode_faces(face, [size]))
@@ -0,0 +1,38 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+This script prepares worker process encoding meshes. Worker processes are
+spawned with Python interpreter without Blender, thus the package of this
+add-on is registered without running its __init__ module, which imports
+bpy. Modules of mesh_tools can be imported in worker process then.
+"""
+
+
+import os
+import sys
+import types
+
+
+ADDON_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+package = types.ModuleType(os.path.basename(ADDON_PATH))
+package.__path__ = [ADDON_PATH]
+sys.modules.setdefault(package.__name__, package)
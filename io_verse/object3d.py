@@ -22,6 +22,9 @@ This module implements sharing Blender objects at Verse server
 """
 
 
+import array
+import time
+import weakref
 import bpy
 import bgl
 import mathutils
@@ -29,6 +32,11 @@ import verse as vrs
 from .vrsent import vrsent
 from . import session as vrs_session
 from . import ui
+from . import profiling
+from . import preferences
+from . import transform_sync
+from .mesh_tools import affine
+from . import logger
 from bpy_extras.view3d_utils import location_3d_to_region_2d
 
 
@@ -38,12 +46,37 @@ TG_TRANSFORM_CT = 0
 TAG_POSITION_CT = 0
 TAG_ROTATION_CT = 1
 TAG_SCALE_CT = 2
+TAG_VELOCITY_CT = 3
+TAG_PACKED_TRANSFORM_CT = 4
 # Info
 TG_INFO_CT = 1
 TAG_NAME_CT = 0
+TAG_MESH_CT = 1
 LAYER_BB_CT = 0
 
 
+def bounding_box(obj):
+    """
+    This function returns tuple (minimal corner, maximal corner) of bounding
+    box of vertices of mesh of Blender object in local space. Modifiers are
+    not applied like in bounding box sent during editing of mesh.
+    """
+    coords = array.array('d', [0.0]) * (3 * len(obj.data.vertices))
+    obj.data.vertices.foreach_get('co', coords)
+    bbox = affine.bounding_box(coords)
+    if bbox is None:
+        return (0.0, 0.0, 0.0), (0.0, 0.0, 0.0)
+    return bbox
+
+
+def redraw_3dviews():
+    """
+    This function redraws all 3D views after transformation of objects was
+    interpolated
+    """
+    ui.update_all_views(('VIEW_3D',))
+
+
 def update_3dview(node):
     """
     This method updates all 3D View but not in case, when object is selected/locked
@@ -91,9 +124,10 @@ class VerseObjectPosition(vrsent.VerseTag):
         This method is called, when new value of verse tag was set
         """
         tag = super(VerseObjectPosition, cls).cb_receive_tag_set_values(session, node_id, tg_id, tag_id, value)
+        tag.tg.node.shared_position = tuple(value)
         # Update position of Blender object that are not locked by this client
         if tag.tg.node.locked_by_me is False:
-            tag.tg.node.obj.location = mathutils.Vector(value)
+            tag.tg.node.receive_transform((tag.tg.node.motion.position, value))
         # Redraw all 3D views
         update_3dview(tag.tg.node)
         return tag
@@ -121,13 +155,10 @@ class VerseObjectRotation(vrsent.VerseTag):
         This method is called, when new value of verse tag was set
         """
         tag = super(VerseObjectRotation, cls).cb_receive_tag_set_values(session, node_id, tg_id, tag_id, value)
+        tag.tg.node.shared_rotation = tuple(value)
         # Update rotation of Blender object that are not locked by this client
         if tag.tg.node.locked_by_me is False:
-            # It is necessary to have right rotation_mode to set rotation using quaternion
-            prev_rot_mode = tag.tg.node.obj.rotation_mode
-            tag.tg.node.obj.rotation_mode = 'QUATERNION'
-            tag.tg.node.obj.rotation_quaternion = mathutils.Quaternion(value)
-            tag.tg.node.obj.rotation_mode = prev_rot_mode
+            tag.tg.node.receive_transform((tag.tg.node.motion.rotation, value))
         update_3dview(tag.tg.node)
         return tag
 
@@ -154,16 +185,88 @@ class VerseObjectScale(vrsent.VerseTag):
         This method is called, when new value of verse tag was set
         """
         tag = super(VerseObjectScale, cls).cb_receive_tag_set_values(session, node_id, tg_id, tag_id, value)
+        tag.tg.node.shared_scale = tuple(value)
         # Update scale of Blender object that are not locked by this client
         if tag.tg.node.locked_by_me is False:
-            tag.tg.node.obj.scale = mathutils.Vector(value)
+            tag.tg.node.receive_transform((tag.tg.node.motion.scale, value))
         update_3dview(tag.tg.node)
         return tag
 
 
+class VerseObjectVelocity(vrsent.VerseTag):
+    """
+    Custom VerseTag subclass representing velocity of Blender object. It is
+    sent before position and receivers use it for extrapolation of position.
+    """
+
+    node_custom_type = VERSE_OBJECT_CT
+    tg_custom_type = TG_TRANSFORM_CT
+    custom_type = TAG_VELOCITY_CT
+
+    def __init__(self, tg, tag_id=None, data_type=vrs.VALUE_TYPE_REAL32,
+                 count=3, custom_type=TAG_VELOCITY_CT, value=None):
+        """
+        Constructor of VerseObjectVelocity
+        """
+        super(VerseObjectVelocity, self).__init__(tg, tag_id, data_type, count, custom_type, value)
+
+    @classmethod
+    def cb_receive_tag_set_values(cls, session, node_id, tg_id, tag_id, value):
+        """
+        This method is called, when new value of verse tag was set
+        """
+        tag = super(VerseObjectVelocity, cls).cb_receive_tag_set_values(session, node_id, tg_id, tag_id, value)
+        if tag.tg.node.locked_by_me is False:
+            tag.tg.node.motion.receive_velocity(value)
+        return tag
+
+
+class VerseObjectPackedTransform(vrsent.VerseTag):
+    """
+    Custom VerseTag subclass representing position, rotation and scale of
+    Blender object packed to one string. All three values are sent in one
+    command and receivers apply them at once.
+    """
+
+    node_custom_type = VERSE_OBJECT_CT
+    tg_custom_type = TG_TRANSFORM_CT
+    custom_type = TAG_PACKED_TRANSFORM_CT
+
+    def __init__(self, tg, tag_id=None, data_type=vrs.VALUE_TYPE_STRING8,
+                 count=1, custom_type=TAG_PACKED_TRANSFORM_CT, value=None):
+        """
+        Constructor of VerseObjectPackedTransform
+        """
+        super(VerseObjectPackedTransform, self).__init__(tg, tag_id, data_type, count, custom_type, value)
+
+    @classmethod
+    def cb_receive_tag_set_values(cls, session, node_id, tg_id, tag_id, value):
+        """
+        This method is called, when new value of verse tag was set
+        """
+        tag = super(VerseObjectPackedTransform, cls).cb_receive_tag_set_values(
+            session, node_id, tg_id, tag_id, value)
+        node = tag.tg.node
+        try:
+            position, rotation, scale = transform_sync.unpack_transform(value[0])
+        except ValueError as err:
+            logger.LOGGER.error('Packed transformation could not be received: %s', err,
+                                extra={'fields': {'node_id': node_id}})
+            return tag
+        node.shared_position, node.shared_rotation, node.shared_scale = position, rotation, scale
+        # Update transformation of Blender object that are not locked by this client
+        if node.locked_by_me is False:
+            node.receive_transform((node.motion.position, position),
+                                   (node.motion.rotation, rotation),
+                                   (node.motion.scale, scale))
+        update_3dview(node)
+        return tag
+
+
 class VerseObjectBoundingBox(vrsent.VerseLayer):
     """
-    Custom VerseLayer subclass representing Blender object bounding box
+    Custom VerseLayer subclass representing Blender object bounding box. Item 0
+    is minimal corner and item 1 is maximal corner of box in local space.
     """
 
     node_custom_type = VERSE_OBJECT_CT
@@ -177,6 +280,7 @@ class VerseObjectBoundingBox(vrsent.VerseLayer):
         super(VerseObjectBoundingBox, self).__init__(node, parent_layer, layer_id, data_type, count, custom_type)
 
     @classmethod
+    @profiling.measure(items=1)
     def cb_receive_layer_set_value(cls, session, node_id, layer_id, item_id, value):
         """
         This method is called, when new value of verse layer was set
@@ -223,6 +327,36 @@ class VerseObjectName(vrsent.VerseTag):
         return tag
 
 
+class VerseObjectMesh(vrsent.VerseTag):
+    """
+    Custom VerseTag subclass representing ID of mesh node used by Blender object.
+    It is used by objects sharing one mesh with other object (linked duplicates).
+    The mesh node is child node of the first object using this mesh.
+    """
+
+    node_custom_type = VERSE_OBJECT_CT
+    tg_custom_type = TG_INFO_CT
+    custom_type = TAG_MESH_CT
+
+    def __init__(self, tg, tag_id=None, data_type=vrs.VALUE_TYPE_UINT32,
+                 count=1, custom_type=TAG_MESH_CT, value=None):
+        """
+        Constructor of VerseObjectMesh
+        """
+        super(VerseObjectMesh, self).__init__(tg, tag_id, data_type, count, custom_type, value)
+
+    @classmethod
+    def cb_receive_tag_set_values(cls, session, node_id, tg_id, tag_id, value):
+        """
+        This method is called, when ID of mesh node used by object is set
+        """
+        tag = super(VerseObjectMesh, cls).cb_receive_tag_set_values(session, node_id, tg_id, tag_id, value)
+        object_node = tag.tg.node
+        if object_node.locked_by_me is False:
+            object_node.link_mesh_node(value[0])
+        return tag
+
+
 class VerseObject(vrsent.VerseNode):
     """
     Custom VerseNode subclass representing Blender object
@@ -232,7 +366,11 @@ class VerseObject(vrsent.VerseNode):
     tg_custom_type = TG_TRANSFORM_CT
     custom_type = VERSE_OBJECT_CT
 
-    objects = {}
+    # Dictionary of object nodes indexed by node ID; nodes are owned by session
+    objects = weakref.WeakValueDictionary()
+
+    # Objects waiting for mesh node used by more objects
+    waiting_for_mesh = {}
 
     def __init__(self, session, node_id=None, parent=None, user_id=None, custom_type=VERSE_OBJECT_CT, obj=None):
         """
@@ -245,6 +383,20 @@ class VerseObject(vrsent.VerseNode):
         self.bb = VerseObjectBoundingBox(node=self)
         self.mesh_node = None
         self.icon_angle = 0.0
+        # Position predicted by other clients from sent position and velocity
+        self.position_model = transform_sync.DeadReckoning()
+        # Received transformation interpolated during redraws
+        self.motion = transform_sync.TransformInterpolator()
+        # Transformation set by this client according to received values
+        self.applied_location = None
+        self.applied_rotation = None
+        self.applied_scale = None
+        # Transformation known by Verse server (last sent or received values)
+        self.shared_position = None
+        self.shared_rotation = None
+        self.shared_scale = None
+        # Time of sending of the last change of transformation
+        self.transform_time = None
         if obj is not None:
             # Transformation
             self.transform.pos = VerseObjectPosition(
@@ -256,22 +408,35 @@ class VerseObject(vrsent.VerseNode):
             self.transform.scale = VerseObjectScale(
                 tg=self.transform,
                 value=tuple(obj.scale))
+            self.transform.vel = VerseObjectVelocity(
+                tg=self.transform,
+                value=transform_sync.ZERO_VELOCITY)
+            self.shared_position = self.transform.pos.value
+            self.shared_rotation = self.transform.rot.value
+            self.shared_scale = self.transform.scale.value
+            self.transform.packed = VerseObjectPackedTransform(
+                tg=self.transform,
+                value=(transform_sync.pack_transform(
+                    self.shared_position, self.shared_rotation, self.shared_scale),))
+            self.position_model.update(tuple(obj.location), time.time(), 0.0)
             # Information
             self.info.name = VerseObjectName(
                 tg=self.info,
                 value=(str(obj.name),))
+            self.info.mesh = VerseObjectMesh(tg=self.info)
             # Bounding Box
-            item_id = 0
-            for bb_point in obj.bound_box:
-                self.bb.items[item_id] = (bb_point[0], bb_point[1], bb_point[2])
-                item_id += 1
+            for item_id, point in enumerate(bounding_box(obj)):
+                self.bb.items[item_id] = point
             # Scene
             self.parent = session.nodes[bpy.context.scene.verse_data_node_id]
         else:
             self.transform.pos = VerseObjectPosition(tg=self.transform)
             self.transform.rot = VerseObjectRotation(tg=self.transform)
             self.transform.scale = VerseObjectScale(tg=self.transform)
+            self.transform.vel = VerseObjectVelocity(tg=self.transform)
+            self.transform.packed = VerseObjectPackedTransform(tg=self.transform)
             self.info.name = VerseObjectName(tg=self.info)
+            self.info.mesh = VerseObjectMesh(tg=self.info)
 
     @property
     def name(self):
@@ -288,6 +453,47 @@ class VerseObject(vrsent.VerseNode):
             except TypeError:
                 return ""
 
+    def share_mesh_node(self, mesh_node):
+        """
+        This method shares ID of mesh node, which is used by this object, but
+        it is child node of other object. When mesh node was not created at
+        Verse server yet, then ID will be shared later.
+        """
+        self.mesh_node = mesh_node
+        if mesh_node.id is not None:
+            self.info.mesh.value = (mesh_node.id,)
+        else:
+            mesh_node.linked_objects.append(self)
+
+    def link_mesh_node(self, mesh_node_id):
+        """
+        This method uses existing Blender mesh of mesh node for this object.
+        When mesh node was not received yet, then this object will wait for it.
+        """
+        try:
+            mesh_node = self.session.nodes[mesh_node_id]
+        except KeyError:
+            mesh_node = None
+        if mesh_node is None or mesh_node.mesh is None:
+            self.__class__.waiting_for_mesh.setdefault(mesh_node_id, []).append(self)
+            return
+        self.mesh_node = mesh_node
+        if self.obj.data != mesh_node.mesh:
+            old_mesh = self.obj.data
+            self.obj.data = mesh_node.mesh
+            # Remove empty mesh created for this object
+            if old_mesh is not None and old_mesh.users == 0:
+                bpy.data.meshes.remove(old_mesh)
+        ui.update_all_views(('VIEW_3D',))
+
+    @classmethod
+    def link_waiting_objects(cls, mesh_node):
+        """
+        This method links all objects waiting for Blender mesh of mesh node
+        """
+        for object_node in cls.waiting_for_mesh.pop(mesh_node.id, []):
+            object_node.link_mesh_node(mesh_node.id)
+
     @property
     def can_be_selected(self):
         """
@@ -383,32 +589,177 @@ class VerseObject(vrsent.VerseNode):
         This method tries to send fresh properties of mesh object to Verse server
         """
 
-        # Position
+        prefs = preferences.get_preferences()
+        # Changed values of transformation, which will be sent
+        position, rotation, scale = None, None, None
+
+        # Position; location set according to received position is not sent back
+        location = tuple(self.obj.location)
         if self.transform.pos.value is not None and \
-                self.transform.pos.value != tuple(self.obj.location):
-            self.transform.pos.value = tuple(self.obj.location)
+                location != self.applied_location:
+            prediction_error = prefs.prediction_error if prefs.dead_reckoning is True else None
+            sent = self.position_model.update(location, time.time(), prefs.position_epsilon, prediction_error)
+            if sent is not None:
+                # Velocity has to be received before position
+                if self.transform.vel.value is not None or sent[1] != transform_sync.ZERO_VELOCITY:
+                    self.transform.vel.value = sent[1]
+                position = sent[0]
+                if self.position_model.moving is True:
+                    transform_sync.watch(self)
 
         # Rotation
+        current_rotation = tuple(self.obj.matrix_local.to_quaternion().normalized())
         if self.transform.rot.value is not None and \
-                self.transform.rot.value != tuple(self.obj.matrix_local.to_quaternion().normalized()):
-            self.transform.rot.value = tuple(self.obj.matrix_local.to_quaternion().normalized())
+                transform_sync.rotation_changed(self.applied_rotation, current_rotation, prefs.rotation_epsilon) and \
+                transform_sync.rotation_changed(self.shared_rotation, current_rotation, prefs.rotation_epsilon):
+            rotation = current_rotation
 
         # Scale
+        current_scale = tuple(self.obj.scale)
         if self.transform.scale.value is not None and \
-                self.transform.scale.value != tuple(self.obj.scale):
-            self.transform.scale.value = tuple(self.obj.scale)
+                transform_sync.changed(self.applied_scale, current_scale, prefs.scale_epsilon) and \
+                transform_sync.changed(self.shared_scale, current_scale, prefs.scale_epsilon):
+            scale = current_scale
 
-        # Bounding box
-        item_id = 0
-        for bb_point in self.obj.bound_box:
+        if position is not None or rotation is not None or scale is not None:
+            self.send_transform(position, rotation, scale, prefs.packed_transform)
+
+    def send_bounding_box(self, bbox):
+        """
+        This method sends changed corners of bounding box (minimal corner,
+        maximal corner). It is called, when mesh of object is edited.
+        """
+        for item_id, point in enumerate(bbox):
             try:
-                if self.bb.items[item_id] != (bb_point[0], bb_point[1], bb_point[2]):
-                    self.bb.items[item_id] = (bb_point[0], bb_point[1], bb_point[2])
+                if self.bb.items[item_id] != point:
+                    self.bb.items[item_id] = point
             except KeyError:
                 # Bounding box was not received yet
                 break
-            item_id += 1
 
+    def send_transform(self, position=None, rotation=None, scale=None, packed=False):
+        """
+        This method sends changed values of transformation. When packed is
+        True, then all three values are sent in one packed tag; otherwise
+        changed values are sent in separate tags.
+        """
+        if position is not None:
+            self.shared_position = tuple(position)
+        if rotation is not None:
+            self.shared_rotation = tuple(rotation)
+        if scale is not None:
+            self.shared_scale = tuple(scale)
+        self.transform_time = time.time()
+        # Tags not used now are written, when transformation settles
+        transform_sync.watch(self)
+        if packed is True and self.transform.packed.value is not None and \
+                None not in (self.shared_position, self.shared_rotation, self.shared_scale):
+            self.transform.packed.value = (transform_sync.pack_transform(
+                self.shared_position, self.shared_rotation, self.shared_scale),)
+            return
+        if position is not None:
+            self.transform.pos.value = self.shared_position
+        if rotation is not None:
+            self.transform.rot.value = self.shared_rotation
+        if scale is not None:
+            self.transform.scale.value = self.shared_scale
+
+    def settle(self):
+        """
+        This method writes transformation to packed tag and separate tags,
+        when transformation was not changed for SETTLE_DELAY seconds, thus
+        clients reading any of these tags get the same values. It returns
+        False, while transformation is not settled.
+        """
+        if self.transform_time is None or self.locked_by_me is False:
+            return True
+        if time.time() - self.transform_time < transform_sync.SETTLE_DELAY:
+            return False
+        self.transform_time = None
+        for tag, value in ((self.transform.pos, self.shared_position),
+                           (self.transform.rot, self.shared_rotation),
+                           (self.transform.scale, self.shared_scale)):
+            if value is not None and tag.value is not None and tuple(tag.value) != value:
+                tag.value = value
+        if self.transform.packed.value is not None and \
+                None not in (self.shared_position, self.shared_rotation, self.shared_scale):
+            packed = (transform_sync.pack_transform(
+                self.shared_position, self.shared_rotation, self.shared_scale),)
+            if tuple(self.transform.packed.value) != packed:
+                self.transform.packed.value = packed
+        return True
+
+    def apply_location(self, location):
+        """
+        This method sets location of Blender object according to received
+        position. Such location is not sent back to Verse server.
+        """
+        self.obj.location = mathutils.Vector(location)
+        self.applied_location = tuple(self.obj.location)
+
+    def apply_rotation(self, rotation):
+        """
+        This method sets rotation of Blender object according to received
+        rotation. Such rotation is not sent back to Verse server.
+        """
+        # It is necessary to have right rotation_mode to set rotation using quaternion
+        prev_rot_mode = self.obj.rotation_mode
+        self.obj.rotation_mode = 'QUATERNION'
+        self.obj.rotation_quaternion = mathutils.Quaternion(rotation)
+        self.obj.rotation_mode = prev_rot_mode
+        self.applied_rotation = tuple(rotation)
+
+    def apply_scale(self, scale):
+        """
+        This method sets scale of Blender object according to received scale.
+        Such scale is not sent back to Verse server.
+        """
+        self.obj.scale = mathutils.Vector(scale)
+        self.applied_scale = tuple(self.obj.scale)
+
+    def receive_transform(self, *received):
+        """
+        This method stores received values of position, rotation or scale
+        (tuples (buffer of samples, value)). Interpolated transformation is
+        applied to Blender object by job of session, not in draw callback.
+        """
+        now = time.time()
+        for samples, value in received:
+            samples.add(value, now)
+        transform_sync.interpolate(self, redraw_3dviews)
+
+    def animate(self, now):
+        """
+        This method sets transformation of Blender object edited by other client
+        to received values interpolated with small playout delay (position is
+        extrapolated using received velocity). It returns True, when
+        transformation is still changing.
+        """
+        if self.locked_by_me is True:
+            return False
+        prefs = preferences.get_preferences()
+        when = now - prefs.playout_delay if prefs.interpolation is True else now
+        position, rotation, scale = self.motion.state(when)
+        shown_position, shown_rotation, shown_scale = self.motion.shown
+        # Unchanged values are not applied again
+        if position is not None and position != shown_position:
+            self.apply_location(position)
+        if rotation is not None and rotation != shown_rotation:
+            self.apply_rotation(rotation)
+        if scale is not None and scale != shown_scale:
+            self.apply_scale(scale)
+        self.motion.shown = (position, rotation, scale)
+        return self.motion.active(when)
+
+    def release(self):
+        """
+        This method removes references on Blender object and mesh node, when
+        Blender is disconnected from Verse server
+        """
+        self.mesh_node = None
+        self.obj = None
+
+    @profiling.measure()
     def draw(self, context):
         """
         Draw vector icon on position of shared object
@@ -433,7 +784,7 @@ class VerseObject(vrsent.VerseNode):
         col_prev = bgl.Buffer(bgl.GL_FLOAT, [4])
         bgl.glGetFloatv(bgl.GL_COLOR, col_prev)
 
-        pos = self.transform.pos.value
+        pos = self.shared_position
         if pos is not None:
             new_pos = location_3d_to_region_2d(
                 context.region,
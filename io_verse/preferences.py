@@ -0,0 +1,219 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements preferences of io_verse Add-on
+"""
+
+
+import time
+import bpy
+from . import logger
+from . import transform_sync
+from . import locking
+
+
+def cb_set_log_level(self, context):
+    """
+    Callback function called, when level of logging is changed
+    """
+    logger.set_level(self.log_level)
+
+
+class VerseShowLog(bpy.types.Operator):
+    """
+    This operator copies records of log to text, which could be displayed
+    in Text Editor
+    """
+    bl_idname = "wm.verse_show_log"
+    bl_label = "Copy Log to Text"
+    bl_description = "Copy recent messages of Verse Add-on to text 'verse_log'"
+
+    def execute(self, context):
+        text = bpy.data.texts.get('verse_log')
+        if text is None:
+            text = bpy.data.texts.new('verse_log')
+        text.clear()
+        for record in logger.RING_BUFFER.records():
+            text.write('%s %-7s %s' % (
+                time.strftime('%H:%M:%S', time.localtime(record['time'])),
+                record['level'],
+                record['message']))
+            for key, value in sorted(record['fields'].items()):
+                text.write(' %s=%r' % (key, value))
+            text.write('\n')
+        self.report({'INFO'}, "Log copied to text verse_log")
+        return {'FINISHED'}
+
+
+class VerseAddonPreferences(bpy.types.AddonPreferences):
+    """
+    Preferences of Verse Add-on
+    """
+    bl_idname = __package__
+
+    log_level = bpy.props.EnumProperty(
+        name="Log Level",
+        items=logger.LEVELS,
+        default=logger.DEFAULT_LEVEL,
+        description="Minimal level of printed messages",
+        update=cb_set_log_level
+    )
+
+    position_epsilon = bpy.props.FloatProperty(
+        name="Position Epsilon",
+        default=transform_sync.DEFAULT_POSITION_EPSILON,
+        min=0.0,
+        precision=6,
+        description="Smaller changes of position of object are not sent to Verse server"
+    )
+
+    rotation_epsilon = bpy.props.FloatProperty(
+        name="Rotation Epsilon",
+        default=transform_sync.DEFAULT_ROTATION_EPSILON,
+        min=0.0,
+        precision=6,
+        description="Smaller changes of components of rotation quaternion are not sent to Verse server"
+    )
+
+    scale_epsilon = bpy.props.FloatProperty(
+        name="Scale Epsilon",
+        default=transform_sync.DEFAULT_SCALE_EPSILON,
+        min=0.0,
+        precision=6,
+        description="Smaller changes of scale of object are not sent to Verse server"
+    )
+
+    dead_reckoning = bpy.props.BoolProperty(
+        name="Dead Reckoning",
+        default=True,
+        description="Send velocity with position and send position again only, "
+                    "when position predicted by other clients is wrong"
+    )
+
+    prediction_error = bpy.props.FloatProperty(
+        name="Prediction Error",
+        default=transform_sync.DEFAULT_PREDICTION_ERROR,
+        min=0.0,
+        precision=4,
+        description="Maximal error of position of moving object predicted by other clients"
+    )
+
+    interpolation = bpy.props.BoolProperty(
+        name="Interpolation",
+        default=True,
+        description="Interpolate received transformation of objects between received values"
+    )
+
+    playout_delay = bpy.props.FloatProperty(
+        name="Playout Delay",
+        default=transform_sync.DEFAULT_PLAYOUT_DELAY,
+        min=0.0,
+        max=1.0,
+        precision=3,
+        description="Received transformation of objects is displayed with this delay (seconds)"
+    )
+
+    packed_transform = bpy.props.BoolProperty(
+        name="Packed Transformation",
+        default=False,
+        description="Send position, rotation and scale of object in one packed tag "
+                    "(other clients have to support it)"
+    )
+
+    lock_grace = bpy.props.FloatProperty(
+        name="Lock Grace Period",
+        default=locking.DEFAULT_LOCK_GRACE,
+        min=0.0,
+        max=60.0,
+        precision=1,
+        description="Deselected object is unlocked after this count of seconds"
+    )
+
+    lock_prefetch = bpy.props.BoolProperty(
+        name="Lock Hovered Objects",
+        default=False,
+        description="Request lock of object not locked by other users, "
+                    "when mouse cursor stays above its origin"
+    )
+
+    def draw(self, context):
+        """
+        Definition of preferences layout
+        """
+        layout = self.layout
+        row = layout.row()
+        row.prop(self, "log_level")
+        row.operator("wm.verse_show_log")
+        box = layout.box()
+        box.label("Object Transformation")
+        row = box.row()
+        row.prop(self, "position_epsilon")
+        row.prop(self, "rotation_epsilon")
+        row.prop(self, "scale_epsilon")
+        row = box.row()
+        row.prop(self, "dead_reckoning")
+        sub = row.row()
+        sub.active = self.dead_reckoning
+        sub.prop(self, "prediction_error")
+        row = box.row()
+        row.prop(self, "interpolation")
+        sub = row.row()
+        sub.active = self.interpolation
+        sub.prop(self, "playout_delay")
+        box.prop(self, "packed_transform")
+        box = layout.box()
+        box.label("Locking")
+        row = box.row()
+        row.prop(self, "lock_grace")
+        row.prop(self, "lock_prefetch")
+
+
+def get_preferences(context=None):
+    """
+    This function returns preferences of Verse Add-on
+    """
+    if context is None:
+        context = bpy.context
+    return context.user_preferences.addons[__package__].preferences
+
+
+# List of Blender classes in this submodule
+classes = (
+    VerseShowLog,
+    VerseAddonPreferences
+)
+
+
+def register():
+    """
+    This method register all methods of this submodule
+    """
+    for c in classes:
+        bpy.utils.register_class(c)
+    logger.setup()
+    logger.set_level(get_preferences().log_level)
+
+
+def unregister():
+    """
+    This method unregister all methods of this submodule
+    """
+    for c in classes:
+        bpy.utils.unregister_class(c)
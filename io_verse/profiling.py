@@ -0,0 +1,271 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements measuring of callback functions and methods. Count of
+calls, cumulative duration, 95th percentile of duration and count of
+processed items are collected for every measured callback. Measured
+callbacks and spans could be also traced to Chrome trace event format, which
+could be loaded to chrome://tracing or Perfetto. Measuring and tracing are
+disabled by default and disabled measuring costs one test of flag per call.
+"""
+
+
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+
+# Is collecting of statistics enabled
+METRICS = False
+
+# Is tracing enabled
+TRACING = False
+
+# Is collecting of statistics or tracing enabled
+ENABLED = False
+
+# Count of recent durations used for computing percentiles
+SAMPLES = 1000
+
+# Statistics of measured callbacks: name -> CallbackStats
+STATS = {}
+
+# Maximal count of traced events; tracing stops, when it is reached
+MAX_TRACE_EVENTS = 1000000
+
+# Traced events in Chrome trace event format
+TRACE_EVENTS = []
+
+# Beginning of tracing
+TRACE_START = 0.0
+
+
+class CallbackStats(object):
+    """
+    Statistics of one measured callback
+    """
+
+    def __init__(self, name):
+        """
+        Constructor of CallbackStats
+        """
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.items = 0
+        self.durations = collections.deque(maxlen=SAMPLES)
+
+    def add(self, duration, items=0):
+        """
+        This method adds duration of one call
+        """
+        self.count += 1
+        self.total += duration
+        self.items += items
+        if duration > self.max:
+            self.max = duration
+        self.durations.append(duration)
+
+    def percentile(self, fraction):
+        """
+        This method returns percentile of recent durations
+        """
+        if len(self.durations) == 0:
+            return 0.0
+        durations = sorted(self.durations)
+        return durations[min(len(durations) - 1, int(fraction * len(durations)))]
+
+    @property
+    def mean(self):
+        """
+        Mean duration of one call
+        """
+        return self.total / self.count if self.count > 0 else 0.0
+
+    @property
+    def p95(self):
+        """
+        95th percentile of recent durations
+        """
+        return self.percentile(0.95)
+
+    def to_dict(self):
+        """
+        This method returns statistics as dictionary
+        """
+        return {
+            'name': self.name,
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'p95': self.p95,
+            'max': self.max,
+            'items': self.items
+        }
+
+
+def get_stats(name):
+    """
+    This function returns statistics of callback with given name
+    """
+    try:
+        return STATS[name]
+    except KeyError:
+        stats = STATS[name] = CallbackStats(name)
+        return stats
+
+
+def measure(name=None, items=0):
+    """
+    This decorator measures duration of decorated function. Statistics are
+    stored under given name or under qualified name of function. Every call
+    adds items to count of processed items.
+    """
+    def decorator(func):
+        stats_name = name if name is not None else func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if ENABLED is False:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stats_name, start, time.perf_counter(), items)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def span(name):
+    """
+    This context manager measures duration of block of code
+    """
+    if ENABLED is False:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, start, time.perf_counter())
+
+
+def record(name, start, end, items=0):
+    """
+    This function adds duration of one call to statistics and trace
+    """
+    if METRICS is True:
+        get_stats(name).add(end - start, items)
+    if TRACING is True:
+        TRACE_EVENTS.append({
+            'name': name,
+            'cat': 'verse',
+            'ph': 'X',
+            'ts': 1e6 * (start - TRACE_START),
+            'dur': 1e6 * (end - start),
+            'pid': os.getpid(),
+            'tid': threading.get_ident()
+        })
+        if len(TRACE_EVENTS) >= MAX_TRACE_EVENTS:
+            stop_tracing()
+
+
+def count_items(name, items):
+    """
+    This function adds count of items processed by measured callback
+    """
+    if METRICS is True:
+        get_stats(name).items += items
+
+
+def enable():
+    """
+    This function enables collecting of statistics
+    """
+    global METRICS, ENABLED
+    METRICS = True
+    ENABLED = True
+
+
+def disable():
+    """
+    This function disables collecting of statistics
+    """
+    global METRICS, ENABLED
+    METRICS = False
+    ENABLED = TRACING
+
+
+def start_tracing():
+    """
+    This function removes traced events and starts tracing
+    """
+    global TRACING, ENABLED, TRACE_START
+    del TRACE_EVENTS[:]
+    TRACE_START = time.perf_counter()
+    TRACING = True
+    ENABLED = True
+
+
+def stop_tracing():
+    """
+    This function stops tracing
+    """
+    global TRACING, ENABLED
+    TRACING = False
+    ENABLED = METRICS
+
+
+def dump_trace(path):
+    """
+    This function writes traced events to JSON file in Chrome trace event
+    format
+    """
+    with open(path, 'w') as json_file:
+        json.dump({'traceEvents': TRACE_EVENTS, 'displayTimeUnit': 'ms'}, json_file)
+
+
+def reset():
+    """
+    This function removes all collected statistics
+    """
+    STATS.clear()
+
+
+def report():
+    """
+    This function returns list of statistics sorted by cumulative duration
+    """
+    return sorted(STATS.values(), key=lambda stats: stats.total, reverse=True)
+
+
+def dump_json(path):
+    """
+    This function writes all statistics to JSON file
+    """
+    with open(path, 'w') as json_file:
+        json.dump([stats.to_dict() for stats in report()], json_file, indent=2)
@@ -0,0 +1,210 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements recording of commands received from Verse server and
+sent to Verse server to binary log and replaying of recorded commands. Every
+record contains time offset from the beginning of recording, direction,
+index of command name and positional and keyword arguments encoded by
+marshal module. Names of
+commands are stored in the log, when they are used for the first time.
+"""
+
+
+import marshal
+import os
+import struct
+import time
+import bpy
+
+
+LOG_MAGIC = b'VRSR'
+LOG_FORMAT = 2
+
+# Magic, format, time of the beginning of recording
+HEADER = struct.Struct('<4sHd')
+# Time offset, kind of record, index of command name, size of arguments
+RECORD = struct.Struct('<dBHI')
+
+KIND_IN = 0
+KIND_OUT = 1
+KIND_NAME = 2
+
+DIRECTIONS = {'in': KIND_IN, 'out': KIND_OUT}
+
+# Recorder of current session
+RECORDER = None
+
+
+class Recorder(object):
+    """
+    Command hook writing commands to binary log
+    """
+
+    def __init__(self, path):
+        """
+        Constructor of Recorder
+        """
+        self.path = path
+        self.names = {}
+        self.count = 0
+        self.start = time.perf_counter()
+        self.log_file = open(path, 'wb')
+        self.log_file.write(HEADER.pack(LOG_MAGIC, LOG_FORMAT, time.time()))
+
+    def __call__(self, direction, command, args, kwargs):
+        """
+        This method writes one command to the log
+        """
+        offset = time.perf_counter() - self.start
+        try:
+            name_index = self.names[command]
+        except KeyError:
+            name_index = self.names[command] = len(self.names)
+            name = command.encode('utf-8')
+            self.log_file.write(RECORD.pack(offset, KIND_NAME, name_index, len(name)))
+            self.log_file.write(name)
+        data = marshal.dumps((args, kwargs))
+        self.log_file.write(RECORD.pack(offset, DIRECTIONS[direction], name_index, len(data)))
+        self.log_file.write(data)
+        self.count += 1
+
+    def close(self):
+        """
+        This method writes buffered records and closes the log
+        """
+        self.log_file.flush()
+        self.log_file.close()
+
+
+def read_log(path):
+    """
+    This generator yields tuples (time offset, direction, command, arguments,
+    keyword arguments) of recorded commands
+    """
+    names = []
+    with open(path, 'rb') as log_file:
+        magic, log_format, _start_time = HEADER.unpack(log_file.read(HEADER.size))
+        if magic != LOG_MAGIC or log_format != LOG_FORMAT:
+            raise ValueError('File %s is not log of Verse commands' % path)
+        while True:
+            header = log_file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            offset, kind, name_index, size = RECORD.unpack(header)
+            data = log_file.read(size)
+            if len(data) < size:
+                return
+            if kind == KIND_NAME:
+                names.append(data.decode('utf-8'))
+            else:
+                args, kwargs = marshal.loads(data)
+                yield offset, 'in' if kind == KIND_IN else 'out', names[name_index], args, kwargs
+
+
+def deliver(session, command, args, kwargs=None):
+    """
+    This function calls callback method of session with recorded arguments
+    """
+    callback = getattr(session, 'cb_receive_' + command, None)
+    if callback is not None:
+        callback(*args, **(kwargs or {}))
+
+
+class ReplayJob(object):
+    """
+    Job feeding recorded incoming commands to callback methods of session.
+    Commands are fed at original speed or at maximal speed.
+    """
+
+    def __init__(self, session, path, max_speed=False):
+        """
+        Constructor of ReplayJob
+        """
+        self.session = session
+        self.records = (record for record in read_log(path) if record[1] == 'in')
+        self.max_speed = max_speed
+        self.next_record = None
+        self.start = time.perf_counter()
+        self.count = 0
+
+    def __str__(self):
+        """
+        This method returns string describing progress of the job
+        """
+        return 'Replayed %d commands' % self.count
+
+    def step(self):
+        """
+        This method feeds commands, which should be received till now.
+        It returns True, when the job is not finished yet.
+        """
+        now = time.perf_counter() - self.start
+        while True:
+            if self.next_record is None:
+                self.next_record = next(self.records, None)
+                if self.next_record is None:
+                    return False
+            offset, _direction, command, args, kwargs = self.next_record
+            if self.max_speed is False and offset > now:
+                return True
+            self.next_record = None
+            deliver(self.session, command, args, kwargs)
+            self.count += 1
+
+
+def replay(session, path):
+    """
+    This function feeds all recorded incoming commands to session at maximal
+    speed. It returns count of commands and duration of replaying.
+    """
+    job = ReplayJob(session, path, max_speed=True)
+    job.step()
+    return job.count, time.perf_counter() - job.start
+
+
+def start_recording(session, path):
+    """
+    This function starts recording of commands of session
+    """
+    global RECORDER
+    stop_recording(session)
+    RECORDER = Recorder(path)
+    session.add_command_hook(RECORDER)
+    return RECORDER
+
+
+def stop_recording(session):
+    """
+    This function stops recording of commands
+    """
+    global RECORDER
+    if RECORDER is not None:
+        if session is not None:
+            session.remove_command_hook(RECORDER)
+        RECORDER.close()
+        RECORDER = None
+
+
+def default_log_path():
+    """
+    This function returns path of new log in directory with Blender data files
+    """
+    log_dir = bpy.utils.user_resource('DATAFILES', path='verse_records', create=True)
+    return os.path.join(log_dir, time.strftime('%Y%m%d-%H%M%S') + '.vrsr')
@@ -20,6 +20,7 @@
 This module implements sharing Blender scenes at Verse server
 """
 
+import weakref
 import bpy
 import verse as vrs
 from .vrsent import vrsent
@@ -27,6 +28,10 @@ from . import object3d
 from . import mesh
 from . import avatar_view
 from . import ui
+from . import profiling
+from . import locking
+from . import preferences
+from . import session as vrs_session
 
 
 VERSE_SCENE_CT = 123
@@ -36,6 +41,7 @@ TAG_SCENE_NAME_CT = 0
 VERSE_SCENE_DATA_CT = 124
 
 
+@profiling.measure()
 def cb_scene_update(context):
     """
     This function is used as callback function. It is called,
@@ -58,9 +64,21 @@ def cb_scene_update(context):
             # When shared mesh object is in edit mode, then check if there is
             # cached geometry
             vrs_obj = object3d.VerseObject.objects[edit_obj.verse_node_id]
-            if vrs_obj.mesh_node is not None:
-                vrs_obj.mesh_node.send_updates()
+            mesh_node = vrs_obj.mesh_node
+            # Only client holding lock of mesh or regions of mesh can send changes
+            if mesh_node is not None:
+                if mesh_node.locked_by_me is True or mesh_node.region_editing is True:
+                    mesh_node.send_updates()
+                elif mesh_node.locked is False:
+                    # Editing in regions ended; mesh has to be locked again
+                    lock_manager = locking.LockManager.get(vrs_session.VerseSession.instance())
+                    lock_manager.acquire((vrs_obj,))
         else:
+            profiling.count_items('cb_scene_update', len(bpy.data.objects))
+            lock_manager = locking.LockManager.get(vrs_session.VerseSession.instance())
+            lock_manager.grace = preferences.get_preferences().lock_grace
+            # Newly selected objects are locked at once
+            selected_nodes = []
             for obj in bpy.data.objects:
                 # Is object shared at verse server
                 if obj.verse_node_id != -1:
@@ -74,23 +92,29 @@ def cb_scene_update(context):
                         if vrs_obj.can_be_selected is False:
                             obj.select = False
                             obj.hide_select = True
+                        # Object with mesh edited in regions by more clients
+                        # is not locked as a whole
+                        elif vrs_obj.locked is False and \
+                                vrs_obj.mesh_node is not None and \
+                                vrs_obj.mesh_node.region_editing is True:
+                            continue
                         # When object is selected and it is not locked, then try to
                         # lock this object
                         elif vrs_obj.locked is False:
-                            vrs_obj.lock()
-                            if vrs_obj.mesh_node is not None:
-                                vrs_obj.mesh_node.lock()
+                            selected_nodes.append(vrs_obj)
                         # When client has permission to select, then it can not be
                         # locked by other client
                         elif vrs_obj.locked_by_me is False:
                             obj.select = False
                             obj.hide_select = True
+                        else:
+                            lock_manager.keep(vrs_obj)
                     # When object is not selected, but it is still locked,
-                    # then unlock this node
+                    # then unlock this node after grace period
                     elif vrs_obj.locked_by_me is True:
-                        vrs_obj.unlock()
-                        if vrs_obj.mesh_node is not None:
-                            vrs_obj.mesh_node.unlock()
+                        lock_manager.release(vrs_obj)
+            if len(selected_nodes) > 0:
+                lock_manager.acquire(selected_nodes)
 
 
 class VerseSceneData(vrsent.VerseNode):
@@ -261,7 +285,8 @@ class VerseScene(vrsent.VerseNode):
 
     custom_type = VERSE_SCENE_CT
 
-    scenes = {}
+    # Dictionary of scene nodes indexed by node ID; nodes are owned by session
+    scenes = weakref.WeakValueDictionary()
 
     def __init__(self, session, node_id=None, parent=None, user_id=None, custom_type=VERSE_SCENE_CT, name=None):
         """
@@ -31,6 +31,15 @@ import bpy
 import verse as vrs
 from .vrsent import vrsent
 from . import ui
+from . import mesh
+from . import recorder
+from . import traffic
+from . import profiling
+from . import logger
+from . import memory
+from . import object3d
+from . import locking
+from . import preferences
 
 
 # VerseSession class
@@ -57,7 +66,15 @@ class VerseSession(vrsent.VerseSession):
         # Call __init__ from parent class to connect to Verse server
         super(VerseSession, self).__init__(hostname, service, flag)
         self.__class__.__instance = self
-        self.debug_print = True
+        # Commands are printed only, when debug messages are logged
+        self.debug_print = logger.is_debug()
+        # List of long running jobs (e.g. sharing of many objects)
+        self.jobs = []
+        # Functions called with every sent and received command
+        self.command_hooks = []
+        # Item of layer (node ID, layer ID, item ID) just being received;
+        # it is not sent back to Verse server
+        self.received_item = None
 
     def __del__(self):
         """
@@ -65,6 +82,56 @@ class VerseSession(vrsent.VerseSession):
         """
         self.__class__.__instance = None
 
+    def run_jobs(self):
+        """
+        run_jobs() -> None
+        This method does one step of all long running jobs. Finished
+        jobs are removed from the list of jobs.
+        """
+        self.jobs = [job for job in self.jobs if job.step() is True]
+
+    def add_command_hook(self, hook):
+        """
+        add_command_hook(hook) -> None
+        This method adds function, which will be called with every sent and
+        received command: hook(direction, command, args, kwargs), where
+        direction is 'out' or 'in'. Methods of session are wrapped only, when some
+        hook is added.
+        """
+        if len(self.command_hooks) == 0:
+            for name in dir(self.__class__):
+                if name.startswith('send_'):
+                    self.__wrap_method(name, 'out', name[len('send_'):])
+                elif name.startswith('cb_receive_'):
+                    self.__wrap_method(name, 'in', name[len('cb_receive_'):])
+        self.command_hooks.append(hook)
+
+    def remove_command_hook(self, hook):
+        """
+        remove_command_hook(hook) -> None
+        This method removes function called with every command
+        """
+        if hook in self.command_hooks:
+            self.command_hooks.remove(hook)
+        if len(self.command_hooks) == 0:
+            for name in list(self.__dict__.keys()):
+                if name.startswith('send_') or name.startswith('cb_receive_'):
+                    delattr(self, name)
+
+    def __wrap_method(self, name, direction, command):
+        """
+        This method replaces method of this session with wrapper calling
+        command hooks
+        """
+        method = getattr(self, name)
+        hooks = self.command_hooks
+
+        def wrapper(*args, **kwargs):
+            for hook in hooks:
+                hook(direction, command, args, kwargs)
+            return method(*args, **kwargs)
+        setattr(self, name, wrapper)
+
     def cb_receive_connect_terminate(self, error):
         """
         receive_connect_terminate(error) -> none
@@ -72,8 +139,17 @@ class VerseSession(vrsent.VerseSession):
         # Call parent method to print debug information
         super(VerseSession, self).cb_receive_connect_terminate(error)
         self.__class__.__instance = None
-        # Clear dictionary of nodes
-        self.nodes.clear()
+        logger.LOGGER.info('Disconnected from %s:%s', self.hostname, self.service,
+                           extra={'fields': {'error': error}})
+        # Stop recording and counting of commands
+        recorder.stop_recording(self)
+        traffic.stop_metering(self)
+        # Store received meshes to local cache to speed up next subscription
+        mesh.save_mesh_cache(self)
+        # Cancel unfinished jobs, release bmeshes and caches of nodes and
+        # clear dictionary of nodes
+        self.jobs = []
+        memory.teardown(self)
 
         # Stop capturing of current view to 3D View
         # Save current context to 3d view, start capturing and
@@ -99,6 +175,8 @@ class VerseSession(vrsent.VerseSession):
         _receive_connect_accept(self, user_id, avatar_id) -> None
         """
         super(VerseSession, self).cb_receive_connect_accept(user_id, avatar_id)
+        logger.LOGGER.info('Connected to %s:%s', self.hostname, self.service,
+                           extra={'fields': {'user_id': user_id, 'avatar_id': avatar_id}})
 
         # Set Blender property
         bpy.context.window_manager.verse_connected = True
@@ -196,11 +274,24 @@ class ModalTimerOperator(bpy.types.Operator):
         if event.type == 'TIMER':
             vrs_session = VerseSession.instance()
             if vrs_session is not None:
-                try:
-                    vrs_session.callback_update()
-                except vrs.VerseError:
-                    del vrs_session
-                    return {'CANCELLED'}
+                with profiling.span('ModalTimerOperator.modal'):
+                    try:
+                        with profiling.span('callback_update'):
+                            vrs_session.callback_update()
+                        with profiling.span('run_jobs'):
+                            vrs_session.run_jobs()
+                    except vrs.VerseError:
+                        del vrs_session
+                        return {'CANCELLED'}
+        elif event.type == 'MOUSEMOVE':
+            # Lock of object under mouse cursor is requested in advance
+            vrs_session = VerseSession.instance()
+            if vrs_session is not None and \
+                    context.scene.subscribed is True and \
+                    preferences.get_preferences(context).lock_prefetch is True:
+                locking.LockManager.get(vrs_session).hover(
+                    context.window.screen, event.mouse_x, event.mouse_y,
+                    object3d.VerseObject.objects.values())
         return {'PASS_THROUGH'}
 
     def execute(self, context):
@@ -0,0 +1,150 @@
+#!/bin/usr/env python
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Module with unit tests for transform_sync module
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import transform_sync
+
+
+def test_dead_reckoning():
+    """
+    Test of sending position only, when prediction of receivers is wrong
+    """
+    model = transform_sync.DeadReckoning()
+    assert model.update((0.0, 0.0, 0.0), 0.0, 1e-4, 0.01) == ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+    assert model.moving is False
+    # Object started moving with velocity 1.0 along X axis
+    assert model.update((0.1, 0.0, 0.0), 0.1, 1e-4, 0.01) == ((0.1, 0.0, 0.0), (1.0, 0.0, 0.0))
+    assert model.moving is True
+    # Receivers predict uniform motion well
+    assert model.update((0.2, 0.0, 0.0), 0.2, 1e-4, 0.01) is None
+    # Object stopped; position of object at rest is sent exactly
+    assert model.update((0.2, 0.0, 0.0), 0.3, 1e-4, 0.01) == ((0.2, 0.0, 0.0), (0.0, 0.0, 0.0))
+    assert model.moving is False
+    # Without prediction error velocity is never sent
+    model = transform_sync.DeadReckoning()
+    model.update((0.0, 0.0, 0.0), 0.0, 1e-4)
+    assert model.update((0.1, 0.0, 0.0), 0.1, 1e-4) == ((0.1, 0.0, 0.0), (0.0, 0.0, 0.0))
+    assert model.update((0.1, 0.0, 0.00001), 0.2, 1e-4) is None
+
+
+def test_sample_buffer():
+    """
+    Test of interpolating received values
+    """
+    buffer = transform_sync.SampleBuffer()
+    assert buffer.sample(0.0) is None
+    buffer.add((0.0, 0.0, 0.0), 1.0)
+    buffer.add((2.0, 0.0, 0.0), 2.0)
+    assert buffer.sample(0.5) == (0.0, 0.0, 0.0)
+    assert buffer.sample(1.5) == (1.0, 0.0, 0.0)
+    assert buffer.pending(1.5) is True
+    assert buffer.sample(3.0) == (2.0, 0.0, 0.0)
+    assert buffer.pending(3.0) is False
+    # Values received at the same time replace each other
+    buffer.add((3.0, 0.0, 0.0), 2.0)
+    assert buffer.last_value == (3.0, 0.0, 0.0)
+    assert len(buffer.samples) == 1
+
+
+def test_slerp():
+    """
+    Test of interpolating rotations along the shorter arc
+    """
+    half = 0.5 ** 0.5
+    quat = transform_sync.slerp((1.0, 0.0, 0.0, 0.0), (0.0, 0.0, 0.0, 1.0), 0.5)
+    assert transform_sync.max_difference(quat, (half, 0.0, 0.0, half)) < 1e-6
+    # Quaternion -q is the same rotation as q
+    quat = transform_sync.slerp((1.0, 0.0, 0.0, 0.0), (-half, 0.0, 0.0, -half), 0.5)
+    assert quat[0] > 0.0 and quat[3] > 0.0
+    assert abs(sum(component * component for component in quat) - 1.0) < 1e-6
+    # Close quaternions are interpolated linearly
+    assert transform_sync.slerp((1.0, 0.0, 0.0, 0.0), (1.0, 0.0, 0.0, 0.0), 0.3) == (1.0, 0.0, 0.0, 0.0)
+
+
+def test_rotation_changed():
+    """
+    Test of comparing rotations with tolerance
+    """
+    assert transform_sync.rotation_changed(None, (1.0, 0.0, 0.0, 0.0), 1e-4) is True
+    assert transform_sync.rotation_changed((1.0, 0.0, 0.0, 0.0), (-1.0, 0.0, 0.0, 0.0), 1e-4) is False
+    assert transform_sync.rotation_changed((1.0, 0.0, 0.0, 0.0), (1.0, 0.00001, 0.0, 0.0), 1e-4) is False
+    assert transform_sync.rotation_changed((1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0), 1e-4) is True
+
+
+def test_pack_transform():
+    """
+    Test of packing transformation to one string
+    """
+    text = transform_sync.pack_transform((1.0, 2.0, 3.0), (1.0, 0.0, 0.0, 0.0), (0.5, 0.5, 0.5))
+    assert transform_sync.unpack_transform(text) == ((1.0, 2.0, 3.0), (1.0, 0.0, 0.0, 0.0), (0.5, 0.5, 0.5))
+    with pytest.raises(ValueError):
+        transform_sync.unpack_transform('not packed')
+    with pytest.raises(ValueError):
+        transform_sync.unpack_transform(text[:-4])
+
+
+class Session(object):
+    """
+    Session with list of long running jobs
+    """
+
+    def __init__(self):
+        self.jobs = []
+
+
+class AnimatedNode(object):
+    """
+    Object node, which is animated for given number of steps
+    """
+
+    def __init__(self, session, steps):
+        self.session = session
+        self.steps = steps
+
+    def animate(self, now):
+        self.steps -= 1
+        return self.steps > 0
+
+
+def test_interpolation_job():
+    """
+    Test of animating objects in job of session, until they stop moving
+    """
+    session = Session()
+    redraws = []
+    nodes = [AnimatedNode(session, 1), AnimatedNode(session, 2)]
+    for node in nodes:
+        transform_sync.interpolate(node, lambda: redraws.append(True))
+    assert len(session.jobs) == 1
+    job = session.jobs[0]
+    assert job.step() is True
+    assert job.step() is False
+    # Views are redrawn after the last change of transformation too
+    assert len(redraws) == 2
+    assert transform_sync.InterpolationJob.instance is None
@@ -0,0 +1,237 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements accounting of commands sent to Verse server and
+received from Verse server. Count of commands and estimated count of bytes
+are collected per node, per tag group, per tag and per layer. Tag groups,
+tags and layers are identified by name of class representing them (e.g.
+VerseVertices, AvatarLocation) or by custom type, when class is not known.
+"""
+
+
+import collections
+import csv
+import time
+
+
+# Estimated size of command header (opcode, length and priority)
+COMMAND_HEADER_SIZE = 3
+
+# Count of complete seconds used for computing rates
+RATE_WINDOW = 5
+
+CATEGORIES = ('node', 'taggroup', 'tag', 'layer')
+
+# Traffic meter of current session
+TRAFFIC_METER = None
+
+
+def value_size(value):
+    """
+    This function returns estimated size of encoded value
+    """
+    if isinstance(value, (tuple, list)):
+        return sum(value_size(item) for item in value)
+    elif isinstance(value, float):
+        return 8
+    elif isinstance(value, int):
+        return 4
+    elif isinstance(value, str):
+        return 1 + len(value.encode('utf-8'))
+    elif isinstance(value, bytes):
+        return 1 + len(value)
+    return 0
+
+
+class TrafficCounter(object):
+    """
+    Count of commands and bytes with rolling buckets of seconds
+    """
+
+    def __init__(self):
+        """
+        Constructor of TrafficCounter
+        """
+        self.commands = 0
+        self.bytes = 0
+        # Buckets [second, commands, bytes]
+        self.buckets = collections.deque(maxlen=RATE_WINDOW + 1)
+
+    def add(self, now, size):
+        """
+        This method counts one command
+        """
+        self.commands += 1
+        self.bytes += size
+        second = int(now)
+        if len(self.buckets) == 0 or self.buckets[-1][0] != second:
+            self.buckets.append([second, 0, 0])
+        bucket = self.buckets[-1]
+        bucket[1] += 1
+        bucket[2] += size
+
+    def rates(self, now):
+        """
+        This method returns tuple (commands per second, bytes per second)
+        computed from complete seconds of rolling window
+        """
+        second = int(now)
+        commands = 0
+        size = 0
+        for bucket_second, bucket_commands, bucket_bytes in self.buckets:
+            if second - RATE_WINDOW <= bucket_second < second:
+                commands += bucket_commands
+                size += bucket_bytes
+        return float(commands) / RATE_WINDOW, float(size) / RATE_WINDOW
+
+
+def entity_name(entity, custom_type):
+    """
+    This function returns name of class of entity or custom type, when
+    entity is not known yet
+    """
+    if entity is not None:
+        return entity.__class__.__name__
+    elif custom_type is not None:
+        return 'custom type %d' % custom_type
+    return 'unknown'
+
+
+class TrafficMeter(object):
+    """
+    Command hook counting commands per node, tag group, tag and layer
+    """
+
+    def __init__(self, session):
+        """
+        Constructor of TrafficMeter
+        """
+        self.session = session
+        self.start = time.time()
+        # Counters: (category, key, direction) -> TrafficCounter
+        self.counters = {}
+
+    def __call__(self, direction, command, args, kwargs):
+        """
+        This method counts one command
+        """
+        # Keyword arguments follow positional arguments
+        args = args + tuple(kwargs.values())
+        if direction == 'out':
+            # The first argument of sent command is priority
+            args = args[1:]
+        # Command creating node does not contain ID of node
+        if len(args) == 0 or (direction == 'out' and command == 'node_create') or \
+                not (command.startswith('node_') or command.startswith('tag') or
+                     command.startswith('layer_')):
+            return
+        now = time.time()
+        size = COMMAND_HEADER_SIZE + value_size(args)
+        node_id = args[0]
+        self.count('node', node_id, direction, now, size)
+        node = self.session.nodes.get(node_id)
+        # Custom type is the last argument of commands creating entities
+        custom_type = args[-1] if command.endswith('_create') else None
+        if command.startswith('tag'):
+            taggroup = None
+            if command != 'taggroup_create' and node is not None:
+                taggroup = node.taggroups.get(args[1])
+            self.count('taggroup', entity_name(taggroup, custom_type), direction, now, size)
+            if command.startswith('tag_'):
+                tag = None
+                if command != 'tag_create' and taggroup is not None:
+                    tag = taggroup.tags.get(args[2])
+                self.count('tag', entity_name(tag, custom_type), direction, now, size)
+        elif command.startswith('layer_'):
+            layer = None
+            if command != 'layer_create' and node is not None:
+                layer = node.layers.get(args[1])
+            self.count('layer', entity_name(layer, custom_type), direction, now, size)
+
+    def count(self, category, key, direction, now, size):
+        """
+        This method adds command to counter
+        """
+        try:
+            counter = self.counters[(category, key, direction)]
+        except KeyError:
+            counter = self.counters[(category, key, direction)] = TrafficCounter()
+        counter.add(now, size)
+
+    def report(self, category):
+        """
+        This method returns list of tuples (key, received counter, sent
+        counter) sorted by bytes per second
+        """
+        now = time.time()
+        empty = TrafficCounter()
+        keys = set(key for cat, key, _direction in self.counters if cat == category)
+        rows = [(key,
+                 self.counters.get((category, key, 'in'), empty),
+                 self.counters.get((category, key, 'out'), empty)) for key in keys]
+        rows.sort(key=lambda row: (row[1].rates(now)[1] + row[2].rates(now)[1],
+                                   row[1].bytes + row[2].bytes), reverse=True)
+        return rows
+
+    def reset(self):
+        """
+        This method removes all counters
+        """
+        self.start = time.time()
+        self.counters.clear()
+
+    def export_csv(self, path):
+        """
+        This method writes all counters to CSV file
+        """
+        now = time.time()
+        with open(path, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(('category', 'key', 'direction', 'commands', 'bytes',
+                             'commands/s', 'bytes/s'))
+            for category in CATEGORIES:
+                for key, received, sent in self.report(category):
+                    for direction, counter in (('in', received), ('out', sent)):
+                        if counter.commands > 0:
+                            commands_rate, bytes_rate = counter.rates(now)
+                            writer.writerow((category, key, direction, counter.commands,
+                                             counter.bytes, commands_rate, bytes_rate))
+
+
+def start_metering(session):
+    """
+    This function starts counting of commands of session
+    """
+    global TRAFFIC_METER
+    stop_metering(session)
+    TRAFFIC_METER = TrafficMeter(session)
+    session.add_command_hook(TRAFFIC_METER)
+    return TRAFFIC_METER
+
+
+def stop_metering(session):
+    """
+    This function stops counting of commands
+    """
+    global TRAFFIC_METER
+    if TRAFFIC_METER is not None:
+        if session is not None:
+            session.remove_command_hook(TRAFFIC_METER)
+        TRAFFIC_METER = None
@@ -0,0 +1,422 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements throttling of transformations of objects sent to
+Verse server. Rotation and scale are sent only, when they are changed more
+than epsilon. Position is sent with velocity (dead reckoning) and it is sent
+again only, when position predicted by receivers differs from real position
+more than allowed error. Receivers buffer received values and interpolate
+them with small playout delay (position is extrapolated using velocity after
+last received value), thus objects move smoothly even at low rates of sending.
+"""
+
+
+import base64
+import binascii
+import collections
+import math
+import struct
+import time
+import weakref
+
+
+# Receivers extrapolate position at most this count of seconds after
+# receiving of position
+MAX_EXTRAPOLATION = 0.5
+
+DEFAULT_POSITION_EPSILON = 1e-4
+DEFAULT_ROTATION_EPSILON = 1e-4
+DEFAULT_SCALE_EPSILON = 1e-4
+DEFAULT_PREDICTION_ERROR = 0.01
+DEFAULT_PLAYOUT_DELAY = 0.1
+
+# Count of received values of one component of transformation kept for
+# interpolation
+MAX_SAMPLES = 16
+
+# Quaternions closer than this are interpolated linearly
+SLERP_THRESHOLD = 1.0 - 1e-6
+
+# Position (3), rotation (4) and scale (3) packed to one tag as
+# little-endian 32-bit floats encoded by base64
+PACKED_TRANSFORM = struct.Struct('<10f')
+
+ZERO_VELOCITY = (0.0, 0.0, 0.0)
+
+# Transformation not changed for this count of seconds is written to both
+# packed tag and separate tags
+SETTLE_DELAY = 0.5
+
+
+def max_difference(value1, value2):
+    """
+    This function returns the biggest difference of components of two vectors
+    """
+    return max(abs(component1 - component2) for component1, component2 in zip(value1, value2))
+
+
+def extrapolate(value, velocity, seconds):
+    """
+    This function returns position moved by velocity for seconds
+    """
+    return tuple(component + speed * seconds for component, speed in zip(value, velocity))
+
+
+def changed(sent_value, value, epsilon):
+    """
+    This function returns True, when value should be sent, because it differs
+    from sent value more than epsilon
+    """
+    return sent_value is None or max_difference(sent_value, value) > epsilon
+
+
+def rotation_changed(sent_value, value, epsilon):
+    """
+    This function returns True, when rotation quaternion differs from sent
+    quaternion more than epsilon. Quaternions q and -q are the same rotation.
+    """
+    return changed(sent_value, value, epsilon) and \
+        changed(sent_value, tuple(-component for component in value), epsilon)
+
+
+def lerp(value1, value2, factor):
+    """
+    This function returns linear interpolation of two vectors
+    """
+    return tuple(component1 + (component2 - component1) * factor
+                 for component1, component2 in zip(value1, value2))
+
+
+def slerp(quat1, quat2, factor):
+    """
+    This function returns spherical linear interpolation of two unit
+    quaternions along the shorter arc
+    """
+    cos_angle = sum(component1 * component2 for component1, component2 in zip(quat1, quat2))
+    if cos_angle < 0.0:
+        quat2 = tuple(-component for component in quat2)
+        cos_angle = -cos_angle
+    if cos_angle > SLERP_THRESHOLD:
+        result = lerp(quat1, quat2, factor)
+        length = math.sqrt(sum(component * component for component in result))
+        return tuple(component / length for component in result)
+    angle = math.acos(cos_angle)
+    sin_angle = math.sin(angle)
+    weight1 = math.sin((1.0 - factor) * angle) / sin_angle
+    weight2 = math.sin(factor * angle) / sin_angle
+    return tuple(weight1 * component1 + weight2 * component2
+                 for component1, component2 in zip(quat1, quat2))
+
+
+def pack_transform(position, rotation, scale):
+    """
+    This function returns string with position, rotation and scale packed
+    for one tag of type string
+    """
+    values = tuple(position) + tuple(rotation) + tuple(scale)
+    return base64.b64encode(PACKED_TRANSFORM.pack(*values)).decode('ascii')
+
+
+def unpack_transform(text):
+    """
+    This function returns tuple (position, rotation, scale) unpacked from
+    string. It raises ValueError, when string is not packed transformation.
+    """
+    try:
+        values = PACKED_TRANSFORM.unpack(base64.b64decode(text.encode('ascii'), validate=True))
+    except (binascii.Error, struct.error, UnicodeEncodeError) as err:
+        raise ValueError('Wrong packed transformation: %s' % err)
+    return values[0:3], values[3:7], values[7:10]
+
+
+class DeadReckoning(object):
+    """
+    Model of position predicted by receivers from sent position and velocity
+    """
+
+    def __init__(self):
+        """
+        Constructor of DeadReckoning
+        """
+        self.sent_value = None
+        self.sent_velocity = ZERO_VELOCITY
+        self.sent_time = 0.0
+        self.last_value = None
+        self.last_time = 0.0
+
+    def predict(self, now):
+        """
+        This method returns position predicted by receivers
+        """
+        seconds = min(now - self.sent_time, MAX_EXTRAPOLATION)
+        return extrapolate(self.sent_value, self.sent_velocity, seconds)
+
+    def velocity(self, value, now):
+        """
+        This method returns velocity estimated from previous position
+        """
+        if self.last_value is None or now <= self.last_time:
+            return ZERO_VELOCITY
+        seconds = now - self.last_time
+        return tuple((component - last) / seconds for component, last in zip(value, self.last_value))
+
+    def update(self, value, now, epsilon, prediction_error=None):
+        """
+        This method returns tuple (position, velocity), which should be sent or
+        None, when receivers predict position well enough. When prediction_error
+        is None, then velocity is not used.
+        """
+        velocity = self.velocity(value, now) if prediction_error is not None else ZERO_VELOCITY
+        self.last_value, self.last_time = value, now
+        if self.sent_value is None:
+            send = True
+        elif prediction_error is None or max(map(abs, velocity)) == 0.0:
+            # Position of object at rest has to be exact
+            send = changed(self.predict(now), value, epsilon)
+        else:
+            send = changed(self.predict(now), value, max(epsilon, prediction_error))
+        if send is False:
+            return None
+        self.sent_value, self.sent_velocity, self.sent_time = value, velocity, now
+        return value, velocity
+
+    @property
+    def moving(self):
+        """
+        True, when receivers move object using sent velocity
+        """
+        return self.sent_velocity != ZERO_VELOCITY
+
+
+class SampleBuffer(object):
+    """
+    Timestamped values of one component of transformation received from
+    Verse server
+    """
+
+    def __init__(self, interpolate=None):
+        """
+        Constructor of SampleBuffer
+        :interpolate: function(value1, value2, factor) used between samples
+        """
+        self.interpolate = interpolate if interpolate is not None else lerp
+        self.samples = collections.deque(maxlen=MAX_SAMPLES)
+
+    def add(self, value, now):
+        """
+        This method stores received value. Values received at the same time
+        replace each other.
+        """
+        if len(self.samples) > 0 and self.samples[-1][0] >= now:
+            self.samples.pop()
+        self.samples.append((now, tuple(value)))
+
+    @property
+    def last_time(self):
+        """
+        Time of last received value or None
+        """
+        return self.samples[-1][0] if len(self.samples) > 0 else None
+
+    @property
+    def last_value(self):
+        """
+        Last received value or None
+        """
+        return self.samples[-1][1] if len(self.samples) > 0 else None
+
+    def sample(self, when):
+        """
+        This method returns value at time when. It is interpolated between
+        received values. Value received first is used before it and value
+        received last is used after it. Samples older than needed are
+        removed.
+        """
+        samples = self.samples
+        if len(samples) == 0:
+            return None
+        while len(samples) > 1 and samples[1][0] <= when:
+            samples.popleft()
+        time1, value1 = samples[0]
+        if when <= time1 or len(samples) == 1:
+            return value1
+        time2, value2 = samples[1]
+        return self.interpolate(value1, value2, (when - time1) / (time2 - time1))
+
+    def pending(self, when):
+        """
+        This method returns True, when some value was received later than time when
+        """
+        return len(self.samples) > 0 and self.samples[-1][0] > when
+
+    def clear(self):
+        """
+        This method removes all received values
+        """
+        self.samples.clear()
+
+
+class TransformInterpolator(object):
+    """
+    Position, rotation and scale of object received from Verse server. Values
+    are interpolated between received samples; position is extrapolated after
+    last sample using received velocity.
+    """
+
+    def __init__(self):
+        """
+        Constructor of TransformInterpolator
+        """
+        self.position = SampleBuffer(lerp)
+        self.rotation = SampleBuffer(slerp)
+        self.scale = SampleBuffer(lerp)
+        self.velocity = ZERO_VELOCITY
+        # Transformation (position, rotation, scale) applied to Blender object
+        self.shown = (None, None, None)
+
+    def receive_velocity(self, velocity):
+        """
+        This method stores received velocity. It is sent before position.
+        """
+        self.velocity = tuple(velocity)
+
+    def extrapolating(self, when):
+        """
+        This method returns True, when extrapolated position is still changing
+        at time when
+        """
+        last_time = self.position.last_time
+        return last_time is not None and \
+            self.velocity != ZERO_VELOCITY and \
+            when - last_time < MAX_EXTRAPOLATION
+
+    def state(self, when):
+        """
+        This method returns tuple (position, rotation, scale) at time when.
+        Components, which were not received yet, are None.
+        """
+        position = self.position.sample(when)
+        last_time = self.position.last_time
+        if position is not None and when > last_time and self.velocity != ZERO_VELOCITY:
+            seconds = min(when - last_time, MAX_EXTRAPOLATION)
+            position = extrapolate(position, self.velocity, seconds)
+        return position, self.rotation.sample(when), self.scale.sample(when)
+
+    def active(self, when):
+        """
+        This method returns True, when transformation is still changing after
+        time when
+        """
+        return self.position.pending(when) or \
+            self.rotation.pending(when) or \
+            self.scale.pending(when) or \
+            self.extrapolating(when)
+
+
+class DeadReckoningJob(object):
+    """
+    Job checking positions of objects, which are moved by receivers using
+    velocity. Position with zero velocity is sent, when object stops moving,
+    even if Blender does not report any change of object. Objects are
+    checked, until their transformation settles.
+    """
+
+    # Running job of current session
+    instance = None
+
+    def __init__(self):
+        """
+        Constructor of DeadReckoningJob
+        """
+        self.nodes = weakref.WeakSet()
+
+    def step(self):
+        """
+        This method sends positions of moving objects. It returns True, when
+        some object is still moving or its transformation is not settled.
+        """
+        for node in list(self.nodes):
+            node.update()
+            if node.position_model.moving is False and node.settle() is True:
+                self.nodes.discard(node)
+        if len(self.nodes) == 0:
+            self.__class__.instance = None
+            return False
+        return True
+
+
+def watch(node):
+    """
+    This function adds object node to the job checking moving objects and
+    objects with changed transformation
+    """
+    job = DeadReckoningJob.instance
+    if job is None or job not in node.session.jobs:
+        job = DeadReckoningJob.instance = DeadReckoningJob()
+        node.session.jobs.append(job)
+    job.nodes.add(node)
+
+
+
+class InterpolationJob(object):
+    """
+    Job applying interpolated transformation to objects edited by other
+    clients. It runs in modal timer of session, because Blender data must
+    not be changed in draw callbacks. Objects are animated, until their
+    transformation stops changing.
+    """
+
+    # Running job of current session
+    instance = None
+
+    def __init__(self, redraw):
+        """
+        Constructor of InterpolationJob
+        """
+        self.nodes = weakref.WeakSet()
+        self.redraw = redraw
+
+    def step(self):
+        """
+        This method applies interpolated transformation to animated objects
+        and redraws views once. It returns True, when transformation of some
+        object is still changing.
+        """
+        now = time.time()
+        for node in list(self.nodes):
+            if node.animate(now) is False:
+                self.nodes.discard(node)
+        self.redraw()
+        if len(self.nodes) == 0:
+            self.__class__.instance = None
+            return False
+        return True
+
+
+def interpolate(node, redraw):
+    """
+    This function adds object node to the job animating objects with received
+    transformation. Function redraw is called after each step of the job.
+    """
+    job = InterpolationJob.instance
+    if job is None or job not in node.session.jobs:
+        job = InterpolationJob.instance = InterpolationJob(redraw)
+        node.session.jobs.append(job)
+    job.nodes.add(node)
@@ -270,6 +270,17 @@ def init_object_properties():
     )
 
 
+def init_mesh_properties():
+    """
+    Init properties in blender mesh data type
+    """
+    bpy.types.Mesh.verse_node_id = bpy.props.IntProperty(
+        name="ID of verse mesh node",
+        default=-1,
+        description="ID of node representing mesh at Verse server"
+    )
+
+
 def reset_object_properties():
     """
     Reset properties related to Blender objects
@@ -294,10 +305,16 @@ classes = (
 
 def register():
     """
-    This method register all methods of this submodule
+    This method register all methods of this submodule and it initializes
+    properties stored in blend files
     """
     for c in classes:
         bpy.utils.register_class(c)
+    init_scene_properties()
+    init_avatar_properties()
+    init_user_properties()
+    init_object_properties()
+    init_mesh_properties()
 
 
 def unregister():
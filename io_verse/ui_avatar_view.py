@@ -358,11 +358,10 @@ classes = (
 
 def register():
     """
-    Register classes with panel and initialize properties
+    Register classes with panel
     """
     for c in classes:
         bpy.utils.register_class(c)
-    ui.init_avatar_properties()
 
 
 def unregister():
@@ -23,11 +23,14 @@ This module implements sharing Blender objects at Verse server
 
 
 import bpy
+import bmesh
 import verse as vrs
 from . import session
 from . import object3d
 from . import mesh
+from . import bulk_share
 from . import ui
+from .mesh_tools import regions
 
 
 class VerseObjectOtSubscribe(bpy.types.Operator):
@@ -98,12 +101,17 @@ class VerseObjectOtShare(bpy.types.Operator):
                 parent=scene_data_node,
                 obj=context.active_object
             )
-            object_node.mesh_node = mesh.VerseMesh(
-                session=vrs_session,
-                parent=object_node,
-                mesh=context.active_object.data,
-                autosubscribe=True
-            )
+            # Linked duplicates use one mesh node
+            mesh_node = mesh.VerseMesh.find(context.active_object.data)
+            if mesh_node is not None:
+                object_node.share_mesh_node(mesh_node)
+            else:
+                object_node.mesh_node = mesh.VerseMesh(
+                    session=vrs_session,
+                    parent=object_node,
+                    mesh=context.active_object.data,
+                    autosubscribe=True
+                )
             object_node.lock()
             # TODO: lock mesh_node too
         return {'FINISHED'}
@@ -126,6 +134,261 @@ class VerseObjectOtShare(bpy.types.Operator):
             return False
 
 
+class VerseObjectOtShareSelected(bpy.types.Operator):
+    """
+    This operator tries to share all selected Blender Mesh objects at Verse server.
+    """
+    bl_idname = 'object.mesh_object_share_selected'
+    bl_label = "Share Selected"
+    bl_description = "Share all selected Mesh Objects at Verse server"
+
+    @staticmethod
+    def objects_to_share(context):
+        """
+        This method returns list of selected Mesh objects, which are not
+        shared and which are not being shared
+        """
+        vrs_session = session.VerseSession.instance()
+        pending = set()
+        for job in vrs_session.jobs:
+            if isinstance(job, bulk_share.BulkShareJob):
+                pending |= job.objects
+        return [obj for obj in context.selected_objects
+                if obj.type == 'MESH' and
+                obj.verse_node_id == -1 and
+                obj.as_pointer() not in pending]
+
+    def invoke(self, context, event):
+        """
+        This method adds new job, which will create nodes of all
+        selected Mesh objects at Verse server
+        """
+        vrs_session = session.VerseSession.instance()
+        # Get node with scene data
+        try:
+            scene_data_node = vrs_session.nodes[context.scene.verse_data_node_id]
+        except KeyError:
+            return {'CANCELLED'}
+        else:
+            job = bulk_share.BulkShareJob(
+                session=vrs_session,
+                scene_data_node=scene_data_node,
+                objects=self.objects_to_share(context)
+            )
+            vrs_session.jobs.append(job)
+        return {'FINISHED'}
+
+    @classmethod
+    def poll(cls, context):
+        """
+        This class method is used, when Blender check, if this operator can be
+        executed
+        """
+        # Return true only in situation, when client is connected to Verse server
+        # and some selected Mesh object is not shared yet
+        wm = context.window_manager
+        if wm.verse_connected is True and \
+                context.scene.subscribed is not False and \
+                len(cls.objects_to_share(context)) > 0:
+            return True
+        else:
+            return False
+
+
+class VerseObjectOtCheckMesh(bpy.types.Operator):
+    """
+    This operator checks consistency of mesh with data shared at Verse server.
+    """
+    bl_idname = 'object.mesh_object_check'
+    bl_label = "Check Consistency"
+    bl_description = "Compare active Mesh Object with data shared at Verse server and repair differences"
+
+    def invoke(self, context, event):
+        """
+        This method compares hashes of mesh and repairs differences
+        """
+        vrs_session = session.VerseSession.instance()
+        try:
+            node = vrs_session.nodes[context.active_object.verse_node_id]
+        except KeyError:
+            return {'CANCELLED'}
+        else:
+            node.mesh_node.suspect = True
+            node.mesh_node.check_consistency()
+        return {'FINISHED'}
+
+    @classmethod
+    def poll(cls, context):
+        """
+        This class method is used, when Blender check, if this operator can be
+        executed
+        """
+        # Return true only in situation, when mesh is edited by someone else
+        wm = context.window_manager
+        if wm.verse_connected is True and \
+                context.scene.subscribed is not False and \
+                context.active_object is not None and \
+                context.active_object.verse_node_id != -1:
+            vrs_session = session.VerseSession.instance()
+            try:
+                node = vrs_session.nodes[context.active_object.verse_node_id]
+            except KeyError:
+                return False
+            else:
+                if node.mesh_node is not None and \
+                        node.mesh_node.locked_by_me is False:
+                    return True
+                else:
+                    return False
+        else:
+            return False
+
+
+class VerseObjectOtCompactMesh(bpy.types.Operator):
+    """
+    This operator renumbers IDs of vertices, edges and faces of edited mesh.
+    """
+    bl_idname = 'object.mesh_object_compact'
+    bl_label = "Compact IDs"
+    bl_description = "Renumber vertices, edges and faces of edited Mesh Object to remove gaps in their IDs"
+
+    def invoke(self, context, event):
+        """
+        This method compacts IDs of mesh shared at Verse server
+        """
+        vrs_session = session.VerseSession.instance()
+        try:
+            node = vrs_session.nodes[context.active_object.verse_node_id]
+        except KeyError:
+            return {'CANCELLED'}
+        else:
+            moved = node.mesh_node.compact_ids()
+            self.report({'INFO'}, "Moved %d items" % moved)
+        return {'FINISHED'}
+
+    @classmethod
+    def poll(cls, context):
+        """
+        This class method is used, when Blender check, if this operator can be
+        executed
+        """
+        # Return true only in situation, when mesh is edited by this client
+        wm = context.window_manager
+        if wm.verse_connected is True and \
+                context.mode == 'EDIT_MESH' and \
+                context.active_object is not None and \
+                context.active_object.verse_node_id != -1:
+            vrs_session = session.VerseSession.instance()
+            try:
+                node = vrs_session.nodes[context.active_object.verse_node_id]
+            except KeyError:
+                return False
+            else:
+                if node.mesh_node is not None and \
+                        node.mesh_node.locked_by_me is True:
+                    return True
+                else:
+                    return False
+        else:
+            return False
+
+
+def edited_mesh_node(context):
+    """
+    This function returns mesh node of shared object edited in edit mode or None
+    """
+    wm = context.window_manager
+    if wm.verse_connected is True and \
+            context.mode == 'EDIT_MESH' and \
+            context.active_object is not None and \
+            context.active_object.verse_node_id != -1:
+        vrs_session = session.VerseSession.instance()
+        try:
+            node = vrs_session.nodes[context.active_object.verse_node_id]
+        except KeyError:
+            return None
+        else:
+            return node.mesh_node
+    return None
+
+
+class VerseObjectOtLockRegion(bpy.types.Operator):
+    """
+    This operator locks regions of edited mesh containing selected vertices.
+    Other clients can edit other regions of the mesh at the same time.
+    """
+    bl_idname = 'object.mesh_object_lock_region'
+    bl_label = "Lock Selected Region"
+    bl_description = "Lock regions of edited Mesh Object with selected vertices, " \
+                     "other users can edit other regions at the same time"
+
+    def invoke(self, context, event):
+        """
+        This method locks regions of selected vertices
+        """
+        mesh_node = edited_mesh_node(context)
+        b3d_bmesh = bmesh.from_edit_mesh(mesh_node.mesh)
+        cells = set(regions.cell_of(b3d_vert.co, mesh_node.cell_size)
+                    for b3d_vert in b3d_bmesh.verts if b3d_vert.select is True)
+        if len(cells) == 0:
+            self.report({'WARNING'}, "No vertex is selected")
+            return {'CANCELLED'}
+        locked = mesh_node.lock_regions(cells)
+        # Other clients can select object and edit other regions of the mesh
+        if mesh_node.locked_by_me is True:
+            mesh_node.unlock()
+        object_node = session.VerseSession.instance().nodes[context.active_object.verse_node_id]
+        if object_node.locked_by_me is True:
+            object_node.unlock()
+        self.report({'INFO'}, "Locked %d of %d regions" % (len(locked), len(cells)))
+        return {'FINISHED'}
+
+    @classmethod
+    def poll(cls, context):
+        """
+        This class method is used, when Blender check, if this operator can be
+        executed
+        """
+        # Return true only in situation, when mesh is not locked by other client
+        mesh_node = edited_mesh_node(context)
+        if mesh_node is not None and \
+                (mesh_node.locked is False or mesh_node.locked_by_me is True):
+            return True
+        else:
+            return False
+
+
+class VerseObjectOtUnlockRegions(bpy.types.Operator):
+    """
+    This operator unlocks all regions of edited mesh locked by this client.
+    """
+    bl_idname = 'object.mesh_object_unlock_regions'
+    bl_label = "Unlock Regions"
+    bl_description = "Unlock all regions of edited Mesh Object locked by this user"
+
+    def invoke(self, context, event):
+        """
+        This method unlocks regions of this client
+        """
+        mesh_node = edited_mesh_node(context)
+        # Local changes have to be sent before regions are unlocked
+        mesh_node.send_updates()
+        mesh_node.unlock_regions()
+        return {'FINISHED'}
+
+    @classmethod
+    def poll(cls, context):
+        """
+        This class method is used, when Blender check, if this operator can be
+        executed
+        """
+        mesh_node = edited_mesh_node(context)
+        if mesh_node is not None and len(mesh_node.owned_cells) > 0:
+            return True
+        else:
+            return False
+
+
 class VerseObjectMtMenu(bpy.types.Menu):
     """
     Menu for object list
@@ -235,7 +498,53 @@ class View3DPanelToolsVerseObject(bpy.types.Panel):
 
         col = layout.column(align=True)
         col.operator("object.mesh_object_share")
+        col.operator("object.mesh_object_share_selected")
         col.operator("object.mesh_object_subscribe")
+        col.operator("object.mesh_object_check")
+
+        # Progress of sharing selected objects
+        vrs_session = session.VerseSession.instance()
+        for job in vrs_session.jobs:
+            if isinstance(job, bulk_share.BulkShareJob):
+                layout.label(str(job))
+
+
+class View3DPanelToolsVerseMesh(bpy.types.Panel):
+    """
+    Panel with Verse tools for Mesh edited in edit mode
+    """
+    bl_category = "Tools"
+    bl_context = 'mesh_edit'
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'TOOLS'
+    bl_label = 'Verse'
+
+    @classmethod
+    def poll(cls, context):
+        """
+        Can this panel visible
+        """
+        # Return true only in situation, when edited object is shared
+        # at Verse server
+        wm = context.window_manager
+        if wm.verse_connected is True and \
+                context.scene.subscribed is not False and \
+                context.active_object is not None and \
+                context.active_object.verse_node_id != -1:
+            return True
+        else:
+            return False
+
+    def draw(self, context):
+        """
+        Definition of panel layout
+        """
+        layout = self.layout
+
+        col = layout.column(align=True)
+        col.operator("object.mesh_object_compact")
+        col.operator("object.mesh_object_lock_region")
+        col.operator("object.mesh_object_unlock_regions")
 
 
 class VerseObjectPanel(bpy.types.Panel):
@@ -534,8 +843,14 @@ class VerseObjectPermPanel(bpy.types.Panel):
 # List of Blender classes in this submodule
 classes = (
     VerseObjectOtShare,
+    VerseObjectOtShareSelected,
     VerseObjectOtSubscribe,
+    VerseObjectOtCheckMesh,
+    VerseObjectOtCompactMesh,
+    VerseObjectOtLockRegion,
+    VerseObjectOtUnlockRegions,
     View3DPanelToolsVerseObject,
+    View3DPanelToolsVerseMesh,
     VerseObjectPanel,
     VerseObjectUlSlot,
     VerseObjectMtMenu,
@@ -554,8 +869,6 @@ def register():
     """
     for c in classes:
         bpy.utils.register_class(c)
-    ui.init_object_properties()
-    ui.init_user_properties()
 
 
 def unregister():
@@ -564,6 +877,7 @@ def unregister():
     """
     for c in classes:
         bpy.utils.unregister_class(c)
+    bulk_share.shutdown_executor()
     ui.reset_object_properties()
     ui.reset_user_properties()
 
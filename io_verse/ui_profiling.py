@@ -0,0 +1,340 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+"""
+This module implements panels and operators for measuring callbacks and
+traffic
+"""
+
+
+import os
+import time
+import bpy
+from . import profiling
+from . import session
+from . import traffic
+from . import memory
+
+
+# Count of callbacks displayed in panel
+PANEL_ROWS = 12
+
+
+class VERSE_METRICS_OT_toggle(bpy.types.Operator):
+    """
+    This operator enables or disables measuring of callbacks
+    """
+    bl_idname = "scene.verse_metrics_toggle"
+    bl_label = "Measure Callbacks"
+    bl_description = "Enable or disable measuring of callbacks"
+
+    def execute(self, context):
+        if profiling.METRICS is True:
+            profiling.disable()
+        else:
+            profiling.enable()
+        return {'FINISHED'}
+
+
+class VERSE_METRICS_OT_reset(bpy.types.Operator):
+    """
+    This operator removes all collected statistics
+    """
+    bl_idname = "scene.verse_metrics_reset"
+    bl_label = "Reset Metrics"
+    bl_description = "Remove all collected statistics of callbacks"
+
+    def execute(self, context):
+        profiling.reset()
+        return {'FINISHED'}
+
+
+class VERSE_METRICS_OT_export(bpy.types.Operator):
+    """
+    This operator writes collected statistics to JSON file
+    """
+    bl_idname = "scene.verse_metrics_export"
+    bl_label = "Export Metrics"
+    bl_description = "Write collected statistics of callbacks to JSON file"
+
+    filepath = bpy.props.StringProperty(subtype='FILE_PATH')
+    filename_ext = ".json"
+
+    def execute(self, context):
+        try:
+            profiling.dump_json(self.filepath)
+        except OSError as err:
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if self.filepath == "":
+            self.filepath = "verse_metrics.json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+class VERSE_TRACE_OT_toggle(bpy.types.Operator):
+    """
+    This operator starts tracing or it stops tracing and writes trace to
+    JSON file
+    """
+    bl_idname = "scene.verse_trace_toggle"
+    bl_label = "Trace Sync Loop"
+    bl_description = "Start tracing or stop tracing and write trace in Chrome trace event format"
+
+    def execute(self, context):
+        if profiling.TRACING is False:
+            profiling.start_tracing()
+            return {'FINISHED'}
+        profiling.stop_tracing()
+        trace_dir = bpy.utils.user_resource('DATAFILES', path='verse_traces', create=True)
+        path = os.path.join(trace_dir, time.strftime('%Y%m%d-%H%M%S') + '.json')
+        try:
+            profiling.dump_trace(path)
+        except OSError as err:
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Trace written to " + path)
+        return {'FINISHED'}
+
+
+class VERSE_MEMORY_OT_report(bpy.types.Operator):
+    """
+    This operator writes estimated memory used by nodes to text
+    """
+    bl_idname = "scene.verse_memory_report"
+    bl_label = "Memory Report"
+    bl_description = "Write estimated memory used by every node to text 'verse_memory'"
+
+    @classmethod
+    def poll(cls, context):
+        return session.VerseSession.instance() is not None
+
+    def execute(self, context):
+        rows = memory.memory_report(session.VerseSession.instance())
+        text = bpy.data.texts.get('verse_memory')
+        if text is None:
+            text = bpy.data.texts.new('verse_memory')
+        text.clear()
+        text.write('%10s %-28s %12s\n' % ('node', 'class', 'kB'))
+        for node_id, class_name, size in rows:
+            text.write('%10d %-28s %12.1f\n' % (node_id, class_name, size / 1024.0))
+        total = sum(row[2] for row in rows)
+        text.write('%10s %-28s %12.1f\n' % ('', 'total', total / 1024.0))
+        self.report({'INFO'}, "Memory report written to text verse_memory")
+        return {'FINISHED'}
+
+
+class VerseMetricsPanel(bpy.types.Panel):
+    """
+    Panel with statistics of measured callbacks
+    """
+    bl_idname = "view3d.verse_metrics_panel"
+    bl_label = "Verse Metrics"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        """
+        Can be this panel visible
+        """
+        return context.window_manager.verse_connected is True
+
+    def draw(self, context):
+        """
+        Define drawing of widgets
+        """
+        layout = self.layout
+
+        row = layout.row(align=True)
+        if profiling.METRICS is True:
+            row.operator("scene.verse_metrics_toggle", text="Stop Measuring", icon='PAUSE')
+        else:
+            row.operator("scene.verse_metrics_toggle", icon='PLAY')
+        row.operator("scene.verse_metrics_reset", text="", icon='X')
+        row.operator("scene.verse_metrics_export", text="", icon='EXPORT')
+        if profiling.TRACING is True:
+            layout.operator("scene.verse_trace_toggle", text="Stop Tracing (%d events)" %
+                            len(profiling.TRACE_EVENTS), icon='REC')
+        else:
+            layout.operator("scene.verse_trace_toggle", icon='REC')
+        layout.operator("scene.verse_memory_report")
+
+        col = layout.column(align=True)
+        for stats in profiling.report()[:PANEL_ROWS]:
+            col.label(stats.name)
+            col.label("  %d calls, %.1f ms, p95 %.2f ms, %d items" % (
+                stats.count, 1000.0 * stats.total, 1000.0 * stats.p95, stats.items))
+
+
+class VERSE_TRAFFIC_OT_toggle(bpy.types.Operator):
+    """
+    This operator starts or stops counting of commands
+    """
+    bl_idname = "scene.verse_traffic_toggle"
+    bl_label = "Count Traffic"
+    bl_description = "Start or stop counting of commands per node, tag group, tag and layer"
+
+    @classmethod
+    def poll(cls, context):
+        return session.VerseSession.instance() is not None
+
+    def execute(self, context):
+        vrs_session = session.VerseSession.instance()
+        if traffic.TRAFFIC_METER is None:
+            traffic.start_metering(vrs_session)
+        else:
+            traffic.stop_metering(vrs_session)
+        return {'FINISHED'}
+
+
+class VERSE_TRAFFIC_OT_reset(bpy.types.Operator):
+    """
+    This operator removes all counters of traffic
+    """
+    bl_idname = "scene.verse_traffic_reset"
+    bl_label = "Reset Traffic"
+    bl_description = "Remove all counters of commands"
+
+    @classmethod
+    def poll(cls, context):
+        return traffic.TRAFFIC_METER is not None
+
+    def execute(self, context):
+        traffic.TRAFFIC_METER.reset()
+        return {'FINISHED'}
+
+
+class VERSE_TRAFFIC_OT_export(bpy.types.Operator):
+    """
+    This operator writes counters of traffic to CSV file
+    """
+    bl_idname = "scene.verse_traffic_export"
+    bl_label = "Export Traffic"
+    bl_description = "Write counters of commands to CSV file"
+
+    filepath = bpy.props.StringProperty(subtype='FILE_PATH')
+    filename_ext = ".csv"
+
+    @classmethod
+    def poll(cls, context):
+        return traffic.TRAFFIC_METER is not None
+
+    def execute(self, context):
+        try:
+            traffic.TRAFFIC_METER.export_csv(self.filepath)
+        except OSError as err:
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if self.filepath == "":
+            self.filepath = "verse_traffic.csv"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+def node_label(node_id):
+    """
+    This function returns label of node with name of its class
+    """
+    vrs_session = session.VerseSession.instance()
+    node = vrs_session.nodes.get(node_id) if vrs_session is not None else None
+    if node is not None:
+        return '%d %s' % (node_id, node.__class__.__name__)
+    return str(node_id)
+
+
+class VerseTrafficPanel(bpy.types.Panel):
+    """
+    Panel with the noisiest nodes, tag groups, tags and layers
+    """
+    bl_idname = "view3d.verse_traffic_panel"
+    bl_label = "Verse Traffic"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        """
+        Can be this panel visible
+        """
+        return context.window_manager.verse_connected is True
+
+    def draw(self, context):
+        """
+        Define drawing of widgets
+        """
+        layout = self.layout
+
+        row = layout.row(align=True)
+        if traffic.TRAFFIC_METER is not None:
+            row.operator("scene.verse_traffic_toggle", text="Stop Counting", icon='PAUSE')
+        else:
+            row.operator("scene.verse_traffic_toggle", icon='PLAY')
+        row.operator("scene.verse_traffic_reset", text="", icon='X')
+        row.operator("scene.verse_traffic_export", text="", icon='EXPORT')
+
+        meter = traffic.TRAFFIC_METER
+        if meter is None:
+            return
+        now = time.time()
+        for category in traffic.CATEGORIES:
+            col = layout.column(align=True)
+            col.label(category.capitalize() + ':')
+            for key, received, sent in meter.report(category)[:PANEL_ROWS // 2]:
+                label = node_label(key) if category == 'node' else key
+                col.label("  %s  in %.1f kB/s  out %.1f kB/s" % (
+                    label, received.rates(now)[1] / 1024.0, sent.rates(now)[1] / 1024.0))
+
+
+classes = (
+    VERSE_METRICS_OT_toggle,
+    VERSE_METRICS_OT_reset,
+    VERSE_METRICS_OT_export,
+    VERSE_TRACE_OT_toggle,
+    VERSE_MEMORY_OT_report,
+    VerseMetricsPanel,
+    VERSE_TRAFFIC_OT_toggle,
+    VERSE_TRAFFIC_OT_reset,
+    VERSE_TRAFFIC_OT_export,
+    VerseTrafficPanel
+)
+
+
+def register():
+    """
+    This method register all methods of this submodule
+    """
+    for c in classes:
+        bpy.utils.register_class(c)
+
+
+def unregister():
+    """
+    This method unregister all methods of this submodule
+    """
+    for c in classes:
+        bpy.utils.unregister_class(c)
@@ -271,7 +271,6 @@ def register():
     """
     for c in classes:
         bpy.utils.register_class(c)
-    ui.init_scene_properties()
 
 
 def unregister():